@@ -0,0 +1,189 @@
+"""
+Admission control for database-bound requests.
+Reads and writes each have a concurrency limit and a bounded FIFO wait
+queue. A request that finds the queue full, or is still queued after the
+deadline, is answered 503 with Retry-After at once instead of piling onto
+SQLite's lock, so latency for admitted requests stays bounded under bursts.
+Health checks, metrics and the change feed (long-lived, and idle between
+events) bypass it, as do CORS preflights.
+A released slot is handed directly to the oldest waiter, so a newly
+arriving request cannot overtake the queue.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Optional
+
+from app.metrics import REQUEST_BUCKETS, Histogram, render_histogram, render_series
+
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "1") == "1"
+ADMISSION_READ_CONCURRENCY = int(os.getenv("ADMISSION_READ_CONCURRENCY", "32"))
+ADMISSION_WRITE_CONCURRENCY = int(os.getenv("ADMISSION_WRITE_CONCURRENCY", "16"))
+# Waiting requests per class beyond the concurrency limit
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+# How long a request may wait for a slot before it is rejected
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "1000"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+# Paths that are never limited (prefix match)
+BYPASS_PREFIXES = ("/api/health", "/api/metrics", "/api/sessions/stream")
+# POST routes that only read
+READ_POSTS = {"/api/sessions/batch-get"}
+
+REJECTED_BODY = json.dumps({"detail": "Server is busy, retry later"}).encode()
+
+
+class AdmissionLimiter:
+    def __init__(self, concurrency: int, queue_size: int, timeout_seconds: float):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout_seconds = timeout_seconds
+        self.active = 0
+        self.admitted = 0
+        self.queued = 0
+        self.max_waiting = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.wait_seconds = Histogram(REQUEST_BUCKETS)
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in line if needed; False if rejected"""
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.rejected_queue_full += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        self.max_waiting = max(self.max_waiting, len(self._waiters))
+        start = time.perf_counter()
+        try:
+            # wait_for still returns if the slot was handed over as it timed out
+            await asyncio.wait_for(waiter, self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            return False
+        except asyncio.CancelledError:
+            # Client went away; pass on a slot handed over meanwhile
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                self._remove(waiter)
+        self.wait_seconds.observe(time.perf_counter() - start)
+        self.admitted += 1
+        return True
+
+    def _remove(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self) -> None:
+        """Free a slot, handing it to the oldest live waiter if there is one"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "queue_timeout_ms": self.timeout_seconds * 1000,
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+limiters = {
+    "read": AdmissionLimiter(ADMISSION_READ_CONCURRENCY, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT_MS / 1000),
+    "write": AdmissionLimiter(ADMISSION_WRITE_CONCURRENCY, ADMISSION_QUEUE_SIZE, ADMISSION_QUEUE_TIMEOUT_MS / 1000),
+}
+
+
+def request_class(method: str, path: str) -> Optional[str]:
+    """'read' or 'write', or None for requests that are not limited"""
+    if method == "OPTIONS" or not path.startswith("/api/") or path.startswith(BYPASS_PREFIXES):
+        return None
+    if method in ("GET", "HEAD") or path in READ_POSTS:
+        return "read"
+    return "write"
+
+
+def render_metrics(limiters: dict[str, AdmissionLimiter] = limiters) -> str:
+    """Admission gauges, counters and wait times in the Prometheus text format"""
+    series = [
+        ("measured_admission_active", "gauge", "Requests holding an admission slot.", "active"),
+        ("measured_admission_waiting", "gauge", "Requests waiting for an admission slot.", "waiting"),
+        ("measured_admission_rejected_queue_full_total", "counter",
+         "Requests rejected because the wait queue was full.", "rejected_queue_full"),
+        ("measured_admission_rejected_timeout_total", "counter",
+         "Requests rejected after waiting past the queue timeout.", "rejected_timeout"),
+    ]
+    lines = []
+    for name, kind, help_text, attribute in series:
+        lines += render_series(
+            name, kind, help_text,
+            (({"kind": request_kind}, getattr(limiter, attribute)) for request_kind, limiter in limiters.items())
+        )
+    lines += render_histogram(
+        "measured_admission_wait_seconds",
+        "Time queued requests waited for a slot.",
+        (({"kind": request_kind}, limiter.wait_seconds) for request_kind, limiter in limiters.items())
+    )
+    return "\n".join(lines) + "\n"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware holding an admission slot for the whole response,
+    streamed bodies included (exports keep their connection until done)
+    """
+
+    def __init__(self, app, limiters: dict[str, AdmissionLimiter] = limiters):
+        self.app = app
+        self.limiters = limiters
+
+    async def __call__(self, scope, receive, send):
+        kind = request_class(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[kind]
+        if not await limiter.acquire():
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(REJECTED_BODY)).encode()),
+                    (b"retry-after", str(ADMISSION_RETRY_AFTER_SECONDS).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": REJECTED_BODY})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,223 @@
+"""
+Duration statistics for GET /api/reports/analytics.
+Closed sessions (hot and archived) are loaded once into NumPy column arrays
+(project_id, start_time, end_time as int64 epoch microseconds), read in
+chunks straight from the SQLite cursor, and kept as a snapshot for one
+version of the sessions table: any write, in whichever process, makes the
+next request reload it. Every statistic is then a handful of vectorized
+passes over the columns, grouped by project.
+
+NumPy is optional; without it the endpoint answers 501. It is imported on
+the first analytics request rather than at startup, so workers that never
+serve one do not pay its import time or memory.
+"""
+import asyncio
+import itertools
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import databases
+
+from app.archive import ArchiveFile, archive_catalog, archive_connection
+
+# The numpy module, None if it is not installed, or _UNLOADED before the first use
+_UNLOADED = object()
+_numpy_module = _UNLOADED
+
+# Rows per fetchmany() while loading the snapshot
+ANALYTICS_CHUNK_SIZE = int(os.getenv("ANALYTICS_CHUNK_SIZE", "10000"))
+
+US_PER_SECOND = 1_000_000
+US_PER_HOUR = 3_600_000_000
+US_PER_DAY = 86_400_000_000
+
+PERCENTILES = (50, 90, 99)
+# Histogram bin edges in seconds; the last bin is open-ended
+HISTOGRAM_EDGES = (0, 60, 300, 900, 1800, 3600, 7200, 14400, 28800)
+
+# Table scan order; the snapshot is sorted afterwards
+SNAPSHOT_QUERY = "SELECT project_id, start_time, end_time FROM {table} WHERE end_time IS NOT NULL"
+
+
+def _numpy():
+    """Import numpy on first use; None if it is not installed"""
+    global _numpy_module
+    if _numpy_module is _UNLOADED:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - numpy is optional
+            numpy = None
+        _numpy_module = numpy
+    return _numpy_module
+
+
+@dataclass
+class ColumnSnapshot:
+    """Closed sessions sorted by (project_id, start_time)"""
+    version: int
+    project_id: "np.ndarray"
+    start_time: "np.ndarray"
+    end_time: "np.ndarray"
+    load_seconds: float
+
+    @property
+    def rows(self) -> int:
+        return len(self.project_id)
+
+
+async def _fetch_columns(connection, query: str) -> list:
+    """Run query on the raw aiosqlite connection, one (n, 3) array per chunk"""
+    np = _numpy()
+    chunks = []
+    async with connection.raw_connection.execute(query) as cursor:
+        while rows := await cursor.fetchmany(ANALYTICS_CHUNK_SIZE):
+            # fromiter over the flattened tuples is about twice as fast as np.array(rows)
+            values = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=3 * len(rows))
+            chunks.append(values.reshape(-1, 3))
+    return chunks
+
+
+async def load_snapshot(db: databases.Database, archives: list[ArchiveFile], version: int) -> ColumnSnapshot:
+    np = _numpy()
+    started = time.perf_counter()
+    async with db.connection() as connection:
+        chunks = await _fetch_columns(connection, SNAPSHOT_QUERY.format(table="sessions"))
+    for archive in archives:
+        async with archive_connection(db, archive) as connection:
+            chunks += await _fetch_columns(
+                connection,
+                SNAPSHOT_QUERY.format(table=archive.table) + f" AND {archive.shadow_condition()}"
+            )
+    columns = np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.int64)
+    order = np.lexsort((columns[:, 1], columns[:, 0]))
+    columns = columns[order]
+    return ColumnSnapshot(
+        version=version,
+        project_id=np.ascontiguousarray(columns[:, 0]),
+        start_time=np.ascontiguousarray(columns[:, 1]),
+        end_time=np.ascontiguousarray(columns[:, 2]),
+        load_seconds=time.perf_counter() - started,
+    )
+
+
+class SessionColumns:
+    """The snapshot for the current sessions version; concurrent requests
+    after a write wait for one reload rather than each loading their own
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[ColumnSnapshot] = None
+        self._lock = asyncio.Lock()
+        self.loads = 0
+
+    async def get(self, db: databases.Database, version: int) -> ColumnSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        async with self._lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                archives = await archive_catalog.archives(db, version)
+                self._snapshot = await load_snapshot(db, archives, version)
+                self.loads += 1
+            return self._snapshot
+
+    def clear(self) -> None:
+        self._snapshot = None
+
+
+session_columns = SessionColumns()
+
+
+def analyze(
+    snapshot: ColumnSnapshot,
+    start_after: Optional[int] = None,
+    start_before: Optional[int] = None,
+    project_id: Optional[int] = None
+) -> list[dict]:
+    """Statistics per project for sessions starting in [start_after, start_before).
+
+    Days and hours are UTC, weeks start on Monday. A streak is a run of
+    consecutive days on which at least one session started.
+    """
+    np = _numpy()
+    mask = np.ones(snapshot.rows, dtype=bool)
+    if start_after is not None:
+        mask &= snapshot.start_time >= start_after
+    if start_before is not None:
+        mask &= snapshot.start_time < start_before
+    if project_id is not None:
+        mask &= snapshot.project_id == project_id
+    projects = snapshot.project_id[mask]
+    starts = snapshot.start_time[mask]
+    if len(projects) == 0:
+        return []
+    durations = np.maximum(snapshot.end_time[mask] - starts, 0) / US_PER_SECOND
+
+    # Rows stay sorted by project, so each project is a contiguous group
+    group_starts = np.flatnonzero(np.r_[True, projects[1:] != projects[:-1]])
+    counts = np.diff(np.r_[group_starts, len(projects)])
+    groups = len(group_starts)
+    group_of_row = np.repeat(np.arange(groups), counts)
+    totals = np.add.reduceat(durations, group_starts)
+
+    # Percentiles by linear interpolation (as numpy.percentile) within each
+    # group; sorting each group's slice is several times faster than one
+    # lexsort over (group, duration)
+    sorted_durations = np.concatenate([np.sort(group) for group in np.split(durations, group_starts[1:])])
+    percentiles = {}
+    for percentile in PERCENTILES:
+        position = (counts - 1) * (percentile / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        low_values = sorted_durations[group_starts + lower]
+        high_values = sorted_durations[group_starts + upper]
+        percentiles[f"p{percentile}"] = low_values + (high_values - low_values) * (position - lower)
+
+    bins = len(HISTOGRAM_EDGES)
+    bin_of_row = np.searchsorted(HISTOGRAM_EDGES, durations, side="right") - 1
+    histogram = np.bincount(group_of_row * bins + bin_of_row, minlength=groups * bins).reshape(groups, bins)
+
+    days = starts // US_PER_DAY
+    hours = (starts % US_PER_DAY) // US_PER_HOUR
+    # 1970-01-01 was a Thursday
+    weekdays = (days + 3) % 7
+    heatmap = np.bincount(
+        group_of_row * 168 + weekdays * 24 + hours, minlength=groups * 168
+    ).reshape(groups, 7, 24)
+
+    # Within a group rows are sorted by start, so days are non-decreasing
+    new_group = np.zeros(len(days), dtype=bool)
+    new_group[group_starts] = True
+    first_of_day = new_group | np.r_[True, days[1:] != days[:-1]]
+    active_groups = group_of_row[first_of_day]
+    active_days = days[first_of_day]
+    run_starts = new_group[first_of_day] | np.r_[True, np.diff(active_days) != 1]
+    run_ids = np.cumsum(run_starts) - 1
+    run_lengths = np.bincount(run_ids)
+    longest_streaks = np.zeros(groups, dtype=np.int64)
+    np.maximum.at(longest_streaks, active_groups[run_starts], run_lengths)
+    days_per_group = np.bincount(active_groups, minlength=groups)
+
+    return [
+        {
+            "project_id": int(projects[start]),
+            "sessions": int(counts[index]),
+            "total_seconds": round(float(totals[index]), 3),
+            "mean_seconds": round(float(totals[index] / counts[index]), 3),
+            "percentiles": {name: round(float(values[index]), 3) for name, values in percentiles.items()},
+            "histogram": [
+                {
+                    "min_seconds": HISTOGRAM_EDGES[bin_index],
+                    "max_seconds": HISTOGRAM_EDGES[bin_index + 1] if bin_index + 1 < bins else None,
+                    "count": int(count),
+                }
+                for bin_index, count in enumerate(histogram[index])
+            ],
+            "active_days": int(days_per_group[index]),
+            "longest_streak_days": int(longest_streaks[index]),
+            "heatmap": heatmap[index].tolist(),
+        }
+        for index, start in enumerate(group_starts)
+    ]
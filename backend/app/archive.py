@@ -0,0 +1,470 @@
+"""
+Hot/cold archival of old sessions.
+Closed sessions that started and were created before a cutoff are moved
+out of the sessions table into one SQLite file per start year
+(<database name>-archive-<year>.db, next to the database or in ARCHIVE_DIR),
+each recorded in the session_archives catalog with its id and time ranges.
+Reads ATTACH an archive to the connection that needs it, and only when the
+query reaches the archive's ranges, so the hot table and its indexes stay
+small enough to live in the page cache.
+
+Counters and daily rollups keep counting archived sessions (the triggers
+skip moves, see migration 7), so totals and reports never read archives.
+
+Each batch commits the copy into the archive before deleting from the hot
+table: with WAL, a transaction spanning attached files is only atomic per
+file, so an interrupted move leaves a session in both places rather than
+in neither. Reads skip archived rows that are also hot, and the next run
+removes them.
+
+Run from the backend directory (or set ARCHIVE_INTERVAL_SECONDS to run it
+in the background):
+    python3 -m app.archive --older-than-days 365
+"""
+import argparse
+import asyncio
+import heapq
+import logging
+import os
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+import databases
+from databases.core import Connection
+
+from app.events import session_events
+from app.models import now_epoch_us, to_epoch_us
+
+# Directory for archive files (default: the database file's directory)
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR")
+# Sessions older than this many days are archived
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+# Set above 0 to archive in the background every this many seconds
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "0"))
+# Sessions moved per pair of transactions; the writer connection is
+# released between batches, so other writers are held up for one batch at most
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+
+# Archives kept attached per connection, least recently used detached
+# first (SQLite allows 10 attached databases by default)
+ARCHIVE_MAX_ATTACHED = 8
+
+US_PER_DAY = 86_400_000_000
+
+# Same columns as sessions (without AUTOINCREMENT or the foreign key, as
+# ids come from the hot table) and the indexes the list filters use
+ARCHIVE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.sessions (
+        id INTEGER PRIMARY KEY,
+        project_id INTEGER NOT NULL,
+        start_time INTEGER NOT NULL,
+        end_time INTEGER,
+        created_at INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_sessions_created_at_id ON sessions (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_sessions_start_time ON sessions (start_time)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_sessions_project_created_at_id ON sessions (project_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_sessions_project_start_time ON sessions (project_id, start_time)",
+]
+
+# Closed sessions that started in [:year_start, :year_end) and before the
+# cutoff, oldest first (a range of idx_sessions_start_time)
+ARCHIVE_CANDIDATES_QUERY = """
+    SELECT id FROM sessions
+    WHERE start_time >= :year_start AND start_time < :year_end
+    AND end_time IS NOT NULL AND created_at < :cutoff
+    ORDER BY start_time
+    LIMIT :limit
+"""
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ArchiveFile:
+    year: int
+    file: str
+    min_id: int
+    max_id: int
+    min_start_time: int
+    max_start_time: int
+    min_created_at: int
+    max_created_at: int
+
+    @property
+    def schema(self) -> str:
+        """Name the archive is attached under"""
+        return f"archive_{self.year}"
+
+    @property
+    def table(self) -> str:
+        return f"{self.schema}.sessions"
+
+    def reaches(self, start_after: Optional[int] = None, start_before: Optional[int] = None, open_only: bool = False) -> bool:
+        """Whether sessions matching the list filters (epoch us) may be archived here"""
+        if open_only:
+            return False
+        if start_after is not None and self.max_start_time < start_after:
+            return False
+        if start_before is not None and self.min_start_time >= start_before:
+            return False
+        return True
+
+    def shadow_condition(self) -> str:
+        """SQL condition skipping archived rows that are also in the hot table"""
+        return f"NOT EXISTS (SELECT 1 FROM main.sessions AS hot WHERE hot.id = {self.table}.id)"
+
+
+async def load_catalog(db: databases.Database) -> list[ArchiveFile]:
+    rows = await db.fetch_all("SELECT * FROM session_archives ORDER BY year")
+    names = [field.name for field in fields(ArchiveFile)]
+    return [ArchiveFile(**{name: row[name] for name in names}) for row in rows]
+
+
+class ArchiveCatalog:
+    """The session_archives catalog, cached for one version of the sessions
+    table (every move changes it, in whichever process it ran)
+    """
+
+    def __init__(self):
+        self._version: Optional[int] = None
+        self._archives: list[ArchiveFile] = []
+
+    async def archives(self, db: databases.Database, version: int) -> list[ArchiveFile]:
+        if version != self._version:
+            self._archives = await load_catalog(db)
+            self._version = version
+        return self._archives
+
+    def clear(self) -> None:
+        self._version = None
+        self._archives = []
+
+
+archive_catalog = ArchiveCatalog()
+
+
+def archive_directory(db: databases.Database) -> str:
+    return ARCHIVE_DIR or os.path.dirname(os.path.abspath(db.url.database))
+
+
+def archive_file_name(db: databases.Database, year: int) -> str:
+    stem = os.path.splitext(os.path.basename(db.url.database))[0]
+    return f"{stem}-archive-{year}.db"
+
+
+# Schemas attached to each raw connection, least recently used first
+_attached: "weakref.WeakKeyDictionary[object, OrderedDict[str, None]]" = weakref.WeakKeyDictionary()
+
+
+async def attach(connection: Connection, path: str, schema: str) -> None:
+    """Attach the file at path as schema, unless it already is.
+    Must be called outside a transaction.
+    """
+    attached = _attached.setdefault(connection.raw_connection, OrderedDict())
+    if schema in attached:
+        attached.move_to_end(schema)
+        return
+    while len(attached) >= ARCHIVE_MAX_ATTACHED:
+        oldest, _ = attached.popitem(last=False)
+        await connection.execute(f"DETACH DATABASE {oldest}")
+    await connection.execute(f"ATTACH DATABASE :path AS {schema}", {"path": path})
+    attached[schema] = None
+
+
+@asynccontextmanager
+async def archive_connection(db: databases.Database, *archives: ArchiveFile) -> AsyncIterator[Connection]:
+    """Hold a connection with the archives (at most ARCHIVE_MAX_ATTACHED)
+    attached; queries made through db inside the block (in this task) run on it
+    """
+    async with db.connection() as connection:
+        for archive in archives:
+            await attach(connection, os.path.join(archive_directory(db), archive.file), archive.schema)
+        yield connection
+
+
+async def fetch_archived(
+    db: databases.Database,
+    archives: list[ArchiveFile],
+    ids: list[int],
+    chunk_size: int = 500
+) -> dict:
+    """Archived session rows by id, for the ids that are not in the hot table"""
+    rows_by_id = {}
+    for archive in archives:
+        wanted = [session_id for session_id in ids if archive.min_id <= session_id <= archive.max_id]
+        wanted = [session_id for session_id in wanted if session_id not in rows_by_id]
+        if not wanted:
+            continue
+        async with archive_connection(db, archive):
+            for start in range(0, len(wanted), chunk_size):
+                values = {f"id{index}": session_id for index, session_id in enumerate(wanted[start:start + chunk_size])}
+                placeholders = ", ".join(f":{name}" for name in values)
+                rows = await db.fetch_all(
+                    f"""
+                    SELECT * FROM {archive.schema}.sessions
+                    WHERE id IN ({placeholders}) AND {archive.shadow_condition()}
+                    """,
+                    values
+                )
+                rows_by_id.update((row["id"], row) for row in rows)
+    return rows_by_id
+
+
+async def iterate_sessions(
+    db: databases.Database,
+    archives: list[ArchiveFile],
+    batch_size: int = 500
+) -> AsyncIterator:
+    """Every session, hot and archived, in id order.
+
+    Each source is read in keyset batches and the batches merged, so no
+    statement stays open between rows (another source's query can run) and
+    only one archive needs to be attached at a time.
+    """
+    if not archives:
+        async for row in db.iterate("SELECT * FROM sessions ORDER BY id"):
+            yield row
+        return
+
+    async def batches(archive: Optional[ArchiveFile]) -> AsyncIterator:
+        last_id = 0
+        while True:
+            values = {"last_id": last_id, "limit": batch_size}
+            if archive is None:
+                rows = await db.fetch_all(
+                    "SELECT * FROM sessions WHERE id > :last_id ORDER BY id LIMIT :limit", values
+                )
+            else:
+                async with archive_connection(db, archive):
+                    rows = await db.fetch_all(
+                        f"""
+                        SELECT * FROM {archive.schema}.sessions
+                        WHERE id > :last_id AND {archive.shadow_condition()}
+                        ORDER BY id LIMIT :limit
+                        """,
+                        values
+                    )
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]["id"]
+
+    sources = [batches(None)] + [batches(archive) for archive in archives]
+    heap = []
+    for index, source in enumerate(sources):
+        row = await anext(source, None)
+        if row is not None:
+            heap.append((row["id"], index, row))
+    heapq.heapify(heap)
+    while heap:
+        _, index, row = heapq.heappop(heap)
+        yield row
+        row = await anext(sources[index], None)
+        if row is not None:
+            heapq.heappush(heap, (row["id"], index, row))
+
+
+def _year_bounds(year: int) -> tuple[int, int]:
+    return (
+        to_epoch_us(datetime(year, 1, 1, tzinfo=timezone.utc)),
+        to_epoch_us(datetime(year + 1, 1, 1, tzinfo=timezone.utc)),
+    )
+
+
+async def _open_archive(db: databases.Database, connection: Connection, year: int) -> ArchiveFile:
+    """Attach (creating if needed) the archive for year on the writer connection"""
+    archive = ArchiveFile(year, archive_file_name(db, year), 0, 0, 0, 0, 0, 0)
+    await attach(connection, os.path.join(archive_directory(db), archive.file), archive.schema)
+    await connection.execute(f"PRAGMA {archive.schema}.journal_mode = WAL")
+    for statement in ARCHIVE_SCHEMA:
+        await connection.execute(statement.format(schema=archive.schema))
+    # Copies left behind by an interrupted move or restore: the hot row wins
+    await connection.execute(f"""
+        DELETE FROM {archive.schema}.sessions WHERE id IN (
+            SELECT id FROM main.sessions WHERE id >= (SELECT MIN(id) FROM {archive.schema}.sessions)
+        )
+    """)
+    return archive
+
+
+async def _move_batch(connection: Connection, archive: ArchiveFile, cutoff: int, limit: int) -> int:
+    """Move up to limit sessions of archive's year; returns how many moved"""
+    schema = archive.schema
+    year_start, year_end = _year_bounds(archive.year)
+    await connection.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)")
+    # Copy, and commit the archive first
+    async with connection.transaction():
+        await connection.execute("DELETE FROM temp.archive_batch")
+        await connection.execute(
+            f"INSERT INTO temp.archive_batch (id) {ARCHIVE_CANDIDATES_QUERY}",
+            {"year_start": year_start, "year_end": min(year_end, cutoff), "cutoff": cutoff, "limit": limit}
+        )
+        await connection.execute(f"""
+            INSERT OR REPLACE INTO {schema}.sessions
+            SELECT * FROM main.sessions WHERE id IN (SELECT id FROM temp.archive_batch)
+        """)
+    # Delete the hot rows whose copies are still identical (an update since
+    # the copy keeps the row hot), with the counters left as they are
+    async with connection.transaction():
+        await connection.execute(f"""
+            DELETE FROM temp.archive_batch WHERE NOT EXISTS (
+                SELECT 1 FROM main.sessions AS hot JOIN {schema}.sessions AS archived ON archived.id = hot.id
+                WHERE hot.id = temp.archive_batch.id
+                AND archived.project_id = hot.project_id AND archived.start_time = hot.start_time
+                AND archived.end_time IS hot.end_time AND archived.created_at = hot.created_at
+            )
+        """)
+        moved = await connection.fetch_one("""
+            SELECT COUNT(*) AS moved, MIN(id) AS min_id, MAX(id) AS max_id,
+                MIN(start_time) AS min_start_time, MAX(start_time) AS max_start_time,
+                MIN(created_at) AS min_created_at, MAX(created_at) AS max_created_at
+            FROM main.sessions WHERE id IN (SELECT id FROM temp.archive_batch)
+        """)
+        if not moved["moved"]:
+            return 0
+        await connection.execute("UPDATE archive_state SET moving = 1")
+        await connection.execute("DELETE FROM main.sessions WHERE id IN (SELECT id FROM temp.archive_batch)")
+        await connection.execute("UPDATE archive_state SET moving = 0")
+        await connection.execute(
+            """
+            INSERT INTO session_archives (
+                year, file, min_id, max_id, min_start_time, max_start_time, min_created_at, max_created_at
+            ) VALUES (
+                :year, :file, :min_id, :max_id, :min_start_time, :max_start_time, :min_created_at, :max_created_at
+            )
+            ON CONFLICT (year) DO UPDATE SET
+                min_id = MIN(min_id, excluded.min_id),
+                max_id = MAX(max_id, excluded.max_id),
+                min_start_time = MIN(min_start_time, excluded.min_start_time),
+                max_start_time = MAX(max_start_time, excluded.max_start_time),
+                min_created_at = MIN(min_created_at, excluded.min_created_at),
+                max_created_at = MAX(max_created_at, excluded.max_created_at)
+            """,
+            {
+                "year": archive.year,
+                "file": archive.file,
+                "min_id": moved["min_id"],
+                "max_id": moved["max_id"],
+                "min_start_time": moved["min_start_time"],
+                "max_start_time": moved["max_start_time"],
+                "min_created_at": moved["min_created_at"],
+                "max_created_at": moved["max_created_at"],
+            }
+        )
+    return moved["moved"]
+
+
+async def archive_sessions(
+    db: databases.Database,
+    cutoff: int,
+    batch_size: int = ARCHIVE_BATCH_SIZE
+) -> dict[int, int]:
+    """Move closed sessions that started and were created before cutoff
+    (epoch us) into their start year's archive.
+
+    Returns:
+        The number of sessions moved, by year.
+    """
+    moved: dict[int, int] = {}
+    while True:
+        first = await db.fetch_val(
+            """
+            SELECT MIN(start_time) FROM sessions
+            WHERE start_time < :cutoff AND end_time IS NOT NULL AND created_at < :cutoff
+            """,
+            {"cutoff": cutoff}
+        )
+        if first is None:
+            return moved
+        year = datetime.fromtimestamp(first // 1_000_000, timezone.utc).year
+        moved_this_year = 0
+        archive = None
+        while True:
+            # The writer connection is taken per batch, so writers waiting
+            # for it get in between batches rather than after the whole year
+            async with db.connection() as connection:
+                if archive is None:
+                    archive = await _open_archive(db, connection, year)
+                else:
+                    await attach(connection, os.path.join(archive_directory(db), archive.file), archive.schema)
+                count = await _move_batch(connection, archive, cutoff, batch_size)
+            if not count:
+                break
+            session_events.count_local_changes(count)
+            moved_this_year += count
+            # Released: let a waiting writer take it before the next batch
+            await asyncio.sleep(0)
+        if not moved_this_year:
+            # The candidates all changed while being copied; the next run retries
+            return moved
+        moved[year] = moved.get(year, 0) + moved_this_year
+
+
+async def restore_session(db: databases.Database, session_id: int) -> bool:
+    """Move an archived session back into the sessions table, e.g. to
+    update it. Returns False if no archive has it.
+    """
+    for archive in await load_catalog(db):
+        if not archive.min_id <= session_id <= archive.max_id:
+            continue
+        async with archive_connection(db, archive) as connection:
+            values = {"session_id": session_id}
+            async with connection.transaction():
+                await connection.execute("UPDATE archive_state SET moving = 1")
+                await connection.execute(
+                    f"INSERT OR IGNORE INTO main.sessions SELECT * FROM {archive.schema}.sessions WHERE id = :session_id",
+                    values
+                )
+                restored = (await connection.fetch_val("SELECT changes()")) > 0
+                await connection.execute("UPDATE archive_state SET moving = 0")
+            if restored:
+                session_events.count_local_changes(1)
+            # After the hot copy is committed, as when archiving
+            await connection.execute(f"DELETE FROM {archive.schema}.sessions WHERE id = :session_id", values)
+        if restored:
+            return True
+    return False
+
+
+async def archive_periodically(db: databases.Database, interval: float, days: int) -> None:
+    """Archive sessions older than days every interval seconds, until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            moved = await archive_sessions(db, now_epoch_us() - days * US_PER_DAY)
+        except Exception:  # Keep the job running; the next run picks up the rest
+            logger.exception("Session archival failed")
+            continue
+        if moved:
+            logger.info("Archived %d sessions (%s)", sum(moved.values()), moved)
+
+
+async def main(days: int, batch_size: int):
+    from app.database import database, init_db
+
+    await database.connect()
+    try:
+        await init_db()
+        moved = await archive_sessions(database, now_epoch_us() - days * US_PER_DAY, batch_size)
+        for year, count in sorted(moved.items()):
+            print(f"{year}: archived {count} sessions into {archive_file_name(database, year)}")
+        if not moved:
+            print("Nothing to archive")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old sessions into per-year archive databases")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS, help="Archive sessions older than this")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="Sessions moved per transaction")
+    args = parser.parse_args()
+    asyncio.run(main(args.older_than_days, args.batch_size))
@@ -0,0 +1,125 @@
+"""
+Bounded in-process LRU cache for serialized responses.
+Entries are stamped with the cache generation they were computed under;
+writers bump the generation so every older entry becomes a miss.
+When several worker processes serve the same database, a write in one
+worker cannot bump the others' generations, so lookups first compare the
+table's data version (table_versions, bumped by triggers) with the last
+one seen and invalidate when it moved.
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import databases
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+# Worker processes, as read by uvicorn --workers
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Check the data version on each lookup; needed whenever other processes write
+RESPONSE_CACHE_CHECK_VERSION = os.getenv(
+    "RESPONSE_CACHE_CHECK_VERSION", "1" if WEB_CONCURRENCY > 1 else "0"
+) == "1"
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        enabled: bool = True,
+        table: Optional[str] = None,
+        check_version: bool = False
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.table = table
+        self.check_version = check_version and table is not None
+        self.data_version: Optional[int] = None
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[int, float, bytes]] = OrderedDict()
+    
+    async def sync(self, db: databases.Database) -> None:
+        """Invalidate if the table changed since the last lookup, possibly in
+        another process. Call before get(); a no-op unless check_version is set.
+        
+        The version is read before the caller's query, so an entry is never
+        stored under a newer version than the data it was computed from.
+        """
+        if not self.enabled or not self.check_version:
+            return
+        self.observe_version(await db.fetch_val(
+            "SELECT version FROM table_versions WHERE name = :name", {"name": self.table}
+        ))
+    
+    def observe_version(self, version: int) -> None:
+        """Like sync(), for callers that have already read the version"""
+        if not self.enabled or not self.check_version:
+            return
+        if version != self.data_version:
+            if self.data_version is not None:
+                self.invalidate()
+            self.data_version = version
+    
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Return the cached body for key, or None if missing, stale or expired"""
+        entry = self._entries.get(key) if self.enabled else None
+        if entry is not None:
+            generation, expires_at, body = entry
+            if generation == self.generation and expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+            del self._entries[key]
+        self.misses += 1
+        return None
+    
+    def set(self, key: Hashable, body: bytes, generation: int) -> None:
+        """Store body computed under generation (read before querying).
+        
+        Bodies computed before a concurrent write finished are dropped.
+        """
+        if not self.enabled or generation != self.generation:
+            return
+        self._entries[key] = (generation, time.monotonic() + self.ttl_seconds, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self) -> None:
+        """Make every cached entry stale; call after each committed write"""
+        self.generation += 1
+        self._entries.clear()
+    
+    def clear(self) -> None:
+        """Drop all entries and reset counters"""
+        self.invalidate()
+        self.data_version = None
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "generation": self.generation,
+            "check_version": self.check_version,
+            "data_version": self.data_version,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Cache for GET /api/sessions and GET /api/sessions/{id}
+session_cache = ResponseCache(
+    RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, RESPONSE_CACHE_ENABLED, "sessions", RESPONSE_CACHE_CHECK_VERSION
+)
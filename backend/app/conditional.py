@@ -0,0 +1,110 @@
+"""
+HTTP conditional requests for the read routes.
+Validators come from table_versions rather than from the response body:
+the ETag is the table's version (plus the representation, e.g. columnar)
+and Last-Modified its last change, so a repeat request costs one primary
+key lookup and, when nothing changed, no main query and an empty 304.
+The version is read before the main query, so a body is never labelled
+with a newer version than the data it was built from.
+"""
+import os
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+import databases
+from fastapi import Request
+from fastapi.responses import Response
+
+# Revalidate on every use; a 304 costs one indexed lookup
+CACHE_CONTROL_REVALIDATE = "no-cache"
+# Projects are seeded once and rarely change
+PROJECTS_CACHE_MAX_AGE = int(os.getenv("PROJECTS_CACHE_MAX_AGE", "300"))
+
+# Suffixes CompressionMiddleware adds to the ETags of compressed bodies
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+@dataclass
+class TableState:
+    table: str
+    version: int
+    modified_at: int
+
+    def etag(self, variant: str = "") -> str:
+        """Strong ETag for a representation of data from this table"""
+        return f'"{self.table}-{self.version}{"-" + variant if variant else ""}"'
+
+    def last_modified(self) -> str:
+        return formatdate(self.modified_at // 1_000_000, usegmt=True)
+
+
+async def table_state(db: databases.Database, table: str) -> TableState:
+    row = await db.fetch_one(
+        "SELECT version, modified_at FROM table_versions WHERE name = :name", {"name": table}
+    )
+    return TableState(table, row["version"], row["modified_at"])
+
+
+def _opaque_tag(tag: str) -> str:
+    """Normalize an entity tag for comparison: no weak prefix or encoding suffix"""
+    tag = tag.strip().removeprefix("W/")
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def not_modified_tag(request: Request, etag: str, state: TableState) -> Optional[str]:
+    """Evaluate If-None-Match, or failing that If-Modified-Since (RFC 9110).
+
+    Returns:
+        The ETag to send with a 304 (the matching tag as the client sent it,
+        so an encoding suffix from CompressionMiddleware is kept), or None
+        if the client's copy is not current.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return etag
+            if _opaque_tag(tag) == etag:
+                return tag.removeprefix("W/")
+        return None
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        # Dates have whole seconds, so compare at that precision: a client
+        # sending back our Last-Modified gets a 304 (a later write within
+        # the same second is only told apart by If-None-Match)
+        if state.modified_at // 1_000_000 <= int(since.timestamp()):
+            return etag
+    return None
+
+
+async def check_conditional(
+    request: Request,
+    db: databases.Database,
+    table: str,
+    variant: str = "",
+    cache_control: str = CACHE_CONTROL_REVALIDATE
+) -> tuple[TableState, dict[str, str], Optional[Response]]:
+    """Read the table's state and evaluate the request's preconditions.
+
+    Returns:
+        The table state, the validator headers to send with the response,
+        and a 304 response to return instead when the client's copy is current.
+    """
+    state = await table_state(db, table)
+    etag = state.etag(variant)
+    headers = {"ETag": etag, "Last-Modified": state.last_modified(), "Cache-Control": cache_control}
+    matched = not_modified_tag(request, etag, state)
+    if matched is not None:
+        # The 200 it stands for may have been compressed, so it varies the same way
+        not_modified_headers = {**headers, "ETag": matched, "Vary": "Accept-Encoding"}
+        return state, headers, Response(status_code=304, headers=not_modified_headers)
+    return state, headers, None
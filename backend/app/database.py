@@ -1,48 +1,79 @@
 import databases
 import os
 from typing import AsyncGenerator
+from app.metrics import instrument
+from app.migrations import migrate
+from app.sqlite_pool import SQLiteProfile
 
 # Database URL - supports SQLite, PostgreSQL, MySQL, etc.
 # Default: local development uses ./measured.db
 # Production (Fly.io): uses /data/measured.db (set via environment variable)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./measured.db")
 
-# Create database instance
-database = databases.Database(DATABASE_URL)
+# SQLite connection settings, overridable via SQLITE_* environment variables
+SQLITE_PROFILE = SQLiteProfile.from_env()
+
+
+class UnpooledDatabase(databases.Database):
+    """In-memory SQLite database, with the profile's foreign key setting"""
+    SUPPORTED_BACKENDS = {
+        **databases.Database.SUPPORTED_BACKENDS,
+        "sqlite": "app.sqlite_pool:UnpooledSQLiteBackend",
+    }
+
+
+class Database(databases.Database):
+    """Database whose SQLite connections come from a pool tuned by SQLITE_PROFILE"""
+    SUPPORTED_BACKENDS = {
+        **databases.Database.SUPPORTED_BACKENDS,
+        "sqlite": "app.sqlite_pool:PooledSQLiteBackend",
+    }
+
+
+def create_database(url: str, read_only: bool = False, profile: SQLiteProfile | None = None) -> databases.Database:
+    """Create a database instance for url.
+    
+    SQLite files get a pooled backend that applies the profile's pragmas:
+    a single writer connection, or a pool of query-only connections when
+    read_only is set. In-memory SQLite databases are not pooled but still
+    enforce foreign keys, which `POST /api/sessions` relies on. Other URLs
+    use the stock `databases` backend.
+    """
+    profile = profile if profile is not None else SQLITE_PROFILE
+    url_obj = databases.DatabaseURL(url)
+    if url_obj.scheme != "sqlite":
+        return databases.Database(url)
+    if url_obj.database in ("", ":memory:"):
+        return UnpooledDatabase(url, profile=profile)
+    pool_size = profile.read_pool_size if read_only else 1
+    return Database(url, profile=profile, read_only=read_only, pool_size=pool_size)
+
+
+# Create database instances: all writes go through `database`, reads through
+# `read_database` so concurrent reads are not queued behind the writer
+database = create_database(DATABASE_URL)
+read_database = create_database(DATABASE_URL, read_only=True)
+
+# What request handlers receive: the same databases, with query timing
+instrumented_database = instrument(database)
+instrumented_read_database = instrument(read_database)
 
 
 async def get_db() -> AsyncGenerator[databases.Database, None]:
     """Dependency for getting database connection"""
-    yield database
+    yield instrumented_database
+
+
+async def get_read_db() -> AsyncGenerator[databases.Database, None]:
+    """Dependency for getting a read-only database connection"""
+    yield instrumented_read_database
 
 
 async def init_db(db: databases.Database | None = None):
-    """Initialize database tables.
+    """Initialize database tables by applying pending schema migrations.
     
     Args:
         db: Optional database instance. If not provided, uses the global database instance.
     """
     target_db = db if db is not None else database
-    
-    # Create projects table
-    await target_db.execute("""
-        CREATE TABLE IF NOT EXISTS projects (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE
-        )
-    """)
-    
-    # Create sessions table
-    # Using TIMESTAMP for cross-database compatibility
-    # SQLite stores as TEXT but accepts TIMESTAMP type
-    # PostgreSQL and MySQL use native TIMESTAMP/DATETIME types
-    await target_db.execute("""
-        CREATE TABLE IF NOT EXISTS sessions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            project_id INTEGER NOT NULL,
-            start_time TIMESTAMP NOT NULL,
-            end_time TIMESTAMP,
-            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (project_id) REFERENCES projects(id)
-        )
-    """)
+    await migrate(target_db)
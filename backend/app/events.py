@@ -0,0 +1,167 @@
+"""
+In-process broadcaster for the session change feed (GET /api/sessions/stream).
+Writers publish an event per changed session; each connected client has a
+bounded queue, and a client that falls behind by a full queue is dropped
+(its stream ends, and EventSource reconnects and resumes). Recent events are
+kept in a replay buffer so a reconnecting client that sends Last-Event-ID
+gets what it missed; if that is no longer buffered it gets a "resync" event
+telling it to refetch.
+Event IDs are "<stream>-<sequence>", where the stream token is new in every
+process, so an ID from another worker or before a restart also means resync.
+"""
+import asyncio
+import logging
+import os
+import secrets
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+import databases
+
+SESSION_STREAM_QUEUE_SIZE = int(os.getenv("SESSION_STREAM_QUEUE_SIZE", "100"))
+SESSION_STREAM_REPLAY_SIZE = int(os.getenv("SESSION_STREAM_REPLAY_SIZE", "256"))
+SESSION_STREAM_HEARTBEAT_SECONDS = float(os.getenv("SESSION_STREAM_HEARTBEAT_SECONDS", "15"))
+# With several workers, how often to check for writes made by the others
+SESSION_STREAM_POLL_SECONDS = float(os.getenv("SESSION_STREAM_POLL_SECONDS", "1"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Event:
+    id: str
+    type: str
+    data: bytes
+
+    def encode(self) -> bytes:
+        """Encode as an SSE message (data is single-line JSON)"""
+        return b"id: %s\nevent: %s\ndata: %s\n\n" % (self.id.encode(), self.type.encode(), self.data)
+
+
+@dataclass(eq=False)
+class Subscription:
+    queue: asyncio.Queue
+    # Replayed events, sent before anything from the queue
+    backlog: list[Event] = field(default_factory=list)
+    dropped: bool = False
+
+
+class Broadcaster:
+    def __init__(self, queue_size: int, replay_size: int):
+        self.queue_size = queue_size
+        self.stream = secrets.token_hex(4)
+        self.published = 0
+        self.dropped = 0
+        self._sequence = 0
+        self._replay: deque[tuple[int, Event]] = deque(maxlen=replay_size)
+        self._subscribers: set[Subscription] = set()
+        # Row changes published since the watcher last read table_versions
+        self._local_changes = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, data: bytes, rows: int = 1) -> Event:
+        """Send an event to every subscriber; rows is how many rows the
+        change touched (bulk writes publish one event for many rows)
+        """
+        self._sequence += 1
+        event = Event(f"{self.stream}-{self._sequence}", event_type, data)
+        self._replay.append((self._sequence, event))
+        self._local_changes += rows
+        self.published += 1
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+        return event
+
+    def count_local_changes(self, rows: int) -> None:
+        """Record rows changed here that are not published (archive moves
+        and restores), so the watcher does not take them for another
+        process's writes
+        """
+        self._local_changes += rows
+
+    def _drop(self, subscription: Subscription) -> None:
+        """Disconnect a subscriber whose queue is full"""
+        self._subscribers.discard(subscription)
+        subscription.dropped = True
+        self.dropped += 1
+        # Wake the stream so it ends now rather than after draining its queue
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """Register a client, replaying events after last_event_id if given"""
+        subscription = Subscription(asyncio.Queue(self.queue_size))
+        if last_event_id:
+            subscription.backlog = self._replay_after(last_event_id)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def _replay_after(self, last_event_id: str) -> list[Event]:
+        stream, _, sequence = last_event_id.partition("-")
+        if stream == self.stream and sequence.isdigit():
+            sequence = int(sequence)
+            oldest = self._replay[0][0] if self._replay else self._sequence + 1
+            # Everything after sequence is still buffered
+            if oldest <= sequence + 1 and sequence <= self._sequence:
+                return [event for number, event in self._replay if number > sequence]
+        return [self.resync_event()]
+
+    def resync_event(self) -> Event:
+        """An event telling the client to refetch, as the last one it saw
+        cannot be resumed from (its ID keeps later resumes on this stream)
+        """
+        return Event(f"{self.stream}-{self._sequence}", "resync", b"{}")
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    async def watch(self, db: databases.Database, table: str, interval: float) -> None:
+        """Publish "resync" when the table changed by more rows than were
+        published here, i.e. another process wrote to it. Runs until cancelled.
+
+        Writes here are counted when published, just after they commit, so
+        a poll in between sees the change first; rows the next poll still
+        cannot account for are taken as another process's.
+        """
+        last_version = None
+        unexplained = 0
+        while True:
+            await asyncio.sleep(interval)
+            if not self._subscribers and last_version is not None:
+                continue
+            try:
+                version = await db.fetch_val(
+                    "SELECT version FROM table_versions WHERE name = :name", {"name": table}
+                )
+            except Exception:  # Keep watching; a missed poll only delays a resync
+                logger.exception("Change feed poll failed")
+                continue
+            local_changes, self._local_changes = self._local_changes, 0
+            if last_version is not None:
+                late = min(unexplained, local_changes)
+                if unexplained > late:
+                    self.publish("resync", b"{}", rows=0)
+                unexplained = max(0, version - last_version - (local_changes - late))
+            last_version = version
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self.subscribers,
+            "published": self.published,
+            "dropped": self.dropped,
+            "queue_size": self.queue_size,
+            "replay_size": self._replay.maxlen,
+        }
+
+
+# Change feed for sessions: create_session, update_session and the bulk
+# endpoint publish to it
+session_events = Broadcaster(SESSION_STREAM_QUEUE_SIZE, SESSION_STREAM_REPLAY_SIZE)
@@ -1,9 +1,18 @@
 """
 Script to initialize the database with hardcoded projects.
 Run this once to populate the projects table.
+
+Optionally seed a synthetic session history for load testing:
+    python3 -m app.init_db --seed-sessions 1000000
 """
+import argparse
 import asyncio
+import random
+import time
+from itertools import islice
+import databases
 from app.database import database, init_db
+from app.models import now_epoch_us
 
 # Hardcoded projects
 PROJECTS = [
@@ -14,6 +23,18 @@ PROJECTS = [
     "Hobbies"
 ]
 
+# Relative share of sessions per project, in PROJECTS order
+PROJECT_WEIGHTS = [50, 15, 15, 10, 10]
+
+# Rows inserted per executemany call while seeding
+SEED_CHUNK_SIZE = 10_000
+
+US_PER_MINUTE = 60_000_000
+US_PER_DAY = 24 * 60 * US_PER_MINUTE
+
+# Default span of the synthetic history
+SEED_HISTORY_DAYS = 3 * 365
+
 
 async def init_projects():
     """Initialize projects in the database"""
@@ -35,15 +56,76 @@ async def init_projects():
     print(f"Initialized {len(PROJECTS)} projects: {', '.join(PROJECTS)}")
 
 
-async def main():
+def generate_history(count: int, project_ids: list[int], end_us: int, days: int = SEED_HISTORY_DAYS, seed: int = 0):
+    """Yield (project_id, start_time, end_time, created_at) rows for count
+    sessions spread over the days before end_us, oldest first.
+    
+    Sessions start during the day (07:00-23:00 UTC), mostly last between
+    10 minutes and 2 hours (long tail up to 8 hours), and about 1 in 1000
+    is still open. created_at is when the session was stopped (or started,
+    if still open).
+    """
+    rng = random.Random(seed)
+    weights = PROJECT_WEIGHTS[:len(project_ids)] + [10] * (len(project_ids) - len(PROJECT_WEIGHTS))
+    first_day = end_us // US_PER_DAY - days
+    starts = sorted(
+        (first_day + rng.randrange(days)) * US_PER_DAY + rng.randrange(7 * 60, 23 * 60) * US_PER_MINUTE
+        for _ in range(count)
+    )
+    projects = rng.choices(project_ids, weights=weights, k=count)
+    for project_id, start in zip(projects, starts):
+        if rng.random() < 0.001:
+            yield project_id, start, None, start
+            continue
+        minutes = min(max(rng.lognormvariate(3.6, 0.8), 5), 480)
+        end = start + int(minutes * US_PER_MINUTE)
+        yield project_id, start, end, end
+
+
+async def seed_sessions(db: databases.Database, count: int, days: int = SEED_HISTORY_DAYS, seed: int = 0) -> int:
+    """Insert a synthetic history of count sessions across all projects.
+    
+    Rows go through raw executemany calls in a single transaction, so the
+    counter and rollup triggers stay exact.
+    
+    Returns:
+        The number of sessions inserted.
+    """
+    project_ids = [row["id"] for row in await db.fetch_all("SELECT id FROM projects ORDER BY id")]
+    if not project_ids:
+        raise ValueError("No projects to seed sessions for")
+    rows = generate_history(count, project_ids, now_epoch_us(), days, seed)
+    inserted = 0
+    async with db.connection() as connection:
+        async with connection.transaction():
+            raw_connection = connection.raw_connection
+            while chunk := list(islice(rows, SEED_CHUNK_SIZE)):
+                await raw_connection.executemany(
+                    "INSERT INTO sessions (project_id, start_time, end_time, created_at) VALUES (?, ?, ?, ?)",
+                    chunk
+                )
+                inserted += len(chunk)
+    return inserted
+
+
+async def main(seed_count: int = 0, days: int = SEED_HISTORY_DAYS, seed: int = 0):
     """Initialize database tables and projects"""
     await database.connect()
     try:
         await init_db()
         await init_projects()
+        if seed_count:
+            started = time.perf_counter()
+            inserted = await seed_sessions(database, seed_count, days, seed)
+            print(f"Seeded {inserted} sessions in {time.perf_counter() - started:.1f}s")
     finally:
         await database.disconnect()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed-sessions", type=int, default=0, help="Number of synthetic sessions to add")
+    parser.add_argument("--days", type=int, default=SEED_HISTORY_DAYS, help="Days of history to spread them over")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic history")
+    args = parser.parse_args()
+    asyncio.run(main(args.seed_sessions, args.days, args.seed))
@@ -1,22 +1,81 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import init_db, database
-from app.routers import projects, sessions, health
+from app import admission, archive, cache, events, metrics, startup, write_queue
+from app.admission import AdmissionMiddleware
+from app.database import SQLITE_PROFILE, init_db, database, instrumented_database, read_database
+from app.events import session_events
+from app.compression import COMPRESSION_ENABLED, CompressionMiddleware
+from app.metrics import MetricsMiddleware
+from app.migrations import LATEST_VERSION, current_version
+from app.routers import projects, sessions, health, reports, debug
+from app.routers import metrics as metrics_router
+from app.startup import FirstResponseTimer, startup_timer, warm_cache
+from app.write_queue import WriteCoalescer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Initialize database connection and tables
     await database.connect()
-    await init_db()
+    startup_timer.mark("database_connected")
+    # Fast start: one query instead of the migration transactions when the
+    # schema is current (deploys already migrate in the release command)
+    if not startup.FAST_START or await current_version(database) < LATEST_VERSION:
+        await init_db()
+    startup_timer.mark("schema_ready")
+    await read_database.connect()
+    if write_queue.SESSION_WRITE_COALESCING:
+        # Through the instrumented database, so batched inserts show up in
+        # the query metrics and the slow-query log
+        write_queue.session_insert_coalescer = WriteCoalescer(
+            instrumented_database,
+            sessions.CREATE_SESSION_QUERY,
+            window_seconds=write_queue.SESSION_WRITE_WINDOW_MS / 1000,
+            max_batch_size=write_queue.SESSION_WRITE_BATCH_SIZE,
+        )
+        await write_queue.session_insert_coalescer.start()
+    watch_task = None
+    if cache.WEB_CONCURRENCY > 1:
+        # Other workers' writes reach this worker's change feed as "resync"
+        watch_task = asyncio.create_task(
+            session_events.watch(read_database, "sessions", events.SESSION_STREAM_POLL_SECONDS)
+        )
+    archive_task = None
+    if archive.ARCHIVE_INTERVAL_SECONDS > 0:
+        archive_task = asyncio.create_task(
+            archive.archive_periodically(database, archive.ARCHIVE_INTERVAL_SECONDS, archive.ARCHIVE_AFTER_DAYS)
+        )
+    warm_task = None
+    if startup.FAST_START:
+        # In the background, so the first request is not held up by warming
+        warm_task = asyncio.create_task(warm_cache(read_database, SQLITE_PROFILE.read_pool_size))
+    startup_timer.mark("ready")
     yield
-    # Shutdown: Disconnect database
+    # Shutdown: Flush queued writes and disconnect database
+    for task in (warm_task, watch_task, archive_task):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    if write_queue.session_insert_coalescer is not None:
+        await write_queue.session_insert_coalescer.stop()
+        write_queue.session_insert_coalescer = None
+    await read_database.disconnect()
     await database.disconnect()
 
 
 app = FastAPI(title="Measured API", version="1.0.0", lifespan=lifespan)
 
+# Innermost, so it sees each route's response as produced
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Inside CORS, so browsers can read the 503s it sends
+if admission.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
 # Configure CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -30,8 +89,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency covers CORS handling as well
+if metrics.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(FirstResponseTimer)
+
 # Include routers
 app.include_router(health.router, prefix="/api", tags=["health"])
+app.include_router(metrics_router.router, prefix="/api", tags=["metrics"])
 app.include_router(projects.router, prefix="/api", tags=["projects"])
 app.include_router(sessions.router, prefix="/api", tags=["sessions"])
+app.include_router(reports.router, prefix="/api", tags=["reports"])
+if debug.DEBUG_ENDPOINTS_ENABLED:
+    app.include_router(debug.router, prefix="/api", tags=["debug"])
 
+startup_timer.mark("imports")
@@ -0,0 +1,312 @@
+"""
+Request and query instrumentation exposed in Prometheus text format.
+MetricsMiddleware records per-route latency, in-flight requests and status
+codes; InstrumentedDatabase times each query made through get_db/get_read_db
+and hands slow ones to the slow-query log.
+Everything runs on the event loop thread, so counters are plain integers
+updated without locks, and histogram buckets are allocated once per series.
+"""
+import os
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from typing import AsyncGenerator, Iterable
+
+import databases
+
+from app.slow_queries import SlowQueryLog, slow_query_log
+
+# Set METRICS_ENABLED=0 to skip the middleware and the query wrapper entirely
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Route label for requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+
+_TABLE_PATTERN = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+([A-Za-z_]\w*)", re.IGNORECASE)
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts are per bucket and made cumulative on render"""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bound plus the +Inf bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """(le, cumulative count) pairs, ending with +Inf"""
+        total = 0
+        buckets = []
+        for bound, count in zip((*map(_format_value, self.bounds), "+Inf"), self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.in_flight = 0
+        self.request_latency: dict[tuple[str, str], Histogram] = {}
+        self.responses: Counter = Counter()
+        self.query_latency: dict[str, Histogram] = {}
+        self.query_errors: Counter = Counter()
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route)
+        histogram = self.request_latency.get(key)
+        if histogram is None:
+            histogram = self.request_latency[key] = Histogram(REQUEST_BUCKETS)
+        histogram.observe(seconds)
+        self.responses[(method, route, status)] += 1
+
+    def observe_query(self, statement: str, seconds: float, failed: bool = False) -> None:
+        histogram = self.query_latency.get(statement)
+        if histogram is None:
+            histogram = self.query_latency[statement] = Histogram(QUERY_BUCKETS)
+        histogram.observe(seconds)
+        if failed:
+            self.query_errors[statement] += 1
+
+    def render(self) -> str:
+        """Render all series in the Prometheus text exposition format"""
+        lines = [
+            "# HELP measured_http_requests_in_flight Requests currently being handled.",
+            "# TYPE measured_http_requests_in_flight gauge",
+            f"measured_http_requests_in_flight {self.in_flight}",
+        ]
+        lines += render_histogram(
+            "measured_http_request_duration_seconds",
+            "Request latency by route.",
+            (({"method": method, "route": route}, histogram)
+             for (method, route), histogram in sorted(self.request_latency.items()))
+        )
+        lines += [
+            "# HELP measured_http_responses_total Responses by route and status code.",
+            "# TYPE measured_http_responses_total counter",
+        ]
+        for (method, route, status), count in sorted(self.responses.items()):
+            labels = _format_labels({"method": method, "route": route, "status": str(status)})
+            lines.append(f"measured_http_responses_total{labels} {count}")
+        lines += render_histogram(
+            "measured_db_query_duration_seconds",
+            "Database query latency by statement.",
+            (({"statement": statement}, histogram)
+             for statement, histogram in sorted(self.query_latency.items()))
+        )
+        lines += [
+            "# HELP measured_db_query_errors_total Database queries that raised.",
+            "# TYPE measured_db_query_errors_total counter",
+        ]
+        for statement, count in sorted(self.query_errors.items()):
+            lines.append(f"measured_db_query_errors_total{_format_labels({'statement': statement})} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def render_series(name: str, kind: str, help_text: str, series: Iterable[tuple[dict, float]]) -> list[str]:
+    """Lines for a gauge or counter with one sample per label set"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in series:
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    return lines
+
+
+def render_histogram(name: str, help_text: str, series: Iterable[tuple[dict, Histogram]]) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in series:
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and in-flight count per route.
+
+    Routes are labelled by their path template (e.g. /api/sessions/{session_id}),
+    looked up from the endpoint the router matched.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+        self._route_paths: dict = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry = self.registry
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.in_flight -= 1
+            registry.observe_request(scope["method"], self._route_label(scope), status, elapsed)
+
+    def _route_label(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            # Routing mutates the scope in place, so the matched endpoint is
+            # visible here; map it back to its path template once
+            for route in scope["app"].router.routes:
+                if getattr(route, "endpoint", None) is endpoint:
+                    path = route.path
+                    break
+            else:
+                path = UNMATCHED_ROUTE
+            self._route_paths[endpoint] = path
+        return path
+
+
+@lru_cache(maxsize=1024)
+def statement_label(query: str) -> str:
+    """Low-cardinality label for a query: its verb and first table"""
+    words = query.split(None, 1)
+    verb = words[0].upper() if words else ""
+    match = _TABLE_PATTERN.search(query)
+    return f"{verb} {match.group(1)}" if match else verb
+
+
+class InstrumentedDatabase:
+    """Wraps a databases.Database and times each query by statement.
+
+    Only the query methods are timed; everything else (connection(),
+    transaction(), connect(), ...) is passed through to the wrapped database.
+    Either the registry or the slow-query log may be None to skip it.
+    """
+
+    def __init__(
+        self,
+        database: databases.Database,
+        registry: MetricsRegistry | None = registry,
+        slow_log: SlowQueryLog | None = slow_query_log
+    ):
+        self._database = database
+        self._registry = registry
+        self._slow_log = slow_log
+
+    def __getattr__(self, name):
+        return getattr(self._database, name)
+
+    async def _observe(self, query, values: dict | None, seconds: float, failed: bool) -> None:
+        if self._registry is not None:
+            self._registry.observe_query(statement_label(str(query)), seconds, failed)
+        if not failed and self._slow_log is not None and self._slow_log.is_slow(seconds):
+            await self._slow_log.record(self._database, str(query), values, seconds)
+
+    async def _timed(self, method, query, values, *args):
+        start = time.perf_counter()
+        try:
+            result = await method(query, values, *args)
+        except BaseException:
+            await self._observe(query, values, time.perf_counter() - start, failed=True)
+            raise
+        await self._observe(query, values, time.perf_counter() - start, failed=False)
+        return result
+
+    async def execute(self, query, values: dict | None = None):
+        return await self._timed(self._database.execute, query, values)
+
+    async def execute_many(self, query, values: list):
+        start = time.perf_counter()
+        try:
+            result = await self._database.execute_many(query, values)
+        except BaseException:
+            await self._observe(query, None, time.perf_counter() - start, failed=True)
+            raise
+        # Explain with the first row's values; the plan is the same for every row
+        await self._observe(query, values[0] if values else None, time.perf_counter() - start, failed=False)
+        return result
+
+    async def fetch_all(self, query, values: dict | None = None):
+        return await self._timed(self._database.fetch_all, query, values)
+
+    async def fetch_one(self, query, values: dict | None = None):
+        return await self._timed(self._database.fetch_one, query, values)
+
+    async def fetch_val(self, query, values: dict | None = None, column=0):
+        return await self._timed(self._database.fetch_val, query, values, column)
+
+    async def iterate(self, query, values: dict | None = None) -> AsyncGenerator:
+        """Iterate rows, counting only time spent waiting on the database
+        (not time the consumer spends between rows, e.g. streaming to a client)
+        """
+        rows = self._database.iterate(query, values).__aiter__()
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    row = await rows.__anext__()
+                except StopAsyncIteration:
+                    elapsed += time.perf_counter() - start
+                    break
+                except BaseException:
+                    elapsed += time.perf_counter() - start
+                    if self._registry is not None:
+                        self._registry.observe_query(statement_label(str(query)), elapsed, failed=True)
+                    raise
+                elapsed += time.perf_counter() - start
+                yield row
+        finally:
+            await rows.aclose()
+        await self._observe(query, values, elapsed, failed=False)
+
+
+def instrument(database: databases.Database) -> databases.Database:
+    """Return database wrapped for query metrics and the slow-query log,
+    or unchanged when both are off
+    """
+    if not METRICS_ENABLED and not slow_query_log.enabled:
+        return database
+    return InstrumentedDatabase(
+        database,
+        registry if METRICS_ENABLED else None,
+        slow_query_log if slow_query_log.enabled else None
+    )
@@ -0,0 +1,632 @@
+"""
+Versioned schema migrations.
+Each migration runs once, in its own transaction, and is recorded in the
+schema_version table. init_db applies whatever is pending, so the same code
+creates a fresh database and upgrades the production volume.
+Migrations are append-only: never edit one that has shipped, add a new one.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+import databases
+from databases.core import Connection
+
+from app.models import now_epoch_us, to_epoch_us
+
+# Sessions copied per batch when a migration rebuilds the sessions table
+REBUILD_BATCH_SIZE = 5000
+
+US_PER_DAY = 86_400_000_000
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection], Awaitable[None]]
+
+
+SESSION_COUNT_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_sessions_count_insert
+    AFTER INSERT ON sessions
+    BEGIN
+        UPDATE table_counts SET row_count = row_count + 1 WHERE name = 'sessions';
+        INSERT INTO project_session_counts (project_id, session_count)
+        VALUES (NEW.project_id, 1)
+        ON CONFLICT (project_id) DO UPDATE SET session_count = session_count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_sessions_count_delete
+    AFTER DELETE ON sessions
+    BEGIN
+        UPDATE table_counts SET row_count = row_count - 1 WHERE name = 'sessions';
+        UPDATE project_session_counts SET session_count = session_count - 1
+        WHERE project_id = OLD.project_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_sessions_count_move
+    AFTER UPDATE OF project_id ON sessions
+    WHEN OLD.project_id <> NEW.project_id
+    BEGIN
+        UPDATE project_session_counts SET session_count = session_count - 1
+        WHERE project_id = OLD.project_id;
+        INSERT INTO project_session_counts (project_id, session_count)
+        VALUES (NEW.project_id, 1)
+        ON CONFLICT (project_id) DO UPDATE SET session_count = session_count + 1;
+    END
+    """,
+]
+
+
+def _rollup_triggers(rollup_statement: Callable[[str, str], str]) -> list[str]:
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_sessions_rollup_insert
+        AFTER INSERT ON sessions
+        BEGIN
+            {rollup_statement("NEW", "+")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_sessions_rollup_update
+        AFTER UPDATE OF project_id, start_time, end_time ON sessions
+        BEGIN
+            {rollup_statement("OLD", "-")}
+            {rollup_statement("NEW", "+")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_sessions_rollup_delete
+        AFTER DELETE ON sessions
+        BEGIN
+            {rollup_statement("OLD", "-")}
+        END
+        """,
+    ]
+
+
+# Version 1: the schema init_db created before migrations existed
+
+def _iso_rollup_statement(row: str, sign: str) -> str:
+    """Upsert adding (sign "+") or removing (sign "-") one session's seconds
+    from session_rollups, split at each midnight the session crosses.
+    Days are UTC calendar days; naive timestamps are taken as UTC.
+    Open sessions and sessions without a positive duration count nothing.
+    """
+    return f"""
+        INSERT INTO session_rollups (day, project_id, seconds)
+        WITH RECURSIVE days(day) AS (
+            SELECT date({row}.start_time)
+            UNION ALL
+            SELECT date(day, '+1 day') FROM days WHERE day < date({row}.end_time)
+        )
+        SELECT day, {row}.project_id, {sign}ROUND((
+            MIN(julianday({row}.end_time), julianday(day, '+1 day'))
+            - MAX(julianday({row}.start_time), julianday(day))
+        ) * 86400, 3)
+        FROM days
+        WHERE {row}.end_time IS NOT NULL
+        AND julianday({row}.end_time) > julianday({row}.start_time)
+        ON CONFLICT (day, project_id) DO UPDATE SET seconds = seconds + excluded.seconds;
+    """
+
+
+async def _create_baseline_schema(connection: Connection) -> None:
+    # Create projects table
+    await connection.execute("""
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE
+        )
+    """)
+
+    # Create sessions table
+    # Using TIMESTAMP for cross-database compatibility
+    # SQLite stores as TEXT but accepts TIMESTAMP type
+    # PostgreSQL and MySQL use native TIMESTAMP/DATETIME types
+    await connection.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER NOT NULL,
+            start_time TIMESTAMP NOT NULL,
+            end_time TIMESTAMP,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (project_id) REFERENCES projects(id)
+        )
+    """)
+
+    # Composite index backing ORDER BY created_at DESC, id DESC and keyset pagination
+    await connection.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sessions_created_at_id
+        ON sessions (created_at, id)
+    """)
+
+    # Row counters kept exact by triggers, so reads never need COUNT(*).
+    # Triggers run inside the writing statement's transaction, which covers
+    # single inserts as well as bulk and delete paths.
+    await connection.execute("""
+        CREATE TABLE IF NOT EXISTS table_counts (
+            name TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL
+        )
+    """)
+    await connection.execute("""
+        CREATE TABLE IF NOT EXISTS project_session_counts (
+            project_id INTEGER PRIMARY KEY,
+            session_count INTEGER NOT NULL
+        )
+    """)
+    for trigger in SESSION_COUNT_TRIGGERS:
+        await connection.execute(trigger)
+
+    # Backfill counters for databases created before they existed
+    counter_row = await connection.fetch_one(
+        "SELECT row_count FROM table_counts WHERE name = 'sessions'"
+    )
+    if counter_row is None:
+        await connection.execute("""
+            INSERT INTO table_counts (name, row_count)
+            SELECT 'sessions', COUNT(*) FROM sessions
+        """)
+        await connection.execute("DELETE FROM project_session_counts")
+        await connection.execute("""
+            INSERT INTO project_session_counts (project_id, session_count)
+            SELECT project_id, COUNT(*) FROM sessions GROUP BY project_id
+        """)
+
+    # Per-project daily totals, kept current by triggers so reports scale
+    # with the number of days in range rather than the number of sessions.
+    # Keyed by (project_id, day); stored day-first so date ranges are range scans.
+    rollups_exist = await connection.fetch_one(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'session_rollups'"
+    )
+    await connection.execute("""
+        CREATE TABLE IF NOT EXISTS session_rollups (
+            day TEXT NOT NULL,
+            project_id INTEGER NOT NULL,
+            seconds REAL NOT NULL,
+            PRIMARY KEY (day, project_id)
+        ) WITHOUT ROWID
+    """)
+    for trigger in _rollup_triggers(_iso_rollup_statement):
+        await connection.execute(trigger)
+
+    # Backfill rollups for databases created before they existed
+    if rollups_exist is None:
+        await connection.execute("""
+            INSERT INTO session_rollups (day, project_id, seconds)
+            WITH RECURSIVE days(project_id, start_time, end_time, day) AS (
+                SELECT project_id, start_time, end_time, date(start_time)
+                FROM sessions
+                WHERE end_time IS NOT NULL
+                AND julianday(end_time) > julianday(start_time)
+                UNION ALL
+                SELECT project_id, start_time, end_time, date(day, '+1 day')
+                FROM days WHERE day < date(end_time)
+            )
+            SELECT day, project_id, SUM(ROUND((
+                MIN(julianday(end_time), julianday(day, '+1 day'))
+                - MAX(julianday(start_time), julianday(day))
+            ) * 86400, 3))
+            FROM days
+            GROUP BY day, project_id
+        """)
+
+
+# Version 2: timestamps as integer microseconds since the Unix epoch (UTC)
+# (SQL here avoids the % operator: `databases` %-formats statements for its log)
+
+def _epoch_rollup_statement(row: str, sign: str) -> str:
+    """Upsert adding (sign "+") or removing (sign "-") one session's seconds
+    from session_rollups, split at each UTC midnight the session crosses.
+    Open sessions and sessions without a positive duration count nothing.
+    """
+    return f"""
+        INSERT INTO session_rollups (day, project_id, seconds)
+        WITH RECURSIVE days(day_start) AS (
+            SELECT {row}.start_time / {US_PER_DAY} * {US_PER_DAY}
+            UNION ALL
+            SELECT day_start + {US_PER_DAY} FROM days
+            WHERE day_start + {US_PER_DAY} < {row}.end_time
+        )
+        SELECT date(day_start / 1000000, 'unixepoch'), {row}.project_id, {sign}(
+            MIN({row}.end_time, day_start + {US_PER_DAY}) - MAX({row}.start_time, day_start)
+        ) / 1000000.0
+        FROM days
+        WHERE {row}.end_time IS NOT NULL AND {row}.end_time > {row}.start_time
+        ON CONFLICT (day, project_id) DO UPDATE SET seconds = seconds + excluded.seconds;
+    """
+
+
+def _legacy_timestamp(value) -> Optional[int]:
+    """Convert a stored ISO timestamp (naive means UTC) to epoch microseconds"""
+    if value is None or isinstance(value, int):
+        return value
+    return to_epoch_us(datetime.fromisoformat(value))
+
+
+async def _store_epoch_timestamps(connection: Connection) -> None:
+    await connection.execute(f"""
+        CREATE TABLE sessions_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER NOT NULL,
+            start_time INTEGER NOT NULL,
+            end_time INTEGER,
+            created_at INTEGER NOT NULL
+                DEFAULT (CAST((julianday('now') - 2440587.5) * {US_PER_DAY} AS INTEGER)),
+            FOREIGN KEY (project_id) REFERENCES projects(id)
+        )
+    """)
+
+    # Copy in id order, converting ISO text to integers in Python
+    # (julianday arithmetic is not precise to the microsecond)
+    raw_connection = connection.raw_connection
+    last_id = 0
+    while True:
+        rows = await connection.fetch_all(
+            """
+            SELECT id, project_id, start_time, end_time, created_at FROM sessions
+            WHERE id > :last_id ORDER BY id LIMIT :limit
+            """,
+            {"last_id": last_id, "limit": REBUILD_BATCH_SIZE}
+        )
+        if not rows:
+            break
+        await raw_connection.executemany(
+            "INSERT INTO sessions_v2 (id, project_id, start_time, end_time, created_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    row["id"],
+                    row["project_id"],
+                    _legacy_timestamp(row["start_time"]),
+                    _legacy_timestamp(row["end_time"]),
+                    _legacy_timestamp(row["created_at"]) or now_epoch_us(),
+                )
+                for row in rows
+            ]
+        )
+        last_id = rows[-1]["id"]
+
+    # Keep AUTOINCREMENT from reusing ids of sessions deleted before the rebuild
+    sequence_row = await connection.fetch_one(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'sessions'"
+    )
+
+    # Dropping the old table drops its indexes and triggers as well
+    await connection.execute("DROP TABLE sessions")
+    await connection.execute("ALTER TABLE sessions_v2 RENAME TO sessions")
+    if sequence_row is not None:
+        await connection.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, :seq) WHERE name = 'sessions'",
+            {"seq": sequence_row["seq"]}
+        )
+
+    # Integer keys make range scans and sorts integer comparisons
+    await connection.execute("CREATE INDEX idx_sessions_created_at_id ON sessions (created_at, id)")
+    await connection.execute("CREATE INDEX idx_sessions_start_time ON sessions (start_time)")
+    await connection.execute("CREATE INDEX idx_sessions_end_time ON sessions (end_time)")
+
+    # Row counts are unchanged by the copy; only the triggers need recreating
+    for trigger in SESSION_COUNT_TRIGGERS:
+        await connection.execute(trigger)
+    for trigger in _rollup_triggers(_epoch_rollup_statement):
+        await connection.execute(trigger)
+
+    # Rebuild rollups with exact integer arithmetic
+    await connection.execute("DELETE FROM session_rollups")
+    await connection.execute(f"""
+        INSERT INTO session_rollups (day, project_id, seconds)
+        WITH RECURSIVE days(project_id, start_time, end_time, day_start) AS (
+            SELECT project_id, start_time, end_time, start_time / {US_PER_DAY} * {US_PER_DAY}
+            FROM sessions
+            WHERE end_time IS NOT NULL AND end_time > start_time
+            UNION ALL
+            SELECT project_id, start_time, end_time, day_start + {US_PER_DAY}
+            FROM days WHERE day_start + {US_PER_DAY} < end_time
+        )
+        SELECT date(day_start / 1000000, 'unixepoch'), project_id,
+            SUM(MIN(end_time, day_start + {US_PER_DAY}) - MAX(start_time, day_start)) / 1000000.0
+        FROM days
+        GROUP BY day_start, project_id
+    """)
+
+
+# Version 3: indexes for filtered session lists (see routers.sessions.session_filters)
+
+async def _create_session_filter_indexes(connection: Connection) -> None:
+    # project_id filter, in list order (created_at DESC, id DESC) without a sort
+    await connection.execute(
+        "CREATE INDEX idx_sessions_project_created_at_id ON sessions (project_id, created_at, id)"
+    )
+    # project_id with a start_time range
+    await connection.execute(
+        "CREATE INDEX idx_sessions_project_start_time ON sessions (project_id, start_time)"
+    )
+    # project_id with open_only: only the few open sessions, in list order
+    # (open_only alone is served by idx_sessions_end_time)
+    await connection.execute(
+        "CREATE INDEX idx_sessions_open_project_created_at_id ON sessions (project_id, created_at, id) WHERE end_time IS NULL"
+    )
+
+
+# Version 4: per-table data versions, bumped by triggers on every row change
+# so each process can tell whether another one has written (see app.cache)
+
+VERSIONED_TABLES = ("projects", "sessions")
+
+
+async def _create_table_versions(connection: Connection) -> None:
+    await connection.execute("""
+        CREATE TABLE table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+    for table in VERSIONED_TABLES:
+        await connection.execute(
+            "INSERT INTO table_versions (name, version) VALUES (:name, 0)",
+            {"name": table}
+        )
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            await connection.execute(f"""
+                CREATE TRIGGER trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                END
+            """)
+
+
+# Version 5: running timers (open sessions) in start order, for
+# GET /api/sessions/active; it only holds the open sessions, so it stays
+# small however long the history gets
+
+async def _create_open_sessions_index(connection: Connection) -> None:
+    await connection.execute(
+        "CREATE INDEX idx_sessions_open_start_time_id ON sessions (start_time, id) WHERE end_time IS NULL"
+    )
+
+
+# Version 6: when each table last changed (epoch microseconds), for
+# Last-Modified; set by the same triggers that bump the version
+
+# Current time in epoch microseconds (unixepoch('subsec') needs SQLite 3.42)
+SQL_NOW_EPOCH_US = "CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER)"
+
+
+async def _track_table_modified_at(connection: Connection) -> None:
+    await connection.execute("ALTER TABLE table_versions ADD COLUMN modified_at INTEGER NOT NULL DEFAULT 0")
+    await connection.execute(
+        "UPDATE table_versions SET modified_at = :now", {"now": now_epoch_us()}
+    )
+    for table in VERSIONED_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            await connection.execute(f"DROP TRIGGER trg_{table}_version_{event.lower()}")
+            await connection.execute(f"""
+                CREATE TRIGGER trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions
+                    SET version = version + 1, modified_at = {SQL_NOW_EPOCH_US}
+                    WHERE name = '{table}';
+                END
+            """)
+
+
+# Version 7: archival of old sessions into per-year files (see app.archive).
+# Moves set archive_state.moving, and the counter and rollup triggers skip
+# the rows inserted or deleted meanwhile: archived sessions still count, so
+# totals and reports never read the archives.
+
+SESSION_NOT_MOVING = "(SELECT moving FROM archive_state) = 0"
+
+
+async def _add_session_archives(connection: Connection) -> None:
+    await connection.execute("""
+        CREATE TABLE archive_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            moving INTEGER NOT NULL
+        )
+    """)
+    await connection.execute("INSERT INTO archive_state (id, moving) VALUES (1, 0)")
+    # One row per archive file, with the ranges reads check before attaching it
+    await connection.execute("""
+        CREATE TABLE session_archives (
+            year INTEGER PRIMARY KEY,
+            file TEXT NOT NULL,
+            min_id INTEGER NOT NULL,
+            max_id INTEGER NOT NULL,
+            min_start_time INTEGER NOT NULL,
+            max_start_time INTEGER NOT NULL,
+            min_created_at INTEGER NOT NULL,
+            max_created_at INTEGER NOT NULL
+        )
+    """)
+    for name in ("count_insert", "count_delete", "rollup_insert", "rollup_delete"):
+        await connection.execute(f"DROP TRIGGER trg_sessions_{name}")
+    await connection.execute(f"""
+        CREATE TRIGGER trg_sessions_count_insert
+        AFTER INSERT ON sessions
+        WHEN {SESSION_NOT_MOVING}
+        BEGIN
+            UPDATE table_counts SET row_count = row_count + 1 WHERE name = 'sessions';
+            INSERT INTO project_session_counts (project_id, session_count)
+            VALUES (NEW.project_id, 1)
+            ON CONFLICT (project_id) DO UPDATE SET session_count = session_count + 1;
+        END
+    """)
+    await connection.execute(f"""
+        CREATE TRIGGER trg_sessions_count_delete
+        AFTER DELETE ON sessions
+        WHEN {SESSION_NOT_MOVING}
+        BEGIN
+            UPDATE table_counts SET row_count = row_count - 1 WHERE name = 'sessions';
+            UPDATE project_session_counts SET session_count = session_count - 1
+            WHERE project_id = OLD.project_id;
+        END
+    """)
+    await connection.execute(f"""
+        CREATE TRIGGER trg_sessions_rollup_insert
+        AFTER INSERT ON sessions
+        WHEN {SESSION_NOT_MOVING}
+        BEGIN
+            {_epoch_rollup_statement("NEW", "+")}
+        END
+    """)
+    await connection.execute(f"""
+        CREATE TRIGGER trg_sessions_rollup_delete
+        AFTER DELETE ON sessions
+        WHEN {SESSION_NOT_MOVING}
+        BEGIN
+            {_epoch_rollup_statement("OLD", "-")}
+        END
+    """)
+
+
+# Version 8: rollups as integer microseconds. Adding and subtracting float
+# seconds left residues (((a + b) - a) - b != 0) that reports showed as
+# zero-second rows; integer deltas cancel exactly.
+
+def _integer_rollup_statement(row: str, sign: str) -> str:
+    """Upsert adding (sign "+") or removing (sign "-") one session's
+    microseconds from session_rollups, split at each UTC midnight it crosses.
+    Open sessions and sessions without a positive duration count nothing.
+    """
+    return f"""
+        INSERT INTO session_rollups (day, project_id, microseconds)
+        WITH RECURSIVE days(day_start) AS (
+            SELECT {row}.start_time / {US_PER_DAY} * {US_PER_DAY}
+            UNION ALL
+            SELECT day_start + {US_PER_DAY} FROM days
+            WHERE day_start + {US_PER_DAY} < {row}.end_time
+        )
+        SELECT date(day_start / 1000000, 'unixepoch'), {row}.project_id, {sign}(
+            MIN({row}.end_time, day_start + {US_PER_DAY}) - MAX({row}.start_time, day_start)
+        )
+        FROM days
+        WHERE {row}.end_time IS NOT NULL AND {row}.end_time > {row}.start_time
+        ON CONFLICT (day, project_id) DO UPDATE SET microseconds = microseconds + excluded.microseconds;
+    """
+
+
+async def _store_integer_rollups(connection: Connection) -> None:
+    # The triggers name session_rollups, so they go before the table is swapped
+    for name in ("insert", "update", "delete"):
+        await connection.execute(f"DROP TRIGGER trg_sessions_rollup_{name}")
+    await connection.execute("""
+        CREATE TABLE session_rollups_v8 (
+            day TEXT NOT NULL,
+            project_id INTEGER NOT NULL,
+            microseconds INTEGER NOT NULL,
+            PRIMARY KEY (day, project_id)
+        ) WITHOUT ROWID
+    """)
+    # The float sums hold whole microseconds plus rounding error, so
+    # rounding recovers them; rows left with only a residue are dropped.
+    # Archived sessions are only in the rollups, so these are converted
+    # rather than recomputed from sessions.
+    await connection.execute("""
+        INSERT INTO session_rollups_v8 (day, project_id, microseconds)
+        SELECT day, project_id, CAST(ROUND(seconds * 1000000) AS INTEGER)
+        FROM session_rollups
+        WHERE CAST(ROUND(seconds * 1000000) AS INTEGER) != 0
+    """)
+    await connection.execute("DROP TABLE session_rollups")
+    await connection.execute("ALTER TABLE session_rollups_v8 RENAME TO session_rollups")
+    await connection.execute(f"""
+        CREATE TRIGGER trg_sessions_rollup_insert
+        AFTER INSERT ON sessions
+        WHEN {SESSION_NOT_MOVING}
+        BEGIN
+            {_integer_rollup_statement("NEW", "+")}
+        END
+    """)
+    await connection.execute(f"""
+        CREATE TRIGGER trg_sessions_rollup_update
+        AFTER UPDATE OF project_id, start_time, end_time ON sessions
+        BEGIN
+            {_integer_rollup_statement("OLD", "-")}
+            {_integer_rollup_statement("NEW", "+")}
+        END
+    """)
+    await connection.execute(f"""
+        CREATE TRIGGER trg_sessions_rollup_delete
+        AFTER DELETE ON sessions
+        WHEN {SESSION_NOT_MOVING}
+        BEGIN
+            {_integer_rollup_statement("OLD", "-")}
+        END
+    """)
+
+
+MIGRATIONS = [
+    Migration(1, "baseline", _create_baseline_schema),
+    Migration(2, "epoch_timestamps", _store_epoch_timestamps),
+    Migration(3, "session_filter_indexes", _create_session_filter_indexes),
+    Migration(4, "table_versions", _create_table_versions),
+    Migration(5, "open_sessions_index", _create_open_sessions_index),
+    Migration(6, "table_modified_at", _track_table_modified_at),
+    Migration(7, "session_archives", _add_session_archives),
+    Migration(8, "integer_rollups", _store_integer_rollups),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+async def current_version(db: databases.Database) -> int:
+    """Return the highest applied migration version (0 for a new database)"""
+    table = await db.fetch_one(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    )
+    if table is None:
+        return 0
+    row = await db.fetch_one("SELECT MAX(version) AS version FROM schema_version")
+    return row["version"] or 0
+
+
+async def migrate(db: databases.Database, target: Optional[int] = None) -> list[int]:
+    """Apply pending migrations up to target (default: all).
+
+    Foreign key enforcement is switched off while migrations run, as SQLite
+    requires for rebuilding tables, and restored afterwards.
+
+    Returns:
+        The versions that were applied.
+    """
+    target = LATEST_VERSION if target is None else target
+    applied = []
+    async with db.connection() as connection:
+        await connection.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at INTEGER NOT NULL
+            )
+        """)
+        foreign_keys = (await connection.fetch_one("PRAGMA foreign_keys"))[0]
+        await connection.execute("PRAGMA foreign_keys = OFF")
+        try:
+            for migration in MIGRATIONS:
+                if migration.version > target:
+                    break
+                async with connection.transaction():
+                    # Checked inside the transaction in case another process migrated first
+                    done = await connection.fetch_one(
+                        "SELECT 1 FROM schema_version WHERE version = :version",
+                        {"version": migration.version}
+                    )
+                    if done is not None:
+                        continue
+                    await migration.apply(connection)
+                    await connection.execute(
+                        "INSERT INTO schema_version (version, name, applied_at) VALUES (:version, :name, :applied_at)",
+                        {"version": migration.version, "name": migration.name, "applied_at": now_epoch_us()}
+                    )
+                applied.append(migration.version)
+        finally:
+            await connection.execute(f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'}")
+    return applied
@@ -3,9 +3,30 @@ Plain Python classes for mapping database rows to objects.
 These are used for explicit result mapping from SQL queries.
 """
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+# Timestamps are stored as integer microseconds since the Unix epoch (UTC)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(value: datetime) -> int:
+    """Convert a datetime to epoch microseconds; naive datetimes are taken as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // ONE_MICROSECOND
+
+
+def from_epoch_us(value: int) -> datetime:
+    """Convert epoch microseconds to an aware UTC datetime"""
+    return EPOCH + timedelta(microseconds=value)
+
+
+def now_epoch_us() -> int:
+    """Current time in epoch microseconds"""
+    return to_epoch_us(datetime.now(timezone.utc))
+
 
 @dataclass
 class Project:
@@ -32,7 +53,44 @@ class Session:
         return cls(
             id=row["id"],
             project_id=row["project_id"],
-            start_time=datetime.fromisoformat(row["start_time"]),
-            end_time=datetime.fromisoformat(row["end_time"]) if row["end_time"] else None,
-            created_at=datetime.fromisoformat(row["created_at"])
+            start_time=from_epoch_us(row["start_time"]),
+            end_time=from_epoch_us(row["end_time"]) if row["end_time"] is not None else None,
+            created_at=from_epoch_us(row["created_at"])
+        )
+
+
+class SessionRow:
+    """Compact session row for the fast serialization path.
+    
+    Skips dataclass and Pydantic overhead; see app.serialization.
+    """
+    __slots__ = ("id", "project_id", "start_time", "end_time", "created_at")
+    
+    def __init__(self, id: int, project_id: int, start_time: datetime, end_time: Optional[datetime], created_at: datetime):
+        self.id = id
+        self.project_id = project_id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.created_at = created_at
+    
+    @classmethod
+    def from_row(cls, row) -> "SessionRow":
+        """Create SessionRow from database row"""
+        end_time = row["end_time"]
+        return cls(
+            row["id"],
+            row["project_id"],
+            from_epoch_us(row["start_time"]),
+            from_epoch_us(end_time) if end_time is not None else None,
+            from_epoch_us(row["created_at"])
         )
+    
+    def to_dict(self) -> dict:
+        """Return the fields in the order of schemas.Session"""
+        return {
+            "project_id": self.project_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "id": self.id,
+            "created_at": self.created_at,
+        }
@@ -0,0 +1,28 @@
+"""
+Opaque cursors for keyset pagination.
+A cursor identifies the last row of a page by its (created_at, id) sort key.
+"""
+import base64
+import json
+
+
+def encode_cursor(created_at, session_id: int) -> str:
+    """Encode a (created_at, id) sort key as an opaque cursor string"""
+    payload = json.dumps([created_at, session_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor string back into its (created_at, id) sort key.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(created_at, int) or not isinstance(session_id, int):
+        raise ValueError("Invalid cursor")
+    return created_at, session_id
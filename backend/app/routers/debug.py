@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+import os
+from app.slow_queries import slow_query_log
+
+# Debug endpoints show SQL text and query plans, so they are only mounted
+# when asked for (they have no authentication)
+DEBUG_ENDPOINTS_ENABLED = os.getenv("DEBUG_ENDPOINTS_ENABLED", "0") == "1"
+
+router = APIRouter()
+
+
+@router.get("/debug/slow-queries")
+async def get_slow_queries():
+    """Get the most recent slow queries with their query plans, newest first"""
+    return {**slow_query_log.stats(), "entries": slow_query_log.entries()}
@@ -1,4 +1,8 @@
 from fastapi import APIRouter
+from app import admission, write_queue
+from app.cache import session_cache
+from app.events import session_events
+from app.startup import startup_timer
 
 router = APIRouter()
 
@@ -7,3 +11,35 @@ router = APIRouter()
 async def health_check():
     return {"status": "ok"}
 
+
+@router.get("/health/cache")
+async def cache_stats():
+    """Get response cache hit/miss counters"""
+    return {"sessions": session_cache.stats()}
+
+
+@router.get("/health/write-queue")
+async def write_queue_stats():
+    """Get group-commit batch size distribution for session inserts"""
+    coalescer = write_queue.session_insert_coalescer
+    return {"sessions": coalescer.stats() if coalescer is not None else {"enabled": False}}
+
+
+@router.get("/health/admission")
+async def admission_stats():
+    """Get admission control slots, queue depth and rejections for reads and writes"""
+    if not admission.ADMISSION_CONTROL_ENABLED:
+        return {"enabled": False}
+    return {kind: limiter.stats() for kind, limiter in admission.limiters.items()}
+
+
+@router.get("/health/stream")
+async def stream_stats():
+    """Get session change feed subscriber and event counters"""
+    return {"sessions": session_events.stats()}
+
+
+@router.get("/health/startup")
+async def startup_timing():
+    """Get startup phase timings and time to first response, in ms since process start"""
+    return startup_timer.report()
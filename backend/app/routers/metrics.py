@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from app import admission, metrics
+
+router = APIRouter()
+
+# Prometheus text exposition format
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Get request and query metrics in Prometheus text format"""
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    text = metrics.registry.render()
+    if admission.ADMISSION_CONTROL_ENABLED:
+        text += admission.render_metrics()
+    return PlainTextResponse(text, media_type=METRICS_MEDIA_TYPE)
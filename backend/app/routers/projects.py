@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 import databases
-from app.database import get_db
+from app.conditional import PROJECTS_CACHE_MAX_AGE, check_conditional
+from app.database import get_read_db
 from app.models import Project
 from app.schemas import Project as ProjectSchema
 from typing import Annotated
@@ -9,7 +10,21 @@ router = APIRouter()
 
 
 @router.get("/projects", response_model=list[ProjectSchema])
-async def get_projects(db: Annotated[databases.Database, Depends(get_db)]):
-    """Get list of all projects"""
+async def get_projects(
+    request: Request,
+    response: Response,
+    db: Annotated[databases.Database, Depends(get_read_db)]
+):
+    """Get list of all projects.
+    
+    Carries an ETag and Last-Modified; a conditional request for an
+    unchanged list is answered with 304 without querying the projects.
+    """
+    _, headers, not_modified = await check_conditional(
+        request, db, "projects", cache_control=f"max-age={PROJECTS_CACHE_MAX_AGE}"
+    )
+    if not_modified is not None:
+        return not_modified
+    response.headers.update(headers)
     rows = await db.fetch_all("SELECT id, name FROM projects ORDER BY id")
     return [Project.from_row(row) for row in rows]
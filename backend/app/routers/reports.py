@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+import databases
+from app import analytics
+from app.conditional import check_conditional
+from app.database import get_read_db
+from app.models import to_epoch_us
+from app.schemas import AnalyticsReport, ReportSummary, SummaryItem
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Annotated, Literal, Optional
+
+router = APIRouter()
+
+# SQL expressions mapping a rollup day to the first day of its period.
+# Weeks start on Monday.
+PERIOD_EXPRESSIONS = {
+    "day": "day",
+    "week": "date(day, '-6 days', 'weekday 1')",
+    "month": "substr(day, 1, 7) || '-01'",
+}
+
+
+@router.get("/reports/summary", response_model=ReportSummary)
+async def get_summary(
+    request: Request,
+    response: Response,
+    db: Annotated[databases.Database, Depends(get_read_db)],
+    start_date: date = Query(..., alias="from"),
+    end_date: date = Query(..., alias="to"),
+    granularity: Literal["day", "week", "month"] = Query("day")
+):
+    """Get tracked seconds per project and period between two dates (inclusive).
+    
+    Reads the daily rollups, so cost depends on the number of days in range.
+    Rollups change only with sessions, so the sessions table's version
+    validates conditional requests.
+    """
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    
+    _, headers, not_modified = await check_conditional(request, db, "sessions")
+    if not_modified is not None:
+        return not_modified
+    response.headers.update(headers)
+    
+    period = PERIOD_EXPRESSIONS[granularity]
+    rows = await db.fetch_all(
+        f"""
+        SELECT project_id, {period} AS period, ROUND(SUM(microseconds) / 1000000.0, 3) AS seconds
+        FROM session_rollups
+        WHERE day BETWEEN :start_date AND :end_date
+        GROUP BY project_id, period
+        HAVING SUM(microseconds) > 0
+        ORDER BY period, project_id
+        """,
+        {"start_date": start_date.isoformat(), "end_date": end_date.isoformat()}
+    )
+    
+    return ReportSummary(
+        start_date=start_date,
+        end_date=end_date,
+        granularity=granularity,
+        items=[
+            SummaryItem(project_id=row["project_id"], period=row["period"], seconds=row["seconds"])
+            for row in rows
+        ]
+    )
+
+
+def _day_start_us(day: date) -> int:
+    return to_epoch_us(datetime.combine(day, time.min, tzinfo=timezone.utc))
+
+
+@router.get("/reports/analytics", response_model=AnalyticsReport)
+async def get_analytics(
+    request: Request,
+    response: Response,
+    db: Annotated[databases.Database, Depends(get_read_db)],
+    start_date: Optional[date] = Query(None, alias="from"),
+    end_date: Optional[date] = Query(None, alias="to"),
+    project_id: Optional[int] = Query(None)
+):
+    """Get duration statistics per project for closed sessions that started
+    between two dates (inclusive, UTC; both optional): percentiles, a
+    duration histogram, day streaks and a weekday/hour heatmap.
+    
+    Computed from an in-memory column snapshot of all sessions that is
+    reloaded after writes, so a repeat request costs no query beyond the
+    version check. Requires numpy.
+    """
+    if analytics._numpy() is None:
+        raise HTTPException(status_code=501, detail="Analytics requires the numpy package")
+    if start_date is not None and end_date is not None and start_date > end_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    
+    state, headers, not_modified = await check_conditional(request, db, "sessions", "analytics")
+    if not_modified is not None:
+        return not_modified
+    response.headers.update(headers)
+    
+    snapshot = await analytics.session_columns.get(db, state.version)
+    projects = analytics.analyze(
+        snapshot,
+        start_after=_day_start_us(start_date) if start_date is not None else None,
+        start_before=_day_start_us(end_date + timedelta(days=1)) if end_date is not None else None,
+        project_id=project_id
+    )
+    return AnalyticsReport(start_date=start_date, end_date=end_date, projects=projects)
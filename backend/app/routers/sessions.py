@@ -1,12 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
+from datetime import datetime
+import asyncio
 import databases
-from app.database import get_db
-from app.models import Session
-from app.schemas import Session as SessionSchema, SessionCreate, SessionUpdate, PaginatedSessions
-from typing import Annotated
+import heapq
+import io
+import json
+import os
+import sqlite3
+from app import write_queue
+from app.archive import (
+    ARCHIVE_MAX_ATTACHED,
+    archive_catalog,
+    archive_connection,
+    fetch_archived,
+    iterate_sessions,
+    load_catalog,
+    restore_session,
+)
+from app.cache import session_cache
+from app.conditional import check_conditional
+from app.database import get_db, get_read_db
+from app.events import SESSION_STREAM_HEARTBEAT_SECONDS, session_events
+from app.models import from_epoch_us, now_epoch_us, to_epoch_us
+from app.pagination import encode_cursor, decode_cursor
+from app.serialization import (
+    COLUMNAR_MEDIA_TYPE,
+    COLUMNAR_NDJSON_MEDIA_TYPE,
+    encode_session,
+    encode_sessions,
+    encode_sessions_batch,
+    encode_sessions_page,
+    encode_sessions_page_columnar,
+    encode_sessions_ndjson,
+    format_datetime,
+    dumps,
+    session_columns,
+)
+from app.schemas import (
+    Session as SessionSchema,
+    SessionCreate,
+    SessionStart,
+    SessionStop,
+    SessionUpdate,
+    PaginatedSessions,
+    BulkSessionResult,
+    BulkSessionsResponse,
+    SessionBatch,
+    SessionBatchGet,
+)
+from typing import Annotated, AsyncIterator, Literal, Optional
 
 router = APIRouter()
 
+# Insert the session with explicit created_at to ensure it's returned in RETURNING
+CREATE_SESSION_QUERY = """
+    INSERT INTO sessions (project_id, start_time, end_time, created_at)
+    VALUES (:project_id, :start_time, :end_time, :created_at)
+    RETURNING *
+"""
+
+# Insert an open session unless its project already has one; a single
+# statement, so the check and the insert cannot interleave with another
+# writer. The check is a lookup in idx_sessions_open_project_created_at_id.
+START_SESSION_QUERY = """
+    INSERT INTO sessions (project_id, start_time, end_time, created_at)
+    SELECT :project_id, :start_time, NULL, :created_at
+    WHERE NOT EXISTS (
+        SELECT 1 FROM sessions WHERE project_id = :project_id AND end_time IS NULL
+    )
+    RETURNING *
+"""
+
+# Set SINGLE_OPEN_SESSION_PER_PROJECT=1 to reject starting (or creating
+# without an end) a session while its project has one running; bulk imports
+# are not checked
+SINGLE_OPEN_SESSION_PER_PROJECT = os.getenv("SINGLE_OPEN_SESSION_PER_PROJECT", "0") == "1"
+
+# Rows per executemany call when bulk inserting
+BULK_INSERT_CHUNK_SIZE = 1000
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# Ids bound per IN (...) query, well under SQLite's limit on parameters
+# (999 before 3.32)
+BATCH_GET_CHUNK_SIZE = 500
+
+# Rows encoded per chunk written to an export stream
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_COLUMNS = ("id", "project_id", "start_time", "end_time", "created_at")
+
 
 @router.post("/sessions", response_model=SessionSchema, status_code=201)
 async def create_session(
@@ -14,79 +99,741 @@ async def create_session(
     db: Annotated[databases.Database, Depends(get_db)]
 ):
     """Create a new session"""
-    # Verify project exists
-    project_row = await db.fetch_one(
-        "SELECT id FROM projects WHERE id = :project_id",
-        {"project_id": session.project_id}
-    )
-    if not project_row:
-        raise HTTPException(status_code=404, detail="Project not found")
+    # Create session using RETURNING clause (SQLite 3.35+) in a single
+    # statement; the project is checked by the foreign key constraint
+    values = {
+        "project_id": session.project_id,
+        "start_time": to_epoch_us(session.start_time),
+        "end_time": to_epoch_us(session.end_time) if session.end_time else None,
+        "created_at": now_epoch_us()
+    }
+    if values["end_time"] is None and SINGLE_OPEN_SESSION_PER_PROJECT:
+        return await _insert_open_session(db, values)
+    coalescer = write_queue.session_insert_coalescer
+    try:
+        if coalescer is not None:
+            # Group commit: share one transaction with concurrent inserts
+            row = await coalescer.submit(values)
+        else:
+            row = await db.fetch_one(CREATE_SESSION_QUERY, values)
+    except sqlite3.IntegrityError as error:
+        if "FOREIGN KEY" in str(error):
+            raise HTTPException(status_code=404, detail="Project not found")
+        raise
     
-    # Create session using RETURNING clause (SQLite 3.35+)
-    # Insert the session with explicit created_at to ensure it's returned in RETURNING
+    if not row:
+        raise HTTPException(status_code=500, detail="Failed to create session")
+    return _session_created(row)
+
+
+def _session_created(row) -> Response:
+    session_cache.invalidate()
+    body = encode_session(row)
+    session_events.publish("created", body)
+    return Response(content=body, status_code=201, media_type="application/json")
+
+
+async def _insert_open_session(db: databases.Database, values: dict) -> Response:
+    """Insert an open session, at most one per project"""
+    try:
+        row = await db.fetch_one(START_SESSION_QUERY, {
+            "project_id": values["project_id"],
+            "start_time": values["start_time"],
+            "created_at": values["created_at"]
+        })
+    except sqlite3.IntegrityError as error:
+        if "FOREIGN KEY" in str(error):
+            raise HTTPException(status_code=404, detail="Project not found")
+        raise
+    if not row:
+        raise HTTPException(status_code=409, detail="Project already has a running session")
+    return _session_created(row)
+
+
+@router.post("/sessions/start", response_model=SessionSchema, status_code=201)
+async def start_session(
+    session: SessionStart,
+    db: Annotated[databases.Database, Depends(get_db)]
+):
+    """Start a timer: create an open session, starting now unless given.
+    
+    With SINGLE_OPEN_SESSION_PER_PROJECT set, fails with 409 while the
+    project already has a running session.
+    """
+    now = now_epoch_us()
+    values = {
+        "project_id": session.project_id,
+        "start_time": to_epoch_us(session.start_time) if session.start_time else now,
+        "end_time": None,
+        "created_at": now
+    }
+    if SINGLE_OPEN_SESSION_PER_PROJECT:
+        return await _insert_open_session(db, values)
+    try:
+        row = await db.fetch_one(CREATE_SESSION_QUERY, values)
+    except sqlite3.IntegrityError as error:
+        if "FOREIGN KEY" in str(error):
+            raise HTTPException(status_code=404, detail="Project not found")
+        raise
+    return _session_created(row)
+
+
+@router.post("/sessions/{session_id}/stop", response_model=SessionSchema)
+async def stop_session(
+    session_id: int,
+    db: Annotated[databases.Database, Depends(get_db)],
+    session: Optional[SessionStop] = None
+):
+    """Stop a running timer: set the open session's end, now unless given"""
+    end_time = session.end_time if session is not None else None
+    # One primary key lookup; the conditions only fail on the error paths
     row = await db.fetch_one(
         """
-        INSERT INTO sessions (project_id, start_time, end_time, created_at)
-        VALUES (:project_id, :start_time, :end_time, CURRENT_TIMESTAMP)
+        UPDATE sessions SET end_time = :end_time
+        WHERE id = :session_id AND end_time IS NULL AND start_time <= :end_time
         RETURNING *
         """,
-        {
-            "project_id": session.project_id,
-            "start_time": session.start_time.isoformat(),
-            "end_time": session.end_time.isoformat() if session.end_time else None
+        {"end_time": to_epoch_us(end_time) if end_time else now_epoch_us(), "session_id": session_id}
+    )
+    if not row:
+        existing = await db.fetch_one(
+            "SELECT end_time FROM sessions WHERE id = :session_id", {"session_id": session_id}
+        )
+        if existing is None and not await fetch_archived(db, await load_catalog(db), [session_id]):
+            raise HTTPException(status_code=404, detail="Session not found")
+        # Only closed sessions are archived
+        if existing is None or existing["end_time"] is not None:
+            raise HTTPException(status_code=409, detail="Session is not running")
+        raise HTTPException(status_code=422, detail="end_time is before the session's start_time")
+    
+    session_cache.invalidate()
+    body = encode_session(row)
+    session_events.publish("updated", body)
+    return Response(content=body, media_type="application/json")
+
+
+async def _read_bulk_items(request: Request) -> AsyncIterator[tuple[int, object]]:
+    """Yield (index, decoded item) pairs from a JSON array or NDJSON body.
+    
+    NDJSON bodies are decoded line by line as they stream in. Lines that are
+    not valid JSON are yielded as INVALID_JSON so they get a per-item error.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in NDJSON_MEDIA_TYPES:
+        try:
+            items = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array")
+        for index, item in enumerate(items):
+            yield index, item
+        return
+    
+    index = 0
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, _decode_ndjson_line(line)
+                index += 1
+    if buffer.strip():
+        yield index, _decode_ndjson_line(buffer)
+
+
+# Stands in for an NDJSON line that does not parse (null is valid JSON)
+INVALID_JSON = object()
+
+
+def _decode_ndjson_line(line: bytes) -> object:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return INVALID_JSON
+
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'item'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+async def _insert_bulk_chunk(
+    raw_connection, chunk: list[tuple[int, tuple]], created_at: int
+) -> list[BulkSessionResult]:
+    """Insert one chunk of (index, params) and return its created results.
+    
+    Rows inserted by one connection inside one transaction get consecutive
+    AUTOINCREMENT ids, so the chunk's ids follow from last_insert_rowid().
+    """
+    await raw_connection.executemany(
+        """
+        INSERT INTO sessions (project_id, start_time, end_time, created_at)
+        VALUES (?, ?, ?, ?)
+        """,
+        [(*params, created_at) for _, params in chunk]
+    )
+    async with raw_connection.execute("SELECT last_insert_rowid()") as cursor:
+        (last_id,) = await cursor.fetchone()
+    first_id = last_id - len(chunk) + 1
+    return [
+        BulkSessionResult(index=index, status="created", id=first_id + offset)
+        for offset, (index, _) in enumerate(chunk)
+    ]
+
+
+@router.post(
+    "/sessions/bulk",
+    response_model=BulkSessionsResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/SessionCreate"}}
+                },
+                "application/x-ndjson": {
+                    "schema": {"$ref": "#/components/schemas/SessionCreate"}
+                },
+            },
         }
+    },
+)
+async def create_sessions_bulk(
+    request: Request,
+    db: Annotated[databases.Database, Depends(get_db)]
+):
+    """Create many sessions from a JSON array or an NDJSON stream.
+    
+    Project ids are checked with one query and, once the body has been
+    read, valid items are inserted in chunks inside a single transaction.
+    Invalid items are reported per index and do not prevent the others
+    from being created.
+    """
+    project_rows = await db.fetch_all("SELECT id FROM projects")
+    project_ids = {row["id"] for row in project_rows}
+    
+    results: list[BulkSessionResult] = []
+    pending: list[tuple[int, tuple]] = []
+    # The whole body is read and validated before the transaction, so a
+    # slow upload never holds the writer connection or the write lock
+    async for index, item in _read_bulk_items(request):
+        if item is INVALID_JSON:
+            results.append(BulkSessionResult(index=index, status="error", detail="Invalid JSON"))
+            continue
+        if not isinstance(item, dict):
+            results.append(BulkSessionResult(index=index, status="error", detail="Expected a JSON object"))
+            continue
+        try:
+            session = SessionCreate.model_validate(item)
+        except ValidationError as error:
+            results.append(BulkSessionResult(index=index, status="error", detail=_validation_detail(error)))
+            continue
+        if session.project_id not in project_ids:
+            results.append(BulkSessionResult(index=index, status="error", detail="Project not found"))
+            continue
+        pending.append((
+            index,
+            (
+                session.project_id,
+                to_epoch_us(session.start_time),
+                to_epoch_us(session.end_time) if session.end_time else None
+            )
+        ))
+    
+    created_at = now_epoch_us()
+    created = len(pending)
+    
+    async with db.connection() as connection:
+        async with connection.transaction():
+            for start in range(0, len(pending), BULK_INSERT_CHUNK_SIZE):
+                results += await _insert_bulk_chunk(
+                    connection.raw_connection, pending[start:start + BULK_INSERT_CHUNK_SIZE], created_at
+                )
+    if created:
+        session_cache.invalidate()
+        # One event for the whole batch: subscribers refetch rather than
+        # receive (and possibly be dropped for) thousands of events
+        session_events.publish("resync", b"{}", rows=created)
+    
+    results.sort(key=lambda result: result.index)
+    return BulkSessionsResponse(
+        created=created,
+        failed=len(results) - created,
+        results=results
     )
+
+
+@router.post("/sessions/batch-get", response_model=SessionBatch)
+async def batch_get_sessions(
+    batch: SessionBatchGet,
+    db: Annotated[databases.Database, Depends(get_read_db)]
+):
+    """Get many sessions by id.
     
-    if not row:
-        raise HTTPException(status_code=500, detail="Failed to create session")
-    return Session.from_row(row)
+    Items come back in request order (duplicates included), with null
+    and an entry in `not_found` for ids that do not exist. Ids are looked
+    up with one `id IN (...)` query per BATCH_GET_CHUNK_SIZE distinct ids,
+    and ids missing from the hot table in the archives covering them.
+    """
+    distinct_ids = list(dict.fromkeys(batch.ids))
+    rows_by_id = {}
+    for start in range(0, len(distinct_ids), BATCH_GET_CHUNK_SIZE):
+        chunk = distinct_ids[start:start + BATCH_GET_CHUNK_SIZE]
+        values = {f"id{index}": session_id for index, session_id in enumerate(chunk)}
+        placeholders = ", ".join(f":{name}" for name in values)
+        rows = await db.fetch_all(f"SELECT * FROM sessions WHERE id IN ({placeholders})", values)
+        rows_by_id.update((row["id"], row) for row in rows)
+    missing = [session_id for session_id in distinct_ids if session_id not in rows_by_id]
+    if missing:
+        rows_by_id.update(await fetch_archived(db, await load_catalog(db), missing, BATCH_GET_CHUNK_SIZE))
+    return Response(content=encode_sessions_batch(batch.ids, rows_by_id), media_type="application/json")
+
+
+def session_filters(
+    project_id: Optional[int] = None,
+    start_after: Optional[datetime] = None,
+    start_before: Optional[datetime] = None,
+    open_only: bool = False,
+    table: str = "sessions"
+) -> tuple[str, list[str], dict]:
+    """Table source, SQL conditions and values for the list filters.
+    
+    start_after is inclusive and start_before exclusive, so consecutive
+    ranges never overlap. Every combination is served by an index (see
+    migration 3 in app.migrations; archives have the same indexes).
+    """
+    source = table
+    conditions = []
+    values = {}
+    if project_id is not None:
+        conditions.append("project_id = :project_id")
+        values["project_id"] = project_id
+    if start_after is not None:
+        conditions.append("start_time >= :start_after")
+        values["start_after"] = to_epoch_us(start_after)
+    if start_before is not None:
+        conditions.append("start_time < :start_before")
+        values["start_before"] = to_epoch_us(start_before)
+    if open_only:
+        conditions.append("end_time IS NULL")
+    elif project_id is None and (start_after is not None or start_before is not None):
+        # Without statistics SQLite prefers walking idx_sessions_created_at_id
+        # in list order and filtering, which reads the whole table for an old
+        # range; searching the range and sorting the matches is bounded
+        source = f"{table} INDEXED BY idx_sessions_start_time"
+    return source, conditions, values
+
+
+def _where(conditions: list[str]) -> str:
+    return "WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+def _list_key(row) -> tuple[int, int]:
+    return row["created_at"], row["id"]
+
+
+async def _list_key_at(
+    db: databases.Database,
+    archives: list,
+    filters: tuple,
+    conditions: list[str],
+    values: dict,
+    offset: int
+) -> Optional[tuple[int, int]]:
+    """(created_at, id) of the row at offset in list order across the hot
+    table and archives, or None past the end.
+    
+    A keys-only UNION ALL, which SQLite merges from each table's index
+    without reading rows, over up to ARCHIVE_MAX_ATTACHED archives at once.
+    """
+    groups = [archives[start:start + ARCHIVE_MAX_ATTACHED] for start in range(0, len(archives), ARCHIVE_MAX_ATTACHED)]
+    single = len(groups) == 1
+    keys: list[tuple[int, int]] = []
+    for number, group in enumerate(groups):
+        selects = []
+        if number == 0:
+            source, _, _ = session_filters(*filters)
+            selects.append(f"SELECT created_at, id FROM {source} {_where(conditions)}")
+        for archive in group:
+            source, _, _ = session_filters(*filters, table=archive.table)
+            selects.append(
+                f"SELECT created_at, id FROM {source} {_where(conditions + [archive.shadow_condition()])}"
+            )
+        async with archive_connection(db, *group):
+            rows = await db.fetch_all(
+                f"{' UNION ALL '.join(selects)} ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset",
+                {**values, "limit": 1 if single else offset + 1, "offset": offset if single else 0}
+            )
+        keys = list(heapq.merge(keys, [_list_key(row) for row in rows], reverse=True))[:offset + 1]
+    if single:
+        return keys[0] if keys else None
+    return keys[offset] if len(keys) > offset else None
+
+
+async def _list_with_archives(
+    db: databases.Database,
+    archives: list,
+    filters: tuple,
+    conditions: list[str],
+    values: dict,
+    offset: int,
+    limit: int
+) -> list:
+    """Rows offset to offset + limit in list order, from the hot table and
+    archives.
+    
+    Each source is read from the page's first row on (found by position
+    for an offset), newest archive first and only while one could still
+    hold a row that sorts before the last row kept.
+    """
+    if offset:
+        key = await _list_key_at(db, archives, filters, conditions, values, offset)
+        if key is None:
+            return []
+        conditions = conditions + ["(created_at, id) <= (:first_created_at, :first_id)"]
+        values = {**values, "first_created_at": key[0], "first_id": key[1]}
+        archives = [archive for archive in archives if archive.min_created_at <= key[0]]
+    order = "ORDER BY created_at DESC, id DESC LIMIT :limit"
+    source, _, _ = session_filters(*filters)
+    rows = await db.fetch_all(f"SELECT * FROM {source} {_where(conditions)} {order}", {**values, "limit": limit})
+    for archive in sorted(archives, key=lambda archive: archive.max_created_at, reverse=True):
+        if len(rows) >= limit and archive.max_created_at < rows[-1]["created_at"]:
+            break
+        source, _, _ = session_filters(*filters, table=archive.table)
+        async with archive_connection(db, archive):
+            archived = await db.fetch_all(
+                f"SELECT * FROM {source} {_where(conditions + [archive.shadow_condition()])} {order}",
+                {**values, "limit": limit}
+            )
+        seen = {row["id"] for row in rows}
+        archived = [row for row in archived if row["id"] not in seen]
+        rows = list(heapq.merge(rows, archived, key=_list_key, reverse=True))[:limit]
+    return rows
+
+
+def _wants_columnar(requested_format: Optional[str], accept: Optional[str]) -> bool:
+    """?format= wins; without it, the Accept header picks the columnar format"""
+    if requested_format is not None:
+        return requested_format == "columnar"
+    return accept is not None and "application/vnd.measured.columnar" in accept
 
 
 @router.get("/sessions", response_model=PaginatedSessions)
 async def get_sessions(
-    db: Annotated[databases.Database, Depends(get_db)],
+    request: Request,
+    db: Annotated[databases.Database, Depends(get_read_db)],
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100)
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    project_id: Optional[int] = Query(None),
+    start_after: Optional[datetime] = Query(None),
+    start_before: Optional[datetime] = Query(None),
+    open_only: bool = Query(False),
+    response_format: Optional[Literal["json", "columnar"]] = Query(None, alias="format"),
+    accept: Annotated[Optional[str], Header()] = None
+):
+    """Get paginated list of sessions.
+
+    Pages are addressed either by page number (OFFSET) or by the opaque
+    `cursor` returned as `next_cursor` from the previous page (keyset).
+    Filters narrow both the items and `total`; pass the same filters with
+    a cursor as with the page that returned it.
+    With `format=columnar` (or `Accept: application/vnd.measured.columnar+json`)
+    items come as one array per column, timestamps as epoch microseconds.
+    Serialized pages are served from the response cache until the next write,
+    and conditional requests for an unchanged table get 304. Archived
+    sessions are read only for pages that reach an archive's range.
+    """
+    columnar = _wants_columnar(response_format, accept)
+    media_type = COLUMNAR_MEDIA_TYPE if columnar else "application/json"
+    state, headers, not_modified = await check_conditional(
+        request, db, "sessions", "columnar" if columnar else ""
+    )
+    if not_modified is not None:
+        not_modified.headers.add_vary_header("Accept")
+        return not_modified
+    headers["Vary"] = "Accept"
+    cache_key = ("sessions", page, page_size, cursor, project_id, start_after, start_before, open_only, columnar)
+    session_cache.observe_version(state.version)
+    body = session_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type=media_type, headers={**headers, "X-Cache": "HIT"})
+    generation = session_cache.generation
+    
+    filters = (project_id, start_after, start_before, open_only)
+    source, conditions, values = session_filters(*filters)
+    archives = [
+        archive for archive in await archive_catalog.archives(db, state.version)
+        if archive.reaches(values.get("start_after"), values.get("start_before"), open_only)
+    ]
+    
+    # Totals come from the trigger-maintained counters when they can; the
+    # counters include archived sessions, counted totals add them
+    archived_total = 0
+    if not conditions:
+        total_row = await db.fetch_one(
+            "SELECT row_count as total FROM table_counts WHERE name = 'sessions'"
+        )
+    elif conditions == ["project_id = :project_id"]:
+        total_row = await db.fetch_one(
+            "SELECT session_count as total FROM project_session_counts WHERE project_id = :project_id",
+            values
+        )
+    else:
+        total_row = await db.fetch_one(f"SELECT COUNT(*) as total FROM {source} {_where(conditions)}", values)
+        for archive in archives:
+            archive_source, _, _ = session_filters(*filters, table=archive.table)
+            async with archive_connection(db, archive):
+                archived_total += await db.fetch_val(
+                    f"SELECT COUNT(*) FROM {archive_source} {_where(conditions)}", values
+                )
+    total = (total_row["total"] if total_row is not None else 0) + archived_total
+    
+    # Fetch one extra row to know whether a next page exists
+    if cursor is not None:
+        try:
+            created_at, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        page_conditions = conditions + ["(created_at, id) < (:created_at, :last_id)"]
+        page_values = {**values, "created_at": created_at, "last_id": last_id}
+        offset = 0
+        archives = [archive for archive in archives if archive.min_created_at <= created_at]
+        rows = await db.fetch_all(
+            f"""
+            SELECT * FROM {source}
+            {_where(page_conditions)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT :limit
+            """,
+            {**page_values, "limit": page_size + 1}
+        )
+    else:
+        page_conditions, page_values, offset = conditions, values, (page - 1) * page_size
+        rows = await db.fetch_all(
+            f"""
+            SELECT * FROM {source}
+            {_where(conditions)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT :limit OFFSET :offset
+            """,
+            {**values, "limit": page_size + 1, "offset": offset}
+        )
+    # Archived sessions matter only if one could sort before the page's end
+    if archives and (
+        len(rows) <= page_size or max(archive.max_created_at for archive in archives) >= rows[-1]["created_at"]
+    ):
+        rows = await _list_with_archives(db, archives, filters, page_conditions, page_values, offset, page_size + 1)
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    
+    # Fast path: rows straight to PaginatedSessions JSON bytes
+    encode = encode_sessions_page_columnar if columnar else encode_sessions_page
+    body = encode(rows, total, page, page_size, next_cursor)
+    session_cache.set(cache_key, body, generation)
+    return Response(content=body, media_type=media_type, headers={**headers, "X-Cache": "MISS"})
+
+
+def _export_timestamp(value: Optional[int]) -> Optional[str]:
+    """Format a stored timestamp the way the JSON API does"""
+    return format_datetime(from_epoch_us(value)) if value is not None else None
+
+
+async def _export_rows(db: databases.Database, archives: list) -> AsyncIterator[tuple]:
+    """Stream session rows as plain tuples straight from the DB cursor"""
+    async for row in iterate_sessions(db, archives, EXPORT_BATCH_SIZE):
+        yield (
+            row["id"],
+            row["project_id"],
+            _export_timestamp(row["start_time"]),
+            _export_timestamp(row["end_time"]),
+            _export_timestamp(row["created_at"])
+        )
+
+
+async def _export_ndjson(db: databases.Database, archives: list) -> AsyncIterator[bytes]:
+    batch = []
+    async for row in iterate_sessions(db, archives, EXPORT_BATCH_SIZE):
+        batch.append(row)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield encode_sessions_ndjson(batch)
+            batch = []
+    if batch:
+        yield encode_sessions_ndjson(batch)
+
+
+async def _export_columnar(db: databases.Database, archives: list) -> AsyncIterator[bytes]:
+    """One columnar object (a line) per batch of rows"""
+    batch = []
+    async for row in iterate_sessions(db, archives, EXPORT_BATCH_SIZE):
+        batch.append(row)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield dumps(session_columns(batch)) + b"\n"
+            batch = []
+    if batch:
+        yield dumps(session_columns(batch)) + b"\n"
+
+
+async def _export_csv(db: databases.Database, archives: list) -> AsyncIterator[bytes]:
+    # Imported here: CSV export is rare and this keeps it off the startup path
+    import csv
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    rows_in_buffer = 0
+    async for values in _export_rows(db, archives):
+        writer.writerow(values)
+        rows_in_buffer += 1
+        if rows_in_buffer >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            rows_in_buffer = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+@router.get("/sessions/export", response_class=StreamingResponse)
+async def export_sessions(
+    request: Request,
+    db: Annotated[databases.Database, Depends(get_read_db)],
+    export_format: Optional[Literal["ndjson", "csv", "columnar"]] = Query(None, alias="format"),
+    accept: Annotated[Optional[str], Header()] = None
 ):
-    """Get paginated list of sessions"""
-    offset = (page - 1) * page_size
+    """Export all sessions as NDJSON, CSV or columnar NDJSON.
     
-    # Get total count
-    total_row = await db.fetch_one("SELECT COUNT(*) as total FROM sessions")
-    total = total_row["total"]
+    Rows are streamed from the DB cursor in fixed-size batches, so memory use
+    does not depend on the number of sessions; archived sessions are merged
+    in by id. The columnar format (also
+    chosen by `Accept: application/vnd.measured.columnar+x-ndjson`) writes
+    one line of column arrays per batch.
+    """
+    if export_format is None:
+        export_format = "columnar" if _wants_columnar(None, accept) else "ndjson"
+    state, headers, not_modified = await check_conditional(request, db, "sessions", export_format)
+    if not_modified is not None:
+        return not_modified
+    archives = await archive_catalog.archives(db, state.version)
+    if export_format == "csv":
+        content, media_type = _export_csv(db, archives), "text/csv"
+    elif export_format == "columnar":
+        content, media_type = _export_columnar(db, archives), COLUMNAR_NDJSON_MEDIA_TYPE
+    else:
+        content, media_type = _export_ndjson(db, archives), "application/x-ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={**headers, "Content-Disposition": f'attachment; filename="sessions.{export_format}"'}
+    )
+
+
+@router.get("/sessions/active", response_model=list[SessionSchema])
+async def get_active_sessions(
+    request: Request,
+    db: Annotated[databases.Database, Depends(get_read_db)],
+    project_id: Optional[int] = None
+):
+    """Get running sessions (no end_time), most recently started first.
     
-    # Get sessions with pagination
+    Reads only the partial index of open sessions, so the cost depends on
+    how many timers are running, not on the size of the history.
+    """
+    _, headers, not_modified = await check_conditional(request, db, "sessions")
+    if not_modified is not None:
+        return not_modified
+    conditions = ["end_time IS NULL"]
+    values = {}
+    if project_id is not None:
+        conditions.append("project_id = :project_id")
+        values["project_id"] = project_id
     rows = await db.fetch_all(
-        """
-        SELECT * FROM sessions
-        ORDER BY created_at DESC
-        LIMIT :page_size OFFSET :offset
+        f"""
+        SELECT * FROM sessions INDEXED BY idx_sessions_open_start_time_id
+        {_where(conditions)}
+        ORDER BY start_time DESC, id DESC
         """,
-        {"page_size": page_size, "offset": offset}
+        values
     )
-    sessions = [Session.from_row(row) for row in rows]
+    return Response(content=encode_sessions(rows), media_type="application/json", headers=headers)
+
+
+async def _event_stream(last_event_id: Optional[str]) -> AsyncIterator[bytes]:
+    # Subscribed here rather than in the endpoint, so a client that goes
+    # away before the stream starts never leaves a subscription behind
+    subscription = session_events.subscribe(last_event_id)
+    try:
+        # Ask EventSource to reconnect after 3 s if the stream ends
+        yield b"retry: 3000\n\n"
+        for event in subscription.backlog:
+            yield event.encode()
+        subscription.backlog = []
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), SESSION_STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment line, keeps proxies from closing an idle stream
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                # Dropped for falling behind; the client reconnects and resumes
+                return
+            yield event.encode()
+    finally:
+        session_events.unsubscribe(subscription)
+
+
+@router.get("/sessions/stream", response_class=StreamingResponse)
+async def stream_sessions(last_event_id: Annotated[Optional[str], Header()] = None):
+    """Stream session changes as Server-Sent Events.
     
-    return PaginatedSessions(
-        items=sessions,
-        total=total,
-        page=page,
-        page_size=page_size
+    Events are `created` and `updated` (data: the session, as returned by
+    GET /api/sessions/{id}) and `resync` (refetch: many sessions changed at
+    once, or the changes since `Last-Event-ID` are no longer buffered).
+    """
+    return StreamingResponse(
+        _event_stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
 @router.get("/sessions/{session_id}", response_model=SessionSchema)
 async def get_session(
     session_id: int,
-    db: Annotated[databases.Database, Depends(get_db)]
+    request: Request,
+    db: Annotated[databases.Database, Depends(get_read_db)]
 ):
     """Get a single session by ID"""
+    state, headers, not_modified = await check_conditional(request, db, "sessions")
+    if not_modified is not None:
+        return not_modified
+    cache_key = ("session", session_id)
+    session_cache.observe_version(state.version)
+    body = session_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers={**headers, "X-Cache": "HIT"})
+    generation = session_cache.generation
+    
     row = await db.fetch_one(
         "SELECT * FROM sessions WHERE id = :session_id",
         {"session_id": session_id}
     )
+    if not row:
+        archives = await archive_catalog.archives(db, state.version)
+        row = (await fetch_archived(db, archives, [session_id])).get(session_id)
     if not row:
         raise HTTPException(status_code=404, detail="Session not found")
-    return Session.from_row(row)
+    body = encode_session(row)
+    session_cache.set(cache_key, body, generation)
+    return Response(content=body, media_type="application/json", headers={**headers, "X-Cache": "MISS"})
 
 
 @router.put("/sessions/{session_id}", response_model=SessionSchema)
@@ -96,31 +843,26 @@ async def update_session(
     db: Annotated[databases.Database, Depends(get_db)]
 ):
     """Update a session's start_time and end_time"""
-    # Check if session exists
-    row = await db.fetch_one(
-        "SELECT id FROM sessions WHERE id = :session_id",
-        {"session_id": session_id}
-    )
-    if not row:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    # Update session
-    await db.execute(
-        """
+    # Update and return the session in one statement; no row means no session
+    query = """
         UPDATE sessions
         SET start_time = :start_time, end_time = :end_time
         WHERE id = :session_id
-        """,
-        {
-            "start_time": session_update.start_time.isoformat(),
-            "end_time": session_update.end_time.isoformat(),
-            "session_id": session_id
-        }
-    )
+        RETURNING *
+    """
+    values = {
+        "start_time": to_epoch_us(session_update.start_time),
+        "end_time": to_epoch_us(session_update.end_time),
+        "session_id": session_id
+    }
+    row = await db.fetch_one(query, values)
+    if not row and await restore_session(db, session_id):
+        # Archived sessions are moved back to the hot table to be updated
+        row = await db.fetch_one(query, values)
+    if not row:
+        raise HTTPException(status_code=404, detail="Session not found")
     
-    # Get the updated session
-    row = await db.fetch_one(
-        "SELECT * FROM sessions WHERE id = :session_id",
-        {"session_id": session_id}
-    )
-    return Session.from_row(row)
+    session_cache.invalidate()
+    body = encode_session(row)
+    session_events.publish("updated", body)
+    return Response(content=body, media_type="application/json")
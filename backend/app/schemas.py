@@ -1,6 +1,10 @@
-from pydantic import BaseModel, ConfigDict
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import date, datetime
 from typing import Optional
+import os
+
+# Most ids one POST /sessions/batch-get may ask for
+SESSION_BATCH_GET_LIMIT = int(os.getenv("SESSION_BATCH_GET_LIMIT", "1000"))
 
 
 class ProjectBase(BaseModel):
@@ -27,6 +31,17 @@ class SessionUpdate(BaseModel):
     end_time: datetime
 
 
+class SessionStart(BaseModel):
+    project_id: int
+    # Defaults to now
+    start_time: Optional[datetime] = None
+
+
+class SessionStop(BaseModel):
+    # Defaults to now
+    end_time: Optional[datetime] = None
+
+
 class Session(SessionBase):
     id: int
     created_at: datetime
@@ -39,4 +54,65 @@ class PaginatedSessions(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+
+
+class BulkSessionResult(BaseModel):
+    index: int
+    status: str
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkSessionsResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkSessionResult]
+
+
+class SessionBatchGet(BaseModel):
+    ids: list[int] = Field(..., max_length=SESSION_BATCH_GET_LIMIT)
+
+
+class SessionBatch(BaseModel):
+    # In request order, null where the id was not found
+    items: list[Optional[Session]]
+    not_found: list[int]
+
+
+class SummaryItem(BaseModel):
+    project_id: int
+    period: date
+    seconds: float
+
+
+class ReportSummary(BaseModel):
+    start_date: date
+    end_date: date
+    granularity: str
+    items: list[SummaryItem]
+
+
+class HistogramBin(BaseModel):
+    min_seconds: int
+    max_seconds: Optional[int]
+    count: int
+
+
+class ProjectAnalytics(BaseModel):
+    project_id: int
+    sessions: int
+    total_seconds: float
+    mean_seconds: float
+    percentiles: dict[str, float]
+    histogram: list[HistogramBin]
+    active_days: int
+    longest_streak_days: int
+    # Sessions started per weekday (Monday first) and UTC hour
+    heatmap: list[list[int]]
+
 
+class AnalyticsReport(BaseModel):
+    start_date: Optional[date]
+    end_date: Optional[date]
+    projects: list[ProjectAnalytics]
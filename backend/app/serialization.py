@@ -0,0 +1,103 @@
+"""
+Fast path from database rows to JSON response bytes.
+Routes that return many sessions (lists, exports, cached bodies) encode
+SessionRow objects directly instead of going through the dataclass ->
+Pydantic validation -> stdlib JSON chain. The output is byte-for-byte what
+the Pydantic schemas produce, so the declared response models and the
+OpenAPI schema stay as they are.
+
+The columnar format (COLUMNAR_MEDIA_TYPE) skips datetimes altogether: one
+array per column, with timestamps as the stored integer microseconds.
+"""
+import json
+from datetime import datetime
+from typing import Iterable, Optional
+
+from app.models import SessionRow
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.measured.columnar+json"
+COLUMNAR_NDJSON_MEDIA_TYPE = "application/vnd.measured.columnar+x-ndjson"
+
+# Columns of the columnar format, in sessions table order
+SESSION_COLUMNS = ("id", "project_id", "start_time", "end_time", "created_at")
+
+
+def format_datetime(value: datetime) -> str:
+    """Format a datetime the way Pydantic does (UTC offset written as Z)"""
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return format_datetime(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """Encode value as compact JSON bytes, with datetimes in Pydantic's format"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_UTC_Z)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+
+def encode_session(row) -> bytes:
+    """Encode one session row as a schemas.Session JSON object"""
+    return dumps(SessionRow.from_row(row).to_dict())
+
+
+def encode_sessions(rows: Iterable) -> bytes:
+    """Encode session rows as a JSON array of schemas.Session objects"""
+    return dumps([SessionRow.from_row(row).to_dict() for row in rows])
+
+
+def encode_sessions_page(rows: Iterable, total: int, page: int, page_size: int, next_cursor: Optional[str]) -> bytes:
+    """Encode session rows as a schemas.PaginatedSessions JSON object"""
+    return dumps({
+        "items": [SessionRow.from_row(row).to_dict() for row in rows],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+    })
+
+
+def encode_sessions_batch(ids: list[int], rows_by_id: dict) -> bytes:
+    """Encode the rows for ids, in that order, as a schemas.SessionBatch object"""
+    items = []
+    not_found = []
+    for session_id in ids:
+        row = rows_by_id.get(session_id)
+        if row is None:
+            items.append(None)
+            not_found.append(session_id)
+        else:
+            items.append(SessionRow.from_row(row).to_dict())
+    return dumps({"items": items, "not_found": not_found})
+
+
+def session_columns(rows: list) -> dict[str, list]:
+    """Transpose session rows into one list per column (timestamps as epoch us)"""
+    return {column: [row[column] for row in rows] for column in SESSION_COLUMNS}
+
+
+def encode_sessions_page_columnar(rows: list, total: int, page: int, page_size: int, next_cursor: Optional[str]) -> bytes:
+    """Encode a sessions page in the columnar format"""
+    return dumps({
+        "columns": session_columns(rows),
+        "time_unit": "us",
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+    })
+
+
+def encode_sessions_ndjson(rows: Iterable) -> bytes:
+    """Encode session rows as newline-terminated JSON objects"""
+    return b"".join(dumps(SessionRow.from_row(row).to_dict()) + b"\n" for row in rows)
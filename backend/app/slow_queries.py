@@ -0,0 +1,90 @@
+"""
+Slow-query log with query plans.
+Queries made through get_db/get_read_db that take longer than a threshold
+are logged together with their EXPLAIN QUERY PLAN output, and the most
+recent ones are kept in a ring buffer for GET /api/debug/slow-queries.
+Plans that scan a table or sort through a temporary B-tree are flagged.
+"""
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+import databases
+
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "1") == "1"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "50"))
+# Bound parameters can contain user data; they are replaced by "?" unless disabled
+SLOW_QUERY_REDACT_PARAMS = os.getenv("SLOW_QUERY_REDACT_PARAMS", "1") == "1"
+
+# Plan fragments that usually point at a missing index
+PLAN_WARNINGS = ("SCAN", "USE TEMP B-TREE")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    params: Optional[dict]
+    duration_ms: float
+    plan: list[str]
+    flags: list[str]
+    recorded_at: float = field(default_factory=time.time)
+
+
+def plan_flags(plan: list[str]) -> list[str]:
+    """Return the PLAN_WARNINGS found in any step of a query plan"""
+    return [warning for warning in PLAN_WARNINGS if any(warning in step for step in plan)]
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float, max_entries: int, redact_params: bool = True, enabled: bool = True):
+        self.threshold_ms = threshold_ms
+        self.redact_params = redact_params
+        self.enabled = enabled
+        self._entries: deque[SlowQuery] = deque(maxlen=max_entries)
+
+    def is_slow(self, seconds: float) -> bool:
+        return self.enabled and seconds * 1000 >= self.threshold_ms
+
+    async def record(self, db: databases.Database, query: str, values: Optional[dict], seconds: float) -> SlowQuery:
+        """Explain a slow query on db and keep it in the ring buffer"""
+        statement = " ".join(query.split())
+        try:
+            rows = await db.fetch_all(f"EXPLAIN QUERY PLAN {query}", values)
+            plan = [row["detail"] for row in rows]
+        except Exception as exc:  # Not every statement or backend can be explained
+            plan = [f"EXPLAIN failed: {exc}"]
+        params = values
+        if values is not None and self.redact_params:
+            params = {name: "?" for name in values}
+        entry = SlowQuery(statement, params, round(seconds * 1000, 3), plan, plan_flags(plan))
+        self._entries.append(entry)
+        logger.warning(
+            "Slow query (%.1f ms): %s params=%s plan=%s%s",
+            entry.duration_ms, statement, params, " | ".join(plan),
+            f" [{', '.join(entry.flags)}]" if entry.flags else ""
+        )
+        return entry
+
+    def entries(self) -> list[dict]:
+        """Recorded queries, newest first"""
+        return [asdict(entry) for entry in reversed(self._entries)]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "max_entries": self._entries.maxlen,
+            "redact_params": self.redact_params,
+        }
+
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_REDACT_PARAMS, SLOW_QUERY_LOG_ENABLED)
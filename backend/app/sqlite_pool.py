@@ -0,0 +1,212 @@
+"""
+Pooled SQLite backend for the `databases` library.
+The stock backend opens a fresh connection for every acquire and leaves
+SQLite at its defaults. This backend keeps connections open in a small pool
+and applies a profile (foreign keys, journal mode, synchronous, mmap,
+cache size, busy timeout) once when each connection is opened.
+Transactions on the writer start with BEGIN IMMEDIATE, so when several
+processes share the file they queue for the write lock up front instead of
+failing when a read transaction tries to upgrade to a write.
+"""
+import asyncio
+import os
+import sqlite3
+from dataclasses import dataclass
+
+import aiosqlite
+from databases.backends.sqlite import SQLiteBackend, SQLiteConnection, SQLitePool, SQLiteTransaction
+from databases.core import DatabaseURL
+
+
+@dataclass
+class SQLiteProfile:
+    enabled: bool = True
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 64 * 1024 * 1024
+    # Negative values are KiB, positive values are pages (SQLite convention)
+    cache_size: int = -16000
+    busy_timeout_ms: int = 5000
+    # Extra attempts at BEGIN IMMEDIATE when the lock is still busy after busy_timeout_ms
+    busy_retries: int = 3
+    read_pool_size: int = 4
+    foreign_keys: bool = True
+
+    @classmethod
+    def from_env(cls) -> "SQLiteProfile":
+        """Create a profile from SQLITE_* environment variables"""
+        defaults = cls()
+        return cls(
+            enabled=os.getenv("SQLITE_PERFORMANCE_PROFILE", "1") == "1",
+            journal_mode=os.getenv("SQLITE_JOURNAL_MODE", defaults.journal_mode),
+            synchronous=os.getenv("SQLITE_SYNCHRONOUS", defaults.synchronous),
+            mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", defaults.mmap_size)),
+            cache_size=int(os.getenv("SQLITE_CACHE_SIZE", defaults.cache_size)),
+            busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT", defaults.busy_timeout_ms)),
+            busy_retries=int(os.getenv("SQLITE_BUSY_RETRIES", defaults.busy_retries)),
+            read_pool_size=int(os.getenv("SQLITE_READ_POOL_SIZE", defaults.read_pool_size)),
+            foreign_keys=os.getenv("SQLITE_FOREIGN_KEYS", "1") == "1",
+        )
+
+    @property
+    def foreign_keys_pragma(self) -> str:
+        return f"PRAGMA foreign_keys = {'ON' if self.foreign_keys else 'OFF'}"
+
+    def connection_pragmas(self, read_only: bool) -> list[str]:
+        """PRAGMA statements applied to every new connection.
+        
+        Foreign keys and query_only are correctness settings and apply even
+        when the performance settings are disabled.
+        """
+        pragmas = [self.foreign_keys_pragma]
+        if self.enabled:
+            # Busy timeout first, so switching the journal mode waits for
+            # other processes opening the same file
+            pragmas.append(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+            if not read_only:
+                # Journal mode is persistent in the file, so the writer sets it
+                pragmas.append(f"PRAGMA journal_mode = {self.journal_mode}")
+            pragmas += [
+                f"PRAGMA synchronous = {self.synchronous}",
+                f"PRAGMA mmap_size = {self.mmap_size}",
+                f"PRAGMA cache_size = {self.cache_size}",
+            ]
+        if read_only:
+            pragmas.append("PRAGMA query_only = ON")
+        return pragmas
+
+
+def is_busy_error(error: Exception) -> bool:
+    """Whether error is SQLITE_BUSY ("database is locked")"""
+    return isinstance(error, sqlite3.OperationalError) and "locked" in str(error)
+
+
+class ImmediateSQLiteTransaction(SQLiteTransaction):
+    """Transaction that takes the write lock when it begins.
+    
+    A deferred transaction that reads and then writes fails immediately with
+    SQLITE_BUSY if another process committed in between (busy_timeout does
+    not apply, as waiting could deadlock). BEGIN IMMEDIATE waits for the lock
+    first, and is retried with backoff if it is still busy after the timeout.
+    """
+
+    def __init__(self, connection: SQLiteConnection, busy_retries: int):
+        super().__init__(connection)
+        self._busy_retries = busy_retries
+
+    async def start(self, is_root: bool, extra_options: dict) -> None:
+        if not is_root:
+            await super().start(is_root, extra_options)
+            return
+        self._is_root = True
+        for attempt in range(self._busy_retries + 1):
+            try:
+                async with self._connection._connection.execute("BEGIN IMMEDIATE"):
+                    return
+            except sqlite3.OperationalError as error:
+                if not is_busy_error(error) or attempt == self._busy_retries:
+                    raise
+            await asyncio.sleep(0.05 * 2 ** attempt)
+
+
+class PooledSQLiteConnection(SQLiteConnection):
+    def __init__(self, pool: "PooledSQLitePool", dialect):
+        super().__init__(pool, dialect)
+        self._profile = pool._profile
+        self._read_only = pool._read_only
+
+    def transaction(self) -> SQLiteTransaction:
+        if self._read_only:
+            return super().transaction()
+        return ImmediateSQLiteTransaction(self, self._profile.busy_retries)
+
+
+class PooledSQLitePool(SQLitePool):
+    def __init__(self, url: DatabaseURL, profile: SQLiteProfile, read_only: bool, size: int, **options):
+        super().__init__(url, **options)
+        self._profile = profile
+        self._read_only = read_only
+        self._size = size
+        self._idle: list[aiosqlite.Connection] = []
+        self._slots: asyncio.Semaphore | None = None
+
+    async def acquire(self) -> aiosqlite.Connection:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._size)
+        await self._slots.acquire()
+        try:
+            if self._idle:
+                return self._idle.pop()
+            connection = await super().acquire()
+            for pragma in self._profile.connection_pragmas(self._read_only):
+                async with connection.execute(pragma):
+                    pass
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, connection: aiosqlite.Connection) -> None:
+        try:
+            if connection.in_transaction:
+                await connection.rollback()
+            self._idle.append(connection)
+        except BaseException:
+            await super().release(connection)
+            raise
+        finally:
+            self._slots.release()
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await super().release(connection)
+        self._slots = None
+
+
+class PooledSQLiteBackend(SQLiteBackend):
+    def __init__(
+        self,
+        database_url: DatabaseURL | str,
+        *,
+        profile: SQLiteProfile,
+        read_only: bool = False,
+        pool_size: int = 1,
+        **options
+    ) -> None:
+        super().__init__(database_url, **options)
+        self._pool = PooledSQLitePool(self._database_url, profile, read_only, pool_size, **options)
+
+    def connection(self) -> PooledSQLiteConnection:
+        return PooledSQLiteConnection(self._pool, self._dialect)
+
+    async def disconnect(self) -> None:
+        await self._pool.close()
+        await super().disconnect()
+
+
+class UnpooledSQLitePool(SQLitePool):
+    """The stock pool (a new connection per acquire), with the profile's
+    foreign key setting applied to each connection
+    """
+
+    def __init__(self, url: DatabaseURL, profile: SQLiteProfile, **options):
+        super().__init__(url, **options)
+        self._profile = profile
+
+    async def acquire(self) -> aiosqlite.Connection:
+        connection = await super().acquire()
+        async with connection.execute(self._profile.foreign_keys_pragma):
+            pass
+        return connection
+
+
+class UnpooledSQLiteBackend(SQLiteBackend):
+    """Backend for in-memory databases, where every connection is its own
+    database and there is nothing to pool or tune; the stock backend would
+    leave foreign keys off
+    """
+
+    def __init__(self, database_url: DatabaseURL | str, *, profile: SQLiteProfile, **options) -> None:
+        super().__init__(database_url, **options)
+        self._pool = UnpooledSQLitePool(self._database_url, profile, **options)
@@ -0,0 +1,116 @@
+"""
+Cold-start support for scale-to-zero deployments.
+Startup phases are timed from process start (read from /proc on Linux, so
+interpreter boot and imports are included), up to the first response sent.
+In fast-start mode the lifespan skips migrations when the schema is already
+current and warms the read connections in the background after startup.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+import databases
+
+# Set FAST_START=0 to run migrations on every startup and skip cache warming
+FAST_START = os.getenv("FAST_START", "1") == "1"
+
+# Queries that pull the pages the first requests need into each read
+# connection's page cache: the project list, the newest end of the session
+# list index, the counters and the (small) rollup table
+WARM_QUERIES = [
+    "SELECT id, name FROM projects ORDER BY id",
+    "SELECT * FROM sessions ORDER BY created_at DESC, id DESC LIMIT 100",
+    "SELECT name, row_count FROM table_counts",
+    "SELECT COUNT(*) FROM project_session_counts",
+    "SELECT COUNT(*), SUM(microseconds) FROM session_rollups",
+]
+
+# uvicorn's error logger is the one its default config prints at INFO
+logger = logging.getLogger("uvicorn.error")
+
+
+def _process_started_at() -> float:
+    """Wall-clock time the process started, or now if it cannot be read"""
+    now = time.time()
+    try:
+        with open("/proc/uptime") as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+        with open("/proc/self/stat") as stat_file:
+            # Field 22 (starttime) in clock ticks since boot; fields after the
+            # parenthesized command name are space separated
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+        started_ticks = int(fields[19])
+        return now - (uptime - started_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return now
+
+
+class StartupTimer:
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.phases: dict[str, float] = {}
+        self.first_response_ms: Optional[float] = None
+
+    def elapsed_ms(self) -> float:
+        return round((time.time() - self.started_at) * 1000, 1)
+
+    def mark(self, phase: str) -> None:
+        """Record that phase finished now"""
+        self.phases[phase] = self.elapsed_ms()
+
+    def report(self) -> dict:
+        return {
+            "fast_start": FAST_START,
+            "phases_ms": self.phases,
+            "time_to_first_response_ms": self.first_response_ms,
+        }
+
+
+startup_timer = StartupTimer(_process_started_at())
+
+
+class FirstResponseTimer:
+    """ASGI middleware recording when the first response starts"""
+
+    def __init__(self, app, timer: StartupTimer = startup_timer):
+        self.app = app
+        self.timer = timer
+
+    async def __call__(self, scope, receive, send):
+        if self.timer.first_response_ms is not None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_first(message):
+            if message["type"] == "http.response.start" and self.timer.first_response_ms is None:
+                self.timer.first_response_ms = self.timer.elapsed_ms()
+                logger.info(
+                    "Cold start: first response %.0f ms after process start (%s)",
+                    self.timer.first_response_ms,
+                    ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in self.timer.phases.items())
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_first)
+
+
+async def _warm_connection(db: databases.Database) -> None:
+    async with db.connection() as connection:
+        for query in WARM_QUERIES:
+            await connection.fetch_all(query)
+
+
+async def warm_cache(db: databases.Database, connections: int) -> None:
+    """Open up to `connections` pooled connections and run WARM_QUERIES on each.
+
+    Each task holds its own connection, so every reader in the pool is
+    opened (pragmas applied) and warmed before requests need it.
+    """
+    try:
+        await asyncio.gather(*(_warm_connection(db) for _ in range(connections)))
+    except Exception:  # Warming is best effort; requests work without it
+        logger.exception("Cache warm-up failed")
+        return
+    startup_timer.mark("cache_warmed")
@@ -0,0 +1,123 @@
+"""
+Group commit for single-row inserts.
+Writers submit their statement values to a queue; a background task gathers
+everything that arrives within a short window (or up to a batch size) and
+runs it in one transaction, so a burst pays for one commit instead of one
+per request. Each item runs in its own savepoint, so a failing item only
+fails its own caller.
+"""
+import asyncio
+import os
+from collections import Counter
+from typing import Any, Optional
+
+import databases
+
+SESSION_WRITE_COALESCING = os.getenv("SESSION_WRITE_COALESCING", "0") == "1"
+SESSION_WRITE_WINDOW_MS = float(os.getenv("SESSION_WRITE_WINDOW_MS", "2"))
+SESSION_WRITE_BATCH_SIZE = int(os.getenv("SESSION_WRITE_BATCH_SIZE", "64"))
+
+
+class WriteCoalescer:
+    def __init__(self, db: databases.Database, statement: str, window_seconds: float, max_batch_size: int):
+        self.db = db
+        self.statement = statement
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.batch_sizes: Counter[int] = Counter()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._accepting = False
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        self._accepting = True
+
+    async def stop(self) -> None:
+        """Flush everything already submitted, then stop the worker"""
+        if self._worker is None:
+            return
+        # Nothing would drain items queued behind the stop marker
+        self._accepting = False
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+
+    async def submit(self, values: dict) -> Any:
+        """Queue one statement execution and wait for its returned row.
+
+        Raises:
+            RuntimeError: The coalescer is not running.
+        """
+        if not self._accepting:
+            raise RuntimeError("Write coalescer is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((values, future))
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "window_ms": self.window_seconds * 1000,
+            "max_batch_size": self.max_batch_size,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "batches": sum(self.batch_sizes.values()),
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.window_seconds
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    item = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list) -> None:
+        self.batch_sizes[len(batch)] += 1
+        results = []
+        try:
+            async with self.db.transaction():
+                for values, future in batch:
+                    if future.done():
+                        # Caller went away before its turn
+                        results.append(None)
+                        continue
+                    try:
+                        async with self.db.transaction():
+                            results.append((await self.db.fetch_one(self.statement, values), None))
+                    except Exception as error:
+                        results.append((None, error))
+        except Exception as error:
+            # The commit itself failed: nothing in the batch was written
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if result is None or future.done():
+                continue
+            row, error = result
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(row)
+
+
+# Coalescer for POST /api/sessions, started in main.lifespan when enabled
+session_insert_coalescer: Optional[WriteCoalescer] = None
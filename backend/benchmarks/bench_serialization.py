@@ -0,0 +1,105 @@
+"""
+Microbenchmark: serialize a 100-row sessions page through the default
+FastAPI path and through the fast path in app.serialization, then compare
+the JSON and columnar formats (encode and decode time, raw and compressed
+size).
+
+Run from the backend directory:
+    python -m benchmarks.bench_serialization
+"""
+import json
+import timeit
+import zlib
+from datetime import datetime, timedelta
+
+from app.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from app.models import Session, to_epoch_us
+from app.schemas import PaginatedSessions
+from app.serialization import encode_sessions_page, encode_sessions_page_columnar
+
+PAGE_SIZE = 100
+
+
+def make_rows(count: int) -> list[dict]:
+    start = datetime(2025, 1, 1, 9, 0, 0, 123456)
+    return [
+        {
+            "id": i,
+            "project_id": i % 5 + 1,
+            "start_time": to_epoch_us(start + timedelta(hours=i)),
+            "end_time": to_epoch_us(start + timedelta(hours=i, minutes=45)) if i % 10 else None,
+            "created_at": to_epoch_us(start + timedelta(hours=i, minutes=46)),
+        }
+        for i in range(count)
+    ]
+
+
+def default_path(rows: list[dict]) -> bytes:
+    """Dataclass -> response_model validation -> JSON-mode dump -> json.dumps,
+    as FastAPI does for a route with response_model"""
+    content = PaginatedSessions.model_validate(
+        {
+            "items": [Session.from_row(row) for row in rows],
+            "total": 1000,
+            "page": 1,
+            "page_size": PAGE_SIZE,
+            "next_cursor": None,
+        },
+        from_attributes=True,
+    )
+    return json.dumps(content.model_dump(mode="json"), separators=(",", ":")).encode()
+
+
+def fast_path(rows: list[dict]) -> bytes:
+    return encode_sessions_page(rows, 1000, 1, PAGE_SIZE, None)
+
+
+def compare_formats(rows: list[dict], number: int = 500) -> dict:
+    """Encode time, decode time (json.loads, plus parsing the ISO
+    timestamps for the JSON format) and sizes of each format"""
+    encoders = {
+        "json": lambda: encode_sessions_page(rows, 1000, 1, len(rows), None),
+        "columnar": lambda: encode_sessions_page_columnar(rows, 1000, 1, len(rows), None),
+    }
+
+    def decode_json(body: bytes):
+        for item in json.loads(body)["items"]:
+            datetime.fromisoformat(item["start_time"])
+
+    decoders = {"json": decode_json, "columnar": json.loads}
+    results = {}
+    for name, encode in encoders.items():
+        body = encode()
+        sizes = {"raw": len(body), "gzip": len(zlib.compress(body, GZIP_LEVEL))}
+        if brotli is not None:
+            sizes["br"] = len(brotli.compress(body, quality=BROTLI_QUALITY))
+        results[name] = {
+            "encode_us": min(timeit.repeat(encode, number=number, repeat=5)) / number * 1e6,
+            "decode_us": min(timeit.repeat(lambda: decoders[name](body), number=number, repeat=5)) / number * 1e6,
+            "bytes": sizes,
+        }
+        print(
+            f"{name:9} {len(rows)} rows: encode {results[name]['encode_us']:.1f} us, "
+            f"decode {results[name]['decode_us']:.1f} us, "
+            + ", ".join(f"{encoding} {size} B" for encoding, size in sizes.items())
+        )
+    return results
+
+
+def main(number: int = 2000) -> dict:
+    rows = make_rows(PAGE_SIZE)
+    assert json.loads(default_path(rows)) == json.loads(fast_path(rows))
+    results = {}
+    for name, path in (("default", default_path), ("fast", fast_path)):
+        seconds = min(timeit.repeat(lambda: path(rows), number=number, repeat=5))
+        results[name] = seconds / number * 1e6
+    results["speedup"] = results["default"] / results["fast"]
+    print(f"default path: {results['default']:.1f} us/page")
+    print(f"fast path:    {results['fast']:.1f} us/page")
+    print(f"speedup:      {results['speedup']:.1f}x")
+    results["formats"] = {count: compare_formats(make_rows(count)) for count in (PAGE_SIZE, 500)}
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Cold-start benchmark: start the server as a new process (as a scale-to-zero
+machine does) and measure the time until it answers its first real request.
+Reports each run's time to first response, with the in-process phase
+breakdown from GET /api/health/startup, as JSON.
+
+Run from the backend directory against a copy of a real database:
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.cold_start --runs 5
+
+Compare modes, or fail (exit status 1) above a budget:
+    FAST_START=0 DATABASE_URL=sqlite:///./bench.db python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --max-ms 2000
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+FIRST_REQUEST = "/api/sessions?page_size=20"
+POLL_INTERVAL = 0.005
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(port: int, path: str) -> tuple[int, bytes]:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def measure_once(timeout: float = 30) -> dict:
+    """Start uvicorn, wait for the first successful response, then stop it"""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"No response within {timeout}s")
+            try:
+                status, _ = _get(port, FIRST_REQUEST)
+            except OSError:
+                time.sleep(POLL_INTERVAL)
+                continue
+            if status == 200:
+                break
+            raise RuntimeError(f"{FIRST_REQUEST} returned {status}")
+        first_response_ms = round((time.perf_counter() - started) * 1000, 1)
+        _, body = _get(port, "/api/health/startup")
+        return {"first_response_ms": first_response_ms, "server": json.loads(body)}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(runs: int) -> dict:
+    results = [measure_once() for _ in range(runs)]
+    times = [result["first_response_ms"] for result in results]
+    return {
+        "fast_start": os.getenv("FAST_START", "1") == "1",
+        "runs": results,
+        "min_ms": min(times),
+        "median_ms": statistics.median(times),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the Measured API")
+    parser.add_argument("--runs", type=int, default=5, help="Number of server starts")
+    parser.add_argument("--max-ms", type=float, help="Fail if the median time to first response exceeds this")
+    args = parser.parse_args()
+
+    report = main(args.runs)
+    print(json.dumps(report, indent=2))
+    if args.max_ms is not None and report["median_ms"] > args.max_ms:
+        print(f"REGRESSION median {report['median_ms']} ms > {args.max_ms} ms", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,204 @@
+"""
+Load benchmark: drive each API endpoint through httpx.AsyncClient with
+ASGITransport (in process, as the tests do) at a given concurrency, and
+report p50/p95/p99 latency and throughput per endpoint as JSON.
+
+Seed a database first, then run from the backend directory:
+    DATABASE_URL=sqlite:///./bench.db python3 -m app.init_db --seed-sessions 1000000
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.load --concurrency 16
+
+Save a baseline, and later fail (exit status 1) if an endpoint regressed:
+    python -m benchmarks.load --save-baseline benchmarks/baselines/local.json
+    python -m benchmarks.load --baseline benchmarks/baselines/local.json --threshold 0.25
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+from httpx import ASGITransport, AsyncClient
+
+from app.database import database, init_db, read_database
+from app.main import app
+from app.pagination import encode_cursor
+
+# Request builders take a random generator and return (method, url, json body)
+Request = tuple[str, str, Optional[dict]]
+
+
+async def build_scenarios(cursor_count: int = 200) -> dict[str, Callable[[random.Random], Request]]:
+    """Endpoint scenarios with request parameters drawn from the seeded data"""
+    bounds = await database.fetch_one("SELECT MIN(id) AS min_id, MAX(id) AS max_id FROM sessions")
+    if bounds["max_id"] is None:
+        raise SystemExit("The database has no sessions; seed it with python3 -m app.init_db --seed-sessions N")
+    min_id, max_id = bounds["min_id"], bounds["max_id"]
+    project_ids = [row["id"] for row in await database.fetch_all("SELECT id FROM projects")]
+    total = (await database.fetch_one("SELECT COUNT(*) FROM sessions"))[0]
+    page_size = 20
+    last_page = max(1, min(total // page_size, 5000))
+
+    # Cursors pointing at random positions in the history
+    rng = random.Random(0)
+    sample_ids = ",".join(str(rng.randint(min_id, max_id)) for _ in range(cursor_count))
+    cursor_rows = await database.fetch_all(f"SELECT created_at, id FROM sessions WHERE id IN ({sample_ids})")
+    cursors = [encode_cursor(row["created_at"], row["id"]) for row in cursor_rows]
+
+    latest = await database.fetch_one("SELECT MAX(start_time) AS latest FROM sessions")
+    last_day = date(1970, 1, 1) + timedelta(microseconds=latest["latest"])
+
+    def report(days: int, granularity: str) -> str:
+        start = last_day - timedelta(days=days - 1)
+        return f"/api/reports/summary?from={start}&to={last_day}&granularity={granularity}"
+
+    return {
+        "projects": lambda r: ("GET", "/api/projects", None),
+        "sessions_first_page": lambda r: ("GET", f"/api/sessions?page_size={page_size}", None),
+        "sessions_offset_page": lambda r: ("GET", f"/api/sessions?page_size={page_size}&page={r.randint(1, last_page)}", None),
+        "sessions_cursor_page": lambda r: ("GET", f"/api/sessions?page_size={page_size}&cursor={r.choice(cursors)}", None),
+        "session_by_id": lambda r: ("GET", f"/api/sessions/{r.randint(min_id, max_id)}", None),
+        "report_30_days": lambda r: ("GET", report(30, "day"), None),
+        "report_year_by_month": lambda r: ("GET", report(365, "month"), None),
+        "analytics_year": lambda r: (
+            "GET", f"/api/reports/analytics?from={last_day - timedelta(days=364)}&to={last_day}", None
+        ),
+        "create_session": lambda r: ("POST", "/api/sessions", {
+            "project_id": r.choice(project_ids),
+            "start_time": f"{last_day}T09:00:00",
+            "end_time": f"{last_day}T10:00:00",
+        }),
+    }
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def run_scenario(
+    client: AsyncClient,
+    build_request: Callable[[random.Random], Request],
+    requests: int,
+    concurrency: int,
+    seed: int = 0
+) -> dict:
+    """Send requests through concurrency workers and summarize latencies"""
+    rng = random.Random(seed)
+    planned = [build_request(rng) for _ in range(requests)]
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while planned:
+            method, url, body = planned.pop()
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+    }
+
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Describe every endpoint whose p95 latency rose, or whose throughput
+    fell, by more than threshold (a fraction) relative to baseline, and
+    every endpoint the baseline has no entry for (it needs re-recording)
+    """
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous is None:
+            regressions.append(f"{name}: not in the baseline")
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} ms -> {current['p95_ms']} ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s"
+            )
+    return regressions
+
+
+async def main(requests: int, concurrency: int, only: Optional[list[str]] = None) -> dict:
+    await database.connect()
+    await read_database.connect()
+    try:
+        await init_db()
+        scenarios = await build_scenarios()
+        unknown = set(only or []) - set(scenarios)
+        if unknown:
+            raise SystemExit(f"Unknown endpoints: {', '.join(sorted(unknown))} (choose from {', '.join(scenarios)})")
+        sessions = (await database.fetch_one("SELECT row_count FROM table_counts WHERE name = 'sessions'"))[0]
+        results = {
+            "config": {
+                "requests": requests,
+                "concurrency": concurrency,
+                "sessions": sessions,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+            },
+            "endpoints": {},
+        }
+        # ASGITransport does not run the lifespan; the databases are connected above
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            for name, build_request in scenarios.items():
+                if only and name not in only:
+                    continue
+                # Warm up connections and caches before measuring
+                await run_scenario(client, build_request, min(requests, 20), concurrency, seed=1)
+                results["endpoints"][name] = await run_scenario(client, build_request, requests, concurrency)
+                print(f"{name}: {results['endpoints'][name]}", file=sys.stderr)
+        return results
+    finally:
+        await read_database.disconnect()
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load benchmark for the Measured API")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once")
+    parser.add_argument("--endpoints", help="Comma-separated subset of endpoints to run")
+    parser.add_argument("--output", help="Write results JSON to this file (default: stdout)")
+    parser.add_argument("--save-baseline", help="Also save the results as a baseline file")
+    parser.add_argument("--baseline", help="Compare against this baseline file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed regression as a fraction (default 0.25)")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args.requests, args.concurrency, args.endpoints.split(",") if args.endpoints else None))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as output:
+            output.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_to_baseline(results, json.load(baseline_file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -1,14 +1,20 @@
 """
 Pytest configuration and fixtures for integration tests.
 """
+import glob
+import logging
 import pytest
 import databases
 import os
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Generator
 from httpx import AsyncClient, ASGITransport
 
 from app.main import app
-from app.database import database, init_db, get_db
+from app.analytics import session_columns
+from app.archive import archive_catalog
+from app.cache import session_cache
+from app.database import create_database, init_db, get_db, get_read_db
+from app.metrics import instrument
 
 
 # Use in-memory SQLite database for testing
@@ -18,8 +24,9 @@ TEST_DATABASE_URL = "sqlite:///./test_measured.db"
 @pytest.fixture(scope="function")
 async def test_db() -> AsyncGenerator[databases.Database, None]:
     """Create a test database and initialize it for each test."""
-    # Create a new database instance for testing
-    test_database = databases.Database(TEST_DATABASE_URL)
+    # Create a new database instance for testing, using the production
+    # connection profile (pooled connection, WAL and tuned pragmas)
+    test_database = create_database(TEST_DATABASE_URL)
     
     # Connect and initialize using production schema
     await test_database.connect()
@@ -35,9 +42,9 @@ async def test_db() -> AsyncGenerator[databases.Database, None]:
     await test_database.execute("DROP TABLE IF EXISTS projects")
     await test_database.disconnect()
     
-    # Clean up test database file
-    if os.path.exists("./test_measured.db"):
-        os.remove("./test_measured.db")
+    # Clean up test database files (including WAL side files and archives)
+    for path in glob.glob("./test_measured.db*") + glob.glob("./test_measured-archive-*.db*"):
+        os.remove(path)
 
 
 async def seed_test_projects(db: databases.Database):
@@ -52,13 +59,31 @@ async def seed_test_projects(db: databases.Database):
 
 @pytest.fixture(scope="function")
 async def client(test_db: databases.Database) -> AsyncGenerator[AsyncClient, None]:
-    """Create a test client with overridden database dependency."""
+    """Create a test client with overridden database dependencies."""
+    
+    # Override the get_db dependency to use test database, wrapped for
+    # query metrics like the production dependency
+    instrumented_test_db = instrument(test_db)
+    # Reads go through a query_only pool on the same file, as in production,
+    # so a read route that writes fails here too
+    read_db = create_database(TEST_DATABASE_URL, read_only=True)
+    await read_db.connect()
+    instrumented_read_db = instrument(read_db)
     
-    # Override the get_db dependency to use test database
     async def override_get_db() -> AsyncGenerator[databases.Database, None]:
-        yield test_db
+        yield instrumented_test_db
+    
+    async def override_get_read_db() -> AsyncGenerator[databases.Database, None]:
+        yield instrumented_read_db
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    
+    # Start every test with an empty response cache (and archive catalog and
+    # analytics snapshot)
+    session_cache.clear()
+    archive_catalog.clear()
+    session_columns.clear()
     
     # Create async client
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
@@ -66,4 +91,40 @@ async def client(test_db: databases.Database) -> AsyncGenerator[AsyncClient, Non
     
     # Clean up dependency override
     app.dependency_overrides.clear()
+    await read_db.disconnect()
+
+
+
+class QueryCounter(logging.Handler):
+    """Records the statements sent through the `databases` query API."""
+    
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.statements: list[str] = []
+    
+    def emit(self, record: logging.LogRecord):
+        # databases logs every compiled query as "Query: %s Args: %s"
+        if record.msg.startswith("Query:"):
+            self.statements.append(" ".join(str(record.args[0]).split()))
+    
+    def reset(self):
+        self.statements.clear()
+    
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
 
+@pytest.fixture(scope="function")
+def query_counter() -> Generator[QueryCounter, None, None]:
+    """Count database round trips made while handling requests."""
+    counter = QueryCounter()
+    logger = logging.getLogger("databases")
+    previous_level = logger.level
+    logger.addHandler(counter)
+    logger.setLevel(logging.DEBUG)
+    
+    yield counter
+    
+    logger.removeHandler(counter)
+    logger.setLevel(previous_level)
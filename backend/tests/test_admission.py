@@ -0,0 +1,100 @@
+"""
+Tests for admission control of database-bound requests.
+"""
+import asyncio
+import pytest
+from httpx import AsyncClient
+
+from app import admission
+from app.admission import AdmissionLimiter, request_class
+
+
+def test_request_class():
+    """Test which requests are limited as reads or writes, and which bypass."""
+    assert request_class("GET", "/api/sessions") == "read"
+    assert request_class("POST", "/api/sessions/batch-get") == "read"
+    assert request_class("POST", "/api/sessions") == "write"
+    assert request_class("PUT", "/api/sessions/1") == "write"
+    for method, path in [
+        ("GET", "/api/health"), ("GET", "/api/health/admission"), ("GET", "/api/metrics"),
+        ("GET", "/api/sessions/stream"), ("OPTIONS", "/api/sessions"), ("GET", "/docs"),
+    ]:
+        assert request_class(method, path) is None
+
+
+@pytest.mark.asyncio
+async def test_limiter_queues_in_order_and_rejects():
+    """Test that waiters get released slots first come first served, and
+    that a full queue or an expired wait is rejected."""
+    limiter = AdmissionLimiter(concurrency=1, queue_size=2, timeout_seconds=1)
+    assert await limiter.acquire()
+    admitted = []
+
+    async def wait(name):
+        if await limiter.acquire():
+            admitted.append(name)
+
+    waiters = [asyncio.create_task(wait(name)) for name in ("first", "second")]
+    await asyncio.sleep(0)
+    assert limiter.waiting == 2
+    # Queue full: rejected without waiting
+    assert not await limiter.acquire()
+
+    limiter.release()
+    await asyncio.sleep(0.01)
+    assert admitted == ["first"]
+    limiter.release()
+    await asyncio.gather(*waiters)
+    assert admitted == ["first", "second"]
+    assert (limiter.active, limiter.waiting) == (1, 0)
+
+    limiter.timeout_seconds = 0.01
+    assert not await limiter.acquire()
+    assert limiter.waiting == 0
+    limiter.release()
+    assert limiter.active == 0
+    assert (limiter.rejected_queue_full, limiter.rejected_timeout, limiter.admitted) == (1, 1, 3)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    """Test that a waiter whose client went away gives up its place."""
+    limiter = AdmissionLimiter(concurrency=1, queue_size=4, timeout_seconds=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limiter.waiting == 0
+    limiter.release()
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_overloaded_writes_get_503(client: AsyncClient, monkeypatch):
+    """Test that writes beyond the limit are turned away with Retry-After
+    while reads, health checks and metrics are still served."""
+    writes = AdmissionLimiter(concurrency=1, queue_size=0, timeout_seconds=1)
+    monkeypatch.setitem(admission.limiters, "write", writes)
+    # A write in progress holds the only slot
+    await writes.acquire()
+
+    session = {"project_id": 1, "start_time": "2025-01-01T09:00:00", "end_time": "2025-01-01T10:00:00"}
+    response = await client.post("/api/sessions", json=session)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json() == {"detail": "Server is busy, retry later"}
+
+    assert (await client.get("/api/sessions")).status_code == 200
+    assert (await client.get("/api/health")).status_code == 200
+    stats = (await client.get("/api/health/admission")).json()
+    assert stats["write"]["active"] == 1
+    assert stats["write"]["rejected_queue_full"] == 1
+    metrics_text = (await client.get("/api/metrics")).text
+    assert 'measured_admission_rejected_queue_full_total{kind="write"} 1' in metrics_text
+
+    writes.release()
+    assert (await client.post("/api/sessions", json=session)).status_code == 201
+    assert writes.active == 0
@@ -0,0 +1,130 @@
+"""
+Tests for the analytics snapshot and GET /api/reports/analytics.
+"""
+import subprocess
+import sys
+import pytest
+import databases
+from httpx import AsyncClient
+
+from app import analytics
+from app.analytics import ColumnSnapshot, analyze, session_columns
+from app.archive import archive_sessions
+from tests.test_archive import CUTOFF, insert_history
+
+np = pytest.importorskip("numpy")
+
+SESSIONS = [
+    (1, "2025-03-03T09:00:00", "2025-03-03T10:00:00"),
+    (1, "2025-03-04T09:00:00", "2025-03-04T09:30:00"),
+    (1, "2025-03-05T22:00:00", "2025-03-05T23:30:00"),
+    (1, "2025-03-07T10:00:00", "2025-03-07T10:00:30"),
+    (2, "2025-03-03T12:00:00", "2025-03-03T12:10:00"),
+    # Open sessions are left out
+    (2, "2025-03-08T12:00:00", None),
+]
+
+
+async def create_sessions(client: AsyncClient) -> None:
+    for project_id, start, end in SESSIONS:
+        response = await client.post(
+            "/api/sessions", json={"project_id": project_id, "start_time": start, "end_time": end}
+        )
+        assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_analytics_per_project(client: AsyncClient):
+    """Test durations, percentiles, histogram, streaks and heatmap."""
+    await create_sessions(client)
+
+    response = await client.get("/api/reports/analytics")
+    assert response.status_code == 200
+    first, second = response.json()["projects"]
+
+    assert first["project_id"] == 1
+    assert first["sessions"] == 4
+    assert first["total_seconds"] == 10830.0
+    assert first["mean_seconds"] == 2707.5
+    assert first["percentiles"] == {"p50": 2700.0, "p90": 4860.0, "p99": 5346.0}
+    counts = {item["min_seconds"]: item["count"] for item in first["histogram"] if item["count"]}
+    assert counts == {0: 1, 1800: 1, 3600: 2}
+    assert first["histogram"][-1] == {"min_seconds": 28800, "max_seconds": None, "count": 0}
+    # March 3-5 and 7
+    assert (first["active_days"], first["longest_streak_days"]) == (4, 3)
+    heatmap = first["heatmap"]
+    assert (heatmap[0][9], heatmap[1][9], heatmap[2][22], heatmap[4][10]) == (1, 1, 1, 1)
+    assert sum(map(sum, heatmap)) == 4
+
+    assert (second["project_id"], second["sessions"], second["total_seconds"]) == (2, 1, 600.0)
+
+    # Inclusive date range, and one project
+    response = await client.get("/api/reports/analytics?from=2025-03-04&to=2025-03-05")
+    assert [(item["project_id"], item["sessions"]) for item in response.json()["projects"]] == [(1, 2)]
+    response = await client.get("/api/reports/analytics?project_id=2")
+    assert [item["project_id"] for item in response.json()["projects"]] == [2]
+    response = await client.get("/api/reports/analytics?from=2025-03-05&to=2025-03-04")
+    assert response.status_code == 400
+
+
+def test_analyze_matches_reference():
+    """Test the vectorized statistics against numpy.percentile and per-project loops."""
+    rng = np.random.default_rng(7)
+    rows = 2000
+    day = 86_400_000_000
+    projects = np.sort(rng.integers(1, 6, rows))
+    starts = rng.integers(0, 60, rows) * day + rng.integers(0, day, rows)
+    ends = starts + rng.integers(0, 36_000_000_000, rows)
+    order = np.lexsort((starts, projects))
+    snapshot = ColumnSnapshot(1, projects[order], starts[order], ends[order], 0.0)
+
+    for item in analyze(snapshot):
+        selected = projects[order] == item["project_id"]
+        durations = (ends[order][selected] - starts[order][selected]) / 1_000_000
+        for percentile in (50, 90, 99):
+            expected = np.percentile(durations, percentile)
+            assert item["percentiles"][f"p{percentile}"] == pytest.approx(expected, abs=1e-3)
+        days = sorted(set((starts[order][selected] // day).tolist()))
+        longest = run = 1
+        for previous, current in zip(days, days[1:]):
+            run = run + 1 if current == previous + 1 else 1
+            longest = max(longest, run)
+        assert (item["active_days"], item["longest_streak_days"]) == (len(days), longest)
+        assert sum(bin_["count"] for bin_ in item["histogram"]) == item["sessions"] == selected.sum()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reloaded_after_writes(client: AsyncClient, test_db: databases.Database):
+    """Test that the snapshot is reused until a write, revalidates with a
+    304, and includes archived sessions."""
+    await insert_history(test_db)
+    response = await client.get("/api/reports/analytics")
+    before = response.json()
+    loads = session_columns.loads
+    assert sum(item["sessions"] for item in before["projects"]) == 36
+
+    assert (await client.get("/api/reports/analytics")).json() == before
+    assert session_columns.loads == loads
+    response = await client.get("/api/reports/analytics", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+
+    await archive_sessions(test_db, CUTOFF)
+    assert (await client.get("/api/reports/analytics")).json() == before
+    assert session_columns.loads == loads + 1
+
+
+@pytest.mark.asyncio
+async def test_analytics_without_numpy(client: AsyncClient, monkeypatch):
+    """Test that the endpoint says so when numpy is not installed."""
+    monkeypatch.setattr(analytics, "_numpy", lambda: None)
+    response = await client.get("/api/reports/analytics")
+    assert response.status_code == 501
+
+
+def test_numpy_not_imported_at_startup():
+    """Test that importing the app leaves numpy for the first analytics request."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print('numpy' in sys.modules)"],
+        capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
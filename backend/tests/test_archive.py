@@ -0,0 +1,181 @@
+"""
+Tests for archiving old sessions and reading them back through the API.
+"""
+import asyncio
+import os
+import pytest
+import databases
+from datetime import datetime, timezone
+from httpx import AsyncClient
+
+from app import archive as archive_module
+from app.archive import archive_connection, archive_file_name, archive_sessions, load_catalog
+from app.models import to_epoch_us
+from app.routers import sessions as sessions_router
+
+CUTOFF = to_epoch_us(datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+
+def us(*args) -> int:
+    return to_epoch_us(datetime(*args, tzinfo=timezone.utc))
+
+
+async def insert_history(db: databases.Database) -> None:
+    """Sessions in 2023 and 2024 (archivable), one still open in 2024 and
+    some in 2025, created when they ended"""
+    rows = []
+    for year in (2023, 2024, 2025):
+        for month in range(1, 7):
+            for project_id in (1, 2):
+                start = us(year, month, 10, 9 + project_id)
+                rows.append((project_id, start, start + 3600_000_000, start + 3600_000_000))
+    rows.append((3, us(2024, 12, 31, 22), None, us(2024, 12, 31, 22)))
+    for row in rows:
+        await db.execute(
+            "INSERT INTO sessions (project_id, start_time, end_time, created_at) VALUES (:p, :s, :e, :c)",
+            {"p": row[0], "s": row[1], "e": row[2], "c": row[3]}
+        )
+
+
+async def snapshot(client: AsyncClient) -> dict:
+    """Everything the read endpoints return"""
+    pages = []
+    cursor = None
+    while True:
+        query = f"&cursor={cursor}" if cursor else ""
+        page = (await client.get(f"/api/sessions?page_size=7{query}")).json()
+        pages.append(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    return {
+        "cursor_pages": pages,
+        "offset_pages": [(await client.get(f"/api/sessions?page_size=7&page={page}")).json() for page in range(1, 7)],
+        "project": (await client.get("/api/sessions?project_id=2&page_size=5&page=3")).json(),
+        "range": (await client.get(
+            "/api/sessions?start_after=2024-03-01T00:00:00&start_before=2025-03-01T00:00:00&page_size=9&page=2"
+        )).json(),
+        "open": (await client.get("/api/sessions?open_only=true")).json(),
+        "export": (await client.get("/api/sessions/export?format=ndjson")).text,
+        "report": (await client.get("/api/reports/summary?from=2023-01-01&to=2025-12-31&granularity=month")).json(),
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_attached", [8, 1])
+async def test_archive_moves_old_closed_sessions(
+    client: AsyncClient, test_db: databases.Database, monkeypatch, max_attached: int
+):
+    """Test that old closed sessions move to per-year files while every
+    read endpoint returns what it did before, however many archives a
+    connection may attach at once."""
+    monkeypatch.setattr(archive_module, "ARCHIVE_MAX_ATTACHED", max_attached)
+    monkeypatch.setattr(sessions_router, "ARCHIVE_MAX_ATTACHED", max_attached)
+    await insert_history(test_db)
+    before = await snapshot(client)
+
+    moved = await archive_sessions(test_db, CUTOFF, batch_size=5)
+
+    assert moved == {2023: 12, 2024: 12}
+    # Recent sessions and the open one stay hot
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM sessions") == 13
+    assert [archive.year for archive in await load_catalog(test_db)] == [2023, 2024]
+    assert os.path.exists(archive_file_name(test_db, 2023))
+    # Counters still include archived sessions
+    assert await test_db.fetch_val("SELECT row_count FROM table_counts WHERE name = 'sessions'") == 37
+    assert await archive_sessions(test_db, CUTOFF) == {}
+
+    after = await snapshot(client)
+    assert after == before
+    assert len(before["export"].splitlines()) == 37
+
+
+@pytest.mark.asyncio
+async def test_archived_sessions_by_id(client: AsyncClient, test_db: databases.Database):
+    """Test single and batch reads, updates and stops of archived sessions."""
+    await insert_history(test_db)
+    old_id = await test_db.fetch_val("SELECT MIN(id) FROM sessions")
+    old = (await client.get(f"/api/sessions/{old_id}")).json()
+    await archive_sessions(test_db, CUTOFF)
+
+    assert (await client.get(f"/api/sessions/{old_id}")).json() == old
+    response = await client.post("/api/sessions/batch-get", json={"ids": [old_id, 99999]})
+    assert response.json() == {"items": [old, None], "not_found": [99999]}
+    assert (await client.post(f"/api/sessions/{old_id}/stop")).status_code == 409
+
+    # Updating moves it back to the hot table, and the rollups follow
+    response = await client.put(
+        f"/api/sessions/{old_id}",
+        json={"start_time": "2023-01-10T10:00:00", "end_time": "2023-01-10T12:00:00"}
+    )
+    assert response.status_code == 200
+    assert response.json()["end_time"] == "2023-01-10T12:00:00Z"
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM sessions WHERE id = :id", {"id": old_id}) == 1
+    report = (await client.get("/api/reports/summary?from=2023-01-10&to=2023-01-10")).json()
+    assert [item["seconds"] for item in report["items"]] == [7200.0, 3600.0]
+    assert await test_db.fetch_val("SELECT row_count FROM table_counts WHERE name = 'sessions'") == 37
+
+
+@pytest.mark.asyncio
+async def test_interrupted_move_is_not_visible(client: AsyncClient, test_db: databases.Database):
+    """Test that a session left both hot and archived is read once, and
+    cleaned up by the next run."""
+    await insert_history(test_db)
+    await archive_sessions(test_db, CUTOFF)
+    total = (await client.get("/api/sessions")).json()["total"]
+
+    # A copy that was committed to the archive without the hot delete
+    archive_2024 = (await load_catalog(test_db))[1]
+    async with archive_connection(test_db, archive_2024) as connection:
+        await connection.execute("UPDATE archive_state SET moving = 1")
+        await connection.execute("INSERT INTO main.sessions SELECT * FROM archive_2024.sessions ORDER BY id LIMIT 1")
+        await connection.execute("UPDATE archive_state SET moving = 0")
+    duplicate_id = archive_2024.min_id
+
+    export = (await client.get("/api/sessions/export?format=ndjson")).text.splitlines()
+    assert len(export) == total
+    response = await client.get("/api/sessions?start_before=2025-01-01T00:00:00&page_size=100")
+    ids = [item["id"] for item in response.json()["items"]]
+    assert ids.count(duplicate_id) == 1
+
+    assert await archive_sessions(test_db, CUTOFF) == {2024: 1}
+    async with archive_connection(test_db, archive_2024) as connection:
+        copies = await connection.fetch_val(
+            "SELECT COUNT(*) FROM archive_2024.sessions WHERE id = :id", {"id": duplicate_id}
+        )
+    assert copies == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_proceed_between_archive_batches(test_db: databases.Database, monkeypatch):
+    """Test that a write made while a year is being archived runs between
+    batches instead of waiting for the whole move."""
+    await insert_history(test_db)
+    log = []
+    writes = []
+    move_batch = archive_module._move_batch
+
+    async def write():
+        await test_db.execute(
+            "INSERT INTO sessions (project_id, start_time, end_time, created_at) VALUES (1, :s, NULL, :s)",
+            {"s": us(2025, 7, 1, 9)}
+        )
+        log.append("write")
+
+    async def logged_move_batch(*args):
+        moved = await move_batch(*args)
+        if not log:
+            # Start a write while the archive holds the writer connection
+            writes.append(asyncio.create_task(write()))
+        log.append("batch")
+        return moved
+
+    monkeypatch.setattr(archive_module, "_move_batch", logged_move_batch)
+
+    moved = await archive_sessions(test_db, CUTOFF, batch_size=2)
+    await asyncio.gather(*writes)
+
+    assert moved == {2023: 12, 2024: 12}
+    # The write went in right after the first batch, not after the last
+    assert log[:3] == ["batch", "write", "batch"]
+    assert await test_db.fetch_val("SELECT COUNT(*) FROM sessions") == 14
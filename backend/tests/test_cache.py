@@ -0,0 +1,104 @@
+"""
+Tests for the response cache and its use by the sessions endpoints.
+"""
+import pytest
+from httpx import AsyncClient
+from datetime import datetime, timedelta
+
+from app.cache import ResponseCache, session_cache
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the cache keeps at most max_entries, dropping the LRU entry."""
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", b"1", cache.generation)
+    cache.set("b", b"2", cache.generation)
+    assert cache.get("a") == b"1"
+    
+    cache.set("c", b"3", cache.generation)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_cache_expires_entries():
+    """Test that entries older than the TTL are misses."""
+    cache = ResponseCache(max_entries=2, ttl_seconds=0)
+    cache.set("a", b"1", cache.generation)
+    
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_drops_bodies_from_older_generation():
+    """Test that a body computed before a write is never stored."""
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    generation = cache.generation
+    cache.invalidate()
+    
+    cache.set("a", b"stale", generation)
+    
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_session_reads_cached_until_write(client: AsyncClient):
+    """Test that session reads hit the cache and writes invalidate it."""
+    session_data = {
+        "project_id": 1,
+        "start_time": (datetime.now() - timedelta(hours=1)).isoformat(),
+        "end_time": datetime.now().isoformat()
+    }
+    created = (await client.post("/api/sessions", json=session_data)).json()
+    
+    first = await client.get("/api/sessions")
+    second = await client.get("/api/sessions")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert first.content == second.content
+    
+    response = await client.get(f"/api/sessions/{created['id']}")
+    assert response.headers["X-Cache"] == "MISS"
+    response = await client.get(f"/api/sessions/{created['id']}")
+    assert response.headers["X-Cache"] == "HIT"
+    assert response.json() == created
+    
+    # An update invalidates both list and single-session entries
+    update_data = {
+        "start_time": (datetime.now() - timedelta(hours=3)).isoformat(),
+        "end_time": (datetime.now() - timedelta(hours=2)).isoformat()
+    }
+    await client.put(f"/api/sessions/{created['id']}", json=update_data)
+    response = await client.get(f"/api/sessions/{created['id']}")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json()["start_time"] == update_data["start_time"] + "Z"
+    
+    # A create invalidates the list
+    await client.post("/api/sessions", json=session_data)
+    response = await client.get("/api/sessions")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json()["total"] == 2
+    
+    stats = (await client.get("/api/health/cache")).json()["sessions"]
+    assert stats["hits"] == 2
+    assert stats["misses"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_by_write_in_another_worker(client: AsyncClient, test_db, monkeypatch):
+    """Test that with version checks on, a write that bypasses this process
+    (as from another worker) still invalidates cached pages."""
+    monkeypatch.setattr(session_cache, "check_version", True)
+    
+    first = await client.get("/api/sessions")
+    second = await client.get("/api/sessions")
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    
+    # Written directly, so this process never calls invalidate()
+    await test_db.execute("INSERT INTO sessions (project_id, start_time) VALUES (1, 1735725600000000)")
+    
+    response = await client.get("/api/sessions")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json()["total"] == 1
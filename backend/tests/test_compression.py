@@ -0,0 +1,91 @@
+"""
+Tests for response compression.
+"""
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from httpx import AsyncClient, ASGITransport
+
+from app.compression import CompressionMiddleware, choose_encoding
+
+BODY = b'{"id": [' + b",".join(str(i).encode() for i in range(2000)) + b"]}"
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/large")
+    async def large():
+        return Response(BODY, media_type="application/json")
+
+    @app.get("/small")
+    async def small():
+        return Response(b'{"id": 1}', media_type="application/json")
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse("x" * 5000)
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield BODY
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return app
+
+
+def test_choose_encoding():
+    """Test Accept-Encoding parsing, including q=0 refusals."""
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+
+
+@pytest.mark.asyncio
+async def test_gzip_above_threshold_only():
+    """Test that large compressible bodies are gzipped and others are not."""
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url="http://test") as client:
+        headers = {"Accept-Encoding": "gzip"}
+        response = await client.get("/large", headers=headers)
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(BODY)
+        assert response.content == BODY
+        assert response.headers["vary"] == "Accept-Encoding"
+
+        response = await client.get("/small", headers=headers)
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+
+        response = await client.get("/text", headers=headers)
+        assert "content-encoding" not in response.headers
+
+        response = await client.get("/large", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.content == BODY
+
+
+@pytest.mark.asyncio
+async def test_streamed_body_compressed_incrementally():
+    """Test that streamed bodies are compressed as one gzip stream."""
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url="http://test") as client:
+        async with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(raw) == BODY * 3
+
+
+@pytest.mark.asyncio
+async def test_brotli_preferred_when_available():
+    """Test that brotli is used when accepted and installed."""
+    brotli = pytest.importorskip("brotli")
+    async with AsyncClient(transport=ASGITransport(app=make_app()), base_url="http://test") as client:
+        async with client.stream("GET", "/large", headers={"Accept-Encoding": "gzip, br"}) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        assert response.headers["content-encoding"] == "br"
+        assert brotli.decompress(raw) == BODY
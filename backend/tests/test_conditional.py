@@ -0,0 +1,117 @@
+"""
+Tests for conditional requests (ETag / Last-Modified / 304).
+"""
+import pytest
+import databases
+from email.utils import formatdate, parsedate_to_datetime
+from httpx import AsyncClient
+
+SESSION = {"project_id": 1, "start_time": "2025-01-01T09:00:00", "end_time": "2025-01-01T10:00:00"}
+
+
+@pytest.mark.asyncio
+async def test_etag_revalidation(client: AsyncClient):
+    """Test that a matching If-None-Match gets an empty 304 until the next write."""
+    await client.post("/api/sessions", json=SESSION)
+    response = await client.get("/api/sessions")
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert etag.startswith('"sessions-')
+
+    not_modified = await client.get("/api/sessions", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+    # Weak comparison and lists of tags
+    assert (await client.get("/api/sessions", headers={"If-None-Match": f'"x", W/{etag}'})).status_code == 304
+
+    await client.post("/api/sessions", json=SESSION)
+    changed = await client.get("/api/sessions", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_etag_per_representation(client: AsyncClient):
+    """Test that the columnar format and exports do not share the JSON ETag."""
+    json_etag = (await client.get("/api/sessions")).headers["ETag"]
+    columnar_etag = (await client.get("/api/sessions?format=columnar")).headers["ETag"]
+    assert columnar_etag != json_etag
+
+    response = await client.get("/api/sessions?format=columnar", headers={"If-None-Match": json_etag})
+    assert response.status_code == 200
+    response = await client.get("/api/sessions/export?format=csv")
+    assert response.headers["ETag"] not in (json_etag, columnar_etag)
+
+
+@pytest.mark.asyncio
+async def test_if_modified_since(client: AsyncClient, test_db: databases.Database):
+    """Test Last-Modified revalidation, and that If-None-Match takes precedence."""
+    # Last changed half way through a second
+    await test_db.execute(
+        "UPDATE table_versions SET modified_at = 1735725600500000 WHERE name = 'sessions'"
+    )
+    response = await client.get("/api/sessions")
+    last_modified = response.headers["Last-Modified"]
+    next_second = formatdate(parsedate_to_datetime(last_modified).timestamp() + 1, usegmt=True)
+    
+    # Sending back the Last-Modified we returned, sub-second part and all
+    response = await client.get("/api/sessions", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+    response = await client.get("/api/sessions", headers={"If-Modified-Since": next_second})
+    assert response.status_code == 304
+    response = await client.get("/api/sessions", headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"})
+    assert response.status_code == 200
+    response = await client.get("/api/sessions", headers={"If-Modified-Since": "not a date"})
+    assert response.status_code == 200
+    response = await client.get(
+        "/api/sessions", headers={"If-Modified-Since": next_second, "If-None-Match": '"stale"'}
+    )
+    assert response.status_code == 200
+    
+    # A write in a later second
+    await test_db.execute(
+        "UPDATE table_versions SET modified_at = modified_at + 1500000 WHERE name = 'sessions'"
+    )
+    response = await client.get("/api/sessions", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 200
+    assert response.headers["Last-Modified"] != last_modified
+
+
+@pytest.mark.asyncio
+async def test_projects_and_reports_revalidated(client: AsyncClient):
+    """Test that projects are cacheable for a while and reports follow sessions."""
+    response = await client.get("/api/projects")
+    assert response.headers["Cache-Control"].startswith("max-age=")
+    response = await client.get("/api/projects", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+
+    url = "/api/reports/summary?from=2025-01-01&to=2025-01-07"
+    etag = (await client.get(url)).headers["ETag"]
+    assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+    await client.post("/api/sessions", json=SESSION)
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [item["seconds"] for item in response.json()["items"]] == [3600.0]
+
+
+@pytest.mark.asyncio
+async def test_compressed_body_gets_its_own_etag(client: AsyncClient):
+    """Test that a compressed response's ETag names the encoding and still
+    revalidates the uncompressed representation."""
+    # Enough sessions for the page to pass the compression threshold
+    for _ in range(20):
+        await client.post("/api/sessions", json=SESSION)
+    response = await client.get("/api/sessions", headers={"Accept-Encoding": "gzip"})
+    etag = response.headers["ETag"]
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert etag.endswith('-gzip"')
+
+    response = await client.get("/api/sessions", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    # The 304 carries the validator the client holds
+    assert response.headers["ETag"] == etag
+    assert response.headers["Vary"] == "Accept-Encoding, Accept"
+    response = await client.get("/api/sessions", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert response.status_code == 304
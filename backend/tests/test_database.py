@@ -0,0 +1,168 @@
+"""
+Integration tests for database initialization and derived tables.
+"""
+import asyncio
+import sqlite3
+import pytest
+import databases
+from fastapi import Depends
+from httpx import AsyncClient
+from typing import Annotated
+
+from app.database import create_database, get_read_db, init_db
+from app.main import app
+from app.sqlite_pool import SQLiteProfile
+from tests.conftest import TEST_DATABASE_URL
+
+
+async def get_counts(db: databases.Database) -> tuple[int, dict]:
+    total_row = await db.fetch_one(
+        "SELECT row_count FROM table_counts WHERE name = 'sessions'"
+    )
+    rows = await db.fetch_all(
+        "SELECT project_id, session_count FROM project_session_counts"
+    )
+    return total_row["row_count"], {row["project_id"]: row["session_count"] for row in rows}
+
+
+@pytest.mark.asyncio
+async def test_session_counters_track_writes(test_db: databases.Database):
+    """Test that counters follow inserts, project moves and deletes."""
+    for project_id in (1, 1, 2):
+        await test_db.execute(
+            "INSERT INTO sessions (project_id, start_time) VALUES (:project_id, 1735725600000000)",
+            {"project_id": project_id}
+        )
+    assert await get_counts(test_db) == (3, {1: 2, 2: 1})
+    
+    await test_db.execute("UPDATE sessions SET project_id = 3 WHERE project_id = 2")
+    assert await get_counts(test_db) == (3, {1: 2, 2: 0, 3: 1})
+    
+    await test_db.execute("DELETE FROM sessions WHERE project_id = 1")
+    assert await get_counts(test_db) == (1, {1: 0, 2: 0, 3: 1})
+
+
+@pytest.mark.asyncio
+async def test_connection_profile_applied(test_db: databases.Database):
+    """Test that pooled connections are opened with the performance profile."""
+    assert (await test_db.fetch_one("PRAGMA journal_mode"))[0] == "wal"
+    # synchronous NORMAL is reported as 1
+    assert (await test_db.fetch_one("PRAGMA synchronous"))[0] == 1
+    assert (await test_db.fetch_one("PRAGMA busy_timeout"))[0] == 5000
+    assert (await test_db.fetch_one("PRAGMA cache_size"))[0] == -16000
+
+
+@pytest.mark.asyncio
+async def test_writer_connection_reused(test_db: databases.Database):
+    """Test that the writer keeps a single connection open between queries."""
+    async with test_db.connection() as connection:
+        first = connection.raw_connection
+    async with test_db.connection() as connection:
+        second = connection.raw_connection
+    
+    assert first is second
+
+
+@pytest.mark.asyncio
+async def test_in_memory_database_enforces_foreign_keys():
+    """Test that unpooled in-memory databases reject unknown projects too."""
+    memory_db = create_database("sqlite:///:memory:")
+    await memory_db.connect()
+    try:
+        # Each connection is its own in-memory database, so hold one
+        async with memory_db.connection() as connection:
+            await init_db(memory_db)
+            assert (await connection.fetch_one("PRAGMA foreign_keys"))[0] == 1
+            with pytest.raises(sqlite3.IntegrityError, match="FOREIGN KEY"):
+                await connection.execute(
+                    "INSERT INTO sessions (project_id, start_time, created_at) VALUES (99, 0, 0)"
+                )
+    finally:
+        await memory_db.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_read_pool_is_query_only_and_concurrent(test_db: databases.Database):
+    """Test that readers are query-only and do not wait for each other."""
+    reader = create_database(TEST_DATABASE_URL, read_only=True, profile=SQLiteProfile(read_pool_size=2))
+    await reader.connect()
+    try:
+        assert (await reader.fetch_one("PRAGMA query_only"))[0] == 1
+        with pytest.raises(sqlite3.OperationalError):
+            await reader.execute("INSERT INTO projects (name) VALUES ('Nope')")
+        
+        # Two tasks hold reader connections at the same time
+        both_acquired = asyncio.Event()
+        holders = 0
+        
+        async def hold_connection():
+            nonlocal holders
+            async with reader.connection() as connection:
+                await connection.fetch_one("SELECT COUNT(*) FROM projects")
+                holders += 1
+                if holders == 2:
+                    both_acquired.set()
+                await asyncio.wait_for(both_acquired.wait(), timeout=1)
+        
+        await asyncio.gather(hold_connection(), hold_connection())
+        
+        # A write committed through the writer is visible to readers
+        await test_db.execute("INSERT INTO projects (name) VALUES ('Reading')")
+        row = await reader.fetch_one("SELECT COUNT(*) FROM projects")
+        assert row[0] == 6
+    finally:
+        await reader.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_read_routes_served_from_read_pool(client: AsyncClient):
+    """Test that routes depending on get_read_db cannot write in tests,
+    as in production."""
+    routes = list(app.router.routes)
+    
+    @app.get("/api/test-read-write")
+    async def read_route_that_writes(db: Annotated[databases.Database, Depends(get_read_db)]):
+        await db.execute("INSERT INTO projects (name) VALUES ('Nope')")
+    
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            await client.get("/api/test-read-write")
+    finally:
+        app.router.routes[:] = routes
+    assert len((await client.get("/api/projects")).json()) == 5
+
+
+@pytest.mark.asyncio
+async def test_table_versions_bumped_by_writes(test_db: databases.Database):
+    """Test that every row change bumps its table's data version."""
+    async def version(table: str) -> int:
+        return await test_db.fetch_val("SELECT version FROM table_versions WHERE name = :name", {"name": table})
+    
+    sessions_before, projects_before = await version("sessions"), await version("projects")
+    await test_db.execute("INSERT INTO sessions (project_id, start_time) VALUES (1, 1735725600000000)")
+    await test_db.execute("UPDATE sessions SET end_time = start_time + 1")
+    await test_db.execute("DELETE FROM sessions")
+    
+    assert await version("sessions") == sessions_before + 3
+    assert await version("projects") == projects_before
+
+
+@pytest.mark.asyncio
+async def test_writers_sharing_a_file_queue_for_the_lock(test_db: databases.Database):
+    """Test that transactions from two writers (as in two worker processes)
+    that read before writing wait for each other instead of failing busy."""
+    other_writer = create_database(TEST_DATABASE_URL, profile=SQLiteProfile(busy_timeout_ms=1000))
+    await other_writer.connect()
+    try:
+        async def read_then_write(db: databases.Database):
+            for _ in range(10):
+                async with db.transaction():
+                    await db.fetch_one("SELECT row_count FROM table_counts WHERE name = 'sessions'")
+                    await asyncio.sleep(0)
+                    await db.execute("INSERT INTO sessions (project_id, start_time) VALUES (1, 1735725600000000)")
+        
+        await asyncio.gather(read_then_write(test_db), read_then_write(other_writer))
+        
+        assert (await test_db.fetch_one("SELECT COUNT(*) FROM sessions"))[0] == 20
+    finally:
+        await other_writer.disconnect()
@@ -0,0 +1,145 @@
+"""
+Tests for the session change feed (broadcaster and SSE stream).
+"""
+import asyncio
+import json
+import pytest
+import databases
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+
+from app import archive as archive_module
+from app.archive import archive_sessions, restore_session
+from app.events import Broadcaster, session_events
+from app.routers.sessions import stream_sessions
+from tests.test_archive import CUTOFF, insert_history
+
+
+def test_subscribers_receive_published_events():
+    """Test that every subscriber gets each event, in order."""
+    broadcaster = Broadcaster(queue_size=10, replay_size=10)
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+
+    broadcaster.publish("created", b'{"id": 1}')
+    broadcaster.publish("updated", b'{"id": 1}')
+
+    for subscription in (first, second):
+        events = [subscription.queue.get_nowait() for _ in range(2)]
+        assert [event.type for event in events] == ["created", "updated"]
+        assert events[0].encode() == b'id: %s\nevent: created\ndata: {"id": 1}\n\n' % events[0].id.encode()
+
+
+def test_slow_subscriber_dropped():
+    """Test that a subscriber whose queue is full is disconnected."""
+    broadcaster = Broadcaster(queue_size=2, replay_size=10)
+    slow = broadcaster.subscribe()
+
+    for _ in range(3):
+        broadcaster.publish("created", b"{}")
+
+    assert slow.dropped
+    assert broadcaster.subscribers == 0
+    # The stream is woken with the end-of-stream marker
+    assert slow.queue.get_nowait() is None
+    assert broadcaster.stats()["dropped"] == 1
+
+
+def test_resume_from_last_event_id():
+    """Test that a reconnecting client is replayed what it missed, and told
+    to resync when that is no longer buffered or the ID is unknown."""
+    broadcaster = Broadcaster(queue_size=10, replay_size=3)
+    seen = broadcaster.publish("created", b'{"id": 1}')
+    missed = [broadcaster.publish("created", b'{"id": %d}' % i) for i in (2, 3)]
+
+    assert broadcaster.subscribe(seen.id).backlog == missed
+    assert broadcaster.subscribe(missed[-1].id).backlog == []
+
+    # Two more events push the last seen one out of the replay buffer
+    broadcaster.publish("created", b"{}")
+    broadcaster.publish("created", b"{}")
+    assert [event.type for event in broadcaster.subscribe(seen.id).backlog] == ["resync"]
+    # From another worker or before a restart
+    assert [event.type for event in broadcaster.subscribe("0000-1").backlog] == ["resync"]
+
+
+@pytest.mark.asyncio
+async def test_watch_publishes_resync_for_other_writers(test_db: databases.Database):
+    """Test that a write not published by this process produces a resync."""
+    broadcaster = Broadcaster(queue_size=10, replay_size=10)
+    subscription = broadcaster.subscribe()
+    watcher = asyncio.create_task(broadcaster.watch(test_db, "sessions", interval=0.01))
+    try:
+        await asyncio.sleep(0.05)
+        # Published locally: no resync
+        await test_db.execute("INSERT INTO sessions (project_id, start_time) VALUES (1, 1735725600000000)")
+        broadcaster.publish("created", b"{}")
+        await asyncio.sleep(0.05)
+        # Written by "another worker"
+        await test_db.execute("INSERT INTO sessions (project_id, start_time) VALUES (1, 1735725600000000)")
+        event = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+        while event.type == "created":
+            event = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+    finally:
+        watcher.cancel()
+
+    assert event.type == "resync"
+    assert subscription.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_watch_ignores_late_publishes_and_archive_moves(test_db: databases.Database, monkeypatch):
+    """Test that a write published a poll after it committed, and sessions
+    moved to and from an archive here, do not produce a resync."""
+    broadcaster = Broadcaster(queue_size=10, replay_size=10)
+    monkeypatch.setattr(archive_module, "session_events", broadcaster)
+    await insert_history(test_db)
+    subscription = broadcaster.subscribe()
+    polled = asyncio.Event()
+
+    class WatchedDatabase:
+        async def fetch_val(self, *args, **kwargs):
+            version = await test_db.fetch_val(*args, **kwargs)
+            polled.set()
+            return version
+
+    watcher = asyncio.create_task(broadcaster.watch(WatchedDatabase(), "sessions", interval=0.01))
+    try:
+        await asyncio.sleep(0.05)
+        await test_db.execute("INSERT INTO sessions (project_id, start_time, created_at) VALUES (1, 0, 0)")
+        # Committed, but published only after the watcher has polled
+        polled.clear()
+        await polled.wait()
+        broadcaster.publish("created", b"{}")
+        await archive_sessions(test_db, CUTOFF, batch_size=5)
+        assert await restore_session(test_db, 1)
+        await asyncio.sleep(0.1)
+    finally:
+        watcher.cancel()
+
+    assert subscription.queue.get_nowait().type == "created"
+    assert subscription.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_session_changes(client: AsyncClient):
+    """Test that creates and updates made through the API reach the stream."""
+    response = await stream_sessions()
+    stream = response.body_iterator
+    assert response.media_type == "text/event-stream"
+    assert await anext(stream) == b"retry: 3000\n\n"
+
+    session_data = {
+        "project_id": 1,
+        "start_time": (datetime.now() - timedelta(hours=1)).isoformat(),
+        "end_time": datetime.now().isoformat()
+    }
+    created = (await client.post("/api/sessions", json=session_data)).json()
+    await client.put(f"/api/sessions/{created['id']}", json=session_data)
+
+    messages = [await asyncio.wait_for(anext(stream), timeout=1) for _ in range(2)]
+    await stream.aclose()
+
+    events = [dict(line.split(": ", 1) for line in message.decode().strip().split("\n")) for message in messages]
+    assert [event["event"] for event in events] == ["created", "updated"]
+    assert json.loads(events[0]["data"]) == created
+    assert session_events.subscribers == 0
@@ -13,3 +13,15 @@ async def test_health_check(client: AsyncClient):
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
+
+
+@pytest.mark.asyncio
+async def test_startup_report(client: AsyncClient):
+    """Test that the startup report lists timed phases and the first response."""
+    await client.get("/api/health")
+    response = await client.get("/api/health/startup")
+    
+    assert response.status_code == 200
+    report = response.json()
+    assert "imports" in report["phases_ms"]
+    assert report["time_to_first_response_ms"] > 0
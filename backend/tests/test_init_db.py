@@ -0,0 +1,35 @@
+"""
+Tests for the synthetic history seeder.
+"""
+import pytest
+import databases
+
+from app.init_db import US_PER_DAY, generate_history, seed_sessions
+from app.models import now_epoch_us
+
+
+def test_generate_history_is_deterministic():
+    """Test that a seed reproduces the same history, oldest first, within the window."""
+    end = now_epoch_us()
+    rows = list(generate_history(1000, [1, 2, 3], end, days=30, seed=7))
+    
+    assert rows == list(generate_history(1000, [1, 2, 3], end, days=30, seed=7))
+    starts = [row[1] for row in rows]
+    assert starts == sorted(starts)
+    assert starts[0] >= end - 31 * US_PER_DAY
+    assert {row[0] for row in rows} == {1, 2, 3}
+    assert all(row[2] is None or row[2] > row[1] for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_seed_sessions_keeps_aggregates_exact(test_db: databases.Database):
+    """Test that seeded sessions are counted and rolled up like API writes."""
+    assert await seed_sessions(test_db, 25_000, days=60) == 25_000
+    
+    counter = await test_db.fetch_one("SELECT row_count FROM table_counts WHERE name = 'sessions'")
+    assert counter["row_count"] == 25_000
+    rolled_up = await test_db.fetch_one("SELECT SUM(microseconds) / 1000000.0 AS seconds FROM session_rollups")
+    tracked = await test_db.fetch_one(
+        "SELECT SUM(end_time - start_time) / 1000000.0 AS seconds FROM sessions WHERE end_time IS NOT NULL"
+    )
+    assert rolled_up["seconds"] == pytest.approx(tracked["seconds"])
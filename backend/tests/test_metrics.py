@@ -0,0 +1,80 @@
+"""
+Tests for request and query instrumentation.
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.metrics import Histogram, MetricsRegistry, registry, statement_label
+
+
+@pytest.fixture
+def metrics_registry():
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+def metric_value(text: str, series: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{series} not found")
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that observations land in the first bucket whose bound they do not exceed."""
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+
+
+def test_statement_label():
+    """Test that statements are labelled by verb and first table."""
+    assert statement_label("SELECT * FROM sessions WHERE id = :id") == "SELECT sessions"
+    assert statement_label("\n  INSERT INTO sessions (project_id) VALUES (1)") == "INSERT sessions"
+    assert statement_label("update sessions SET end_time = 1") == "UPDATE sessions"
+    assert statement_label("PRAGMA query_only") == "PRAGMA"
+
+
+def test_render_escapes_labels():
+    """Test that label values are escaped in the text format."""
+    metrics = MetricsRegistry()
+    metrics.observe_query('SELECT "x"\\', 0.001, failed=True)
+    
+    text = metrics.render()
+    assert 'measured_db_query_errors_total{statement="SELECT \\"x\\"\\\\"} 1' in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient, metrics_registry: MetricsRegistry):
+    """Test that requests and queries show up in /api/metrics by route template."""
+    projects = (await client.get("/api/projects")).json()
+    created = (await client.post("/api/sessions", json={
+        "project_id": projects[0]["id"],
+        "start_time": "2025-01-01T09:00:00"
+    })).json()
+    await client.get(f"/api/sessions/{created['id']}")
+    await client.get("/api/sessions/99999")
+    await client.get("/api/nowhere")
+    
+    response = await client.get("/api/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    route = 'method="GET",route="/api/sessions/{session_id}"'
+    assert metric_value(text, "measured_http_request_duration_seconds_count{" + route + "}") == 2
+    assert metric_value(text, 'measured_http_request_duration_seconds_bucket{' + route + ',le="+Inf"}') == 2
+    assert metric_value(text, "measured_http_responses_total{" + route + ',status="200"}') == 1
+    assert metric_value(text, "measured_http_responses_total{" + route + ',status="404"}') == 1
+    assert metric_value(
+        text, 'measured_http_responses_total{method="GET",route="<unmatched>",status="404"}'
+    ) == 1
+    # The metrics request itself is in flight while rendering
+    assert metric_value(text, "measured_http_requests_in_flight") == 1
+    assert metric_value(text, 'measured_db_query_duration_seconds_count{statement="INSERT sessions"}') == 1
+    assert metric_value(text, 'measured_db_query_duration_seconds_count{statement="SELECT projects"}') == 1
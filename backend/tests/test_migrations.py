@@ -0,0 +1,126 @@
+"""
+Integration tests for versioned schema migrations.
+"""
+import os
+from datetime import datetime, timezone
+import pytest
+import databases
+
+from app.database import create_database, init_db
+from app.migrations import LATEST_VERSION, current_version, migrate
+from app.models import to_epoch_us
+
+LEGACY_DATABASE_URL = "sqlite:///./test_legacy.db"
+
+
+@pytest.fixture(scope="function")
+async def legacy_db():
+    """A database at schema version 1, with ISO text timestamps."""
+    legacy_database = create_database(LEGACY_DATABASE_URL)
+    await legacy_database.connect()
+    await migrate(legacy_database, target=1)
+    await legacy_database.execute("INSERT INTO projects (name) VALUES ('Work'), ('Personal')")
+
+    yield legacy_database
+
+    await legacy_database.disconnect()
+    for path in ("./test_legacy.db", "./test_legacy.db-wal", "./test_legacy.db-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@pytest.mark.asyncio
+async def test_fresh_database_is_at_latest_version(test_db: databases.Database):
+    """Test that init_db records every migration and is idempotent."""
+    assert await current_version(test_db) == LATEST_VERSION
+    assert await migrate(test_db) == []
+
+    await init_db(test_db)
+    rows = await test_db.fetch_all("SELECT version FROM schema_version ORDER BY version")
+    assert [row["version"] for row in rows] == list(range(1, LATEST_VERSION + 1))
+
+
+@pytest.mark.asyncio
+async def test_legacy_timestamps_converted(legacy_db: databases.Database):
+    """Test that ISO text timestamps become UTC epoch microseconds."""
+    await legacy_db.execute("""
+        INSERT INTO sessions (project_id, start_time, end_time, created_at) VALUES
+        (1, '2025-01-01T09:00:00', '2025-01-01T10:30:00.250000', '2025-01-01 10:31:00'),
+        (2, '2025-01-01T09:00:00+02:00', NULL, '2025-01-01 10:32:00')
+    """)
+
+    await init_db(legacy_db)
+    assert await current_version(legacy_db) == LATEST_VERSION
+
+    rows = await legacy_db.fetch_all("SELECT * FROM sessions ORDER BY id")
+    assert [tuple(row.values()) for row in rows] == [
+        (
+            1, 1,
+            to_epoch_us(datetime(2025, 1, 1, 9)),
+            to_epoch_us(datetime(2025, 1, 1, 10, 30, 0, 250000)),
+            to_epoch_us(datetime(2025, 1, 1, 10, 31))
+        ),
+        (2, 2, to_epoch_us(datetime(2025, 1, 1, 7)), None, to_epoch_us(datetime(2025, 1, 1, 10, 32))),
+    ]
+
+    # Defaults and ids keep working on the rebuilt table
+    await legacy_db.execute("DELETE FROM sessions WHERE id = 2")
+    await legacy_db.execute("INSERT INTO sessions (project_id, start_time) VALUES (1, 0)")
+    row = await legacy_db.fetch_one("SELECT id, created_at FROM sessions WHERE start_time = 0")
+    assert row["id"] == 3
+    now = to_epoch_us(datetime.now(timezone.utc))
+    assert abs(row["created_at"] - now) < 5_000_000
+
+
+@pytest.mark.asyncio
+async def test_legacy_counters_and_rollups_carried_over(legacy_db: databases.Database):
+    """Test that counters survive the rebuild and rollups are recomputed exactly."""
+    await legacy_db.execute("""
+        INSERT INTO sessions (project_id, start_time, end_time) VALUES
+        (1, '2025-01-01T23:00:00', '2025-01-02T01:00:00'),
+        (1, '2025-01-02T08:00:00', '2025-01-02T08:30:00'),
+        (2, '2025-01-02T08:00:00', NULL)
+    """)
+
+    await init_db(legacy_db)
+
+    total = await legacy_db.fetch_one("SELECT row_count FROM table_counts WHERE name = 'sessions'")
+    assert total["row_count"] == 3
+    rows = await legacy_db.fetch_all("SELECT day, project_id, microseconds FROM session_rollups ORDER BY day")
+    assert [tuple(row.values()) for row in rows] == [
+        ("2025-01-01", 1, 3_600_000_000),
+        ("2025-01-02", 1, 5_400_000_000),
+    ]
+
+    # Triggers on the rebuilt table maintain both
+    await legacy_db.execute(
+        "UPDATE sessions SET end_time = :end_time WHERE project_id = 2",
+        {"end_time": to_epoch_us(datetime(2025, 1, 2, 8, 0, 1))}
+    )
+    await legacy_db.execute("DELETE FROM sessions WHERE id = 1")
+    total = await legacy_db.fetch_one("SELECT row_count FROM table_counts WHERE name = 'sessions'")
+    assert total["row_count"] == 2
+    rows = await legacy_db.fetch_all(
+        "SELECT day, project_id, microseconds FROM session_rollups ORDER BY day, project_id"
+    )
+    assert [tuple(row.values()) for row in rows] == [
+        ("2025-01-01", 1, 0),
+        ("2025-01-02", 1, 1_800_000_000),
+        ("2025-01-02", 2, 1_000_000),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_float_rollups_converted_to_microseconds(legacy_db: databases.Database):
+    """Test that float rollups round to exact microseconds and residue rows go."""
+    await migrate(legacy_db, target=7)
+    await legacy_db.execute("""
+        INSERT INTO session_rollups (day, project_id, seconds) VALUES
+        ('2025-01-01', 1, 5400.000001000001),
+        ('2025-01-02', 1, 2.8e-17)
+    """)
+
+    await init_db(legacy_db)
+
+    rows = await legacy_db.fetch_all("SELECT day, project_id, microseconds FROM session_rollups")
+    assert [tuple(row.values()) for row in rows] == [("2025-01-01", 1, 5_400_000_001)]
@@ -0,0 +1,120 @@
+"""
+Integration tests for the reports endpoints.
+"""
+import pytest
+from httpx import AsyncClient
+
+
+async def create_session(client: AsyncClient, project_id: int, start: str, end: str | None) -> dict:
+    response = await client.post(
+        "/api/sessions",
+        json={"project_id": project_id, "start_time": start, "end_time": end}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def get_summary(client: AsyncClient, query: str) -> list[dict]:
+    response = await client.get(f"/api/reports/summary?{query}")
+    assert response.status_code == 200
+    return [
+        (item["project_id"], item["period"], item["seconds"])
+        for item in response.json()["items"]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_summary_by_day_splits_midnight(client: AsyncClient):
+    """Test that sessions crossing midnight are split across days."""
+    await create_session(client, 1, "2025-03-03T22:00:00", "2025-03-04T01:30:00")
+    await create_session(client, 1, "2025-03-04T09:00:00", "2025-03-04T10:00:00")
+    await create_session(client, 2, "2025-03-04T12:00:00+02:00", "2025-03-04T12:45:00+02:00")
+    # Open sessions count nothing
+    await create_session(client, 2, "2025-03-04T13:00:00", None)
+    
+    items = await get_summary(client, "from=2025-03-01&to=2025-03-31&granularity=day")
+    
+    assert items == [
+        (1, "2025-03-03", 7200.0),
+        (1, "2025-03-04", 5400.0 + 3600.0),
+        (2, "2025-03-04", 2700.0),
+    ]
+    
+    # Range bounds are inclusive days
+    items = await get_summary(client, "from=2025-03-04&to=2025-03-04")
+    assert items == [(1, "2025-03-04", 9000.0), (2, "2025-03-04", 2700.0)]
+
+
+@pytest.mark.asyncio
+async def test_summary_by_week_and_month(client: AsyncClient):
+    """Test week (Monday-based) and month buckets."""
+    # Sunday 2025-03-02 and Monday 2025-03-03 fall into different weeks
+    await create_session(client, 1, "2025-03-02T10:00:00", "2025-03-02T11:00:00")
+    await create_session(client, 1, "2025-03-03T10:00:00", "2025-03-03T12:00:00")
+    await create_session(client, 1, "2025-04-01T10:00:00", "2025-04-01T10:30:00")
+    
+    items = await get_summary(client, "from=2025-02-01&to=2025-04-30&granularity=week")
+    assert items == [
+        (1, "2025-02-24", 3600.0),
+        (1, "2025-03-03", 7200.0),
+        (1, "2025-03-31", 1800.0),
+    ]
+    
+    items = await get_summary(client, "from=2025-02-01&to=2025-04-30&granularity=month")
+    assert items == [
+        (1, "2025-03-01", 10800.0),
+        (1, "2025-04-01", 1800.0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_summary_follows_updates(client: AsyncClient):
+    """Test that updating a session moves its time between days."""
+    session = await create_session(client, 1, "2025-03-03T10:00:00", "2025-03-03T11:00:00")
+    open_session = await create_session(client, 1, "2025-03-05T10:00:00", None)
+    
+    await client.put(
+        f"/api/sessions/{session['id']}",
+        json={"start_time": "2025-03-04T23:00:00", "end_time": "2025-03-05T00:30:00"}
+    )
+    await client.put(
+        f"/api/sessions/{open_session['id']}",
+        json={"start_time": "2025-03-05T10:00:00", "end_time": "2025-03-05T10:15:00"}
+    )
+    
+    items = await get_summary(client, "from=2025-03-01&to=2025-03-31")
+    assert items == [
+        (1, "2025-03-04", 3600.0),
+        (1, "2025-03-05", 1800.0 + 900.0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_summary_validation(client: AsyncClient):
+    """Test summary query parameter validation."""
+    response = await client.get("/api/reports/summary?from=2025-03-02&to=2025-03-01")
+    assert response.status_code == 400
+    
+    response = await client.get("/api/reports/summary?from=2025-03-01&to=2025-03-02&granularity=year")
+    assert response.status_code == 422
+    
+    response = await client.get("/api/reports/summary?from=2025-03-01")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_summary_has_no_zero_rows_after_edits(client: AsyncClient):
+    """Test that moving sessions off a day leaves nothing behind for it."""
+    # Durations whose seconds, added and then subtracted as floats, leave a
+    # positive residue instead of zero
+    first = await create_session(client, 1, "2025-03-04T09:00:00", "2025-03-04T09:57:25.702193")
+    second = await create_session(client, 1, "2025-03-04T12:00:00", "2025-03-04T12:54:40.387013")
+    for session, start, end in [
+        (first, "2025-03-06T09:00:00", "2025-03-06T09:57:25.702193"),
+        (second, "2025-03-06T12:00:00", "2025-03-06T12:54:40.387013"),
+    ]:
+        response = await client.put(f"/api/sessions/{session['id']}", json={"start_time": start, "end_time": end})
+        assert response.status_code == 200
+    
+    items = await get_summary(client, "from=2025-03-01&to=2025-03-31")
+    assert items == [(1, "2025-03-06", 6726.089)]
@@ -0,0 +1,54 @@
+"""
+Tests that the fast serialization path matches the Pydantic schemas.
+"""
+import pytest
+
+from app import serialization
+from app.models import Session
+from app.schemas import PaginatedSessions, Session as SessionSchema
+from app.serialization import encode_session, encode_sessions_page, encode_sessions_ndjson
+
+# Timestamps are stored as epoch microseconds; include whole seconds, fractions and the epoch itself
+ROWS = [
+    {"id": 1, "project_id": 2, "start_time": 1735722000000000, "end_time": 1735727400250000, "created_at": 1735727460000000},
+    {"id": 2, "project_id": 1, "start_time": 1735722000000001, "end_time": None, "created_at": 1735727520000000},
+    {"id": 3, "project_id": 3, "start_time": 0, "end_time": 1735722001000000, "created_at": 1735727580000000},
+]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    """Run each test with orjson and with the stdlib fallback."""
+    if request.param == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+def test_encode_session_matches_schema(encoder):
+    """Test that single sessions encode exactly like schemas.Session."""
+    for row in ROWS:
+        expected = SessionSchema.model_validate(Session.from_row(row)).model_dump_json().encode()
+        assert encode_session(row) == expected
+
+
+def test_encode_sessions_page_matches_schema(encoder):
+    """Test that pages encode exactly like schemas.PaginatedSessions."""
+    expected = PaginatedSessions(
+        items=[Session.from_row(row) for row in ROWS],
+        total=10,
+        page=2,
+        page_size=3,
+        next_cursor="abc"
+    ).model_dump_json().encode()
+    
+    assert encode_sessions_page(ROWS, 10, 2, 3, "abc") == expected
+
+
+def test_encode_sessions_ndjson(encoder):
+    """Test that NDJSON output has one schema-identical object per line."""
+    lines = encode_sessions_ndjson(ROWS).split(b"\n")
+    
+    assert lines[-1] == b""
+    assert lines[:-1] == [encode_session(row) for row in ROWS]
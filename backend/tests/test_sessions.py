@@ -1,10 +1,22 @@
 """
 Integration tests for the sessions endpoints.
 """
+import asyncio
+import itertools
+import json
 import pytest
+import databases
 from httpx import AsyncClient
 from datetime import datetime, timedelta
 
+from app.database import get_db, get_read_db
+from app.main import app
+from app.models import to_epoch_us
+from app.pagination import encode_cursor
+from app.routers import sessions as sessions_router
+from app.routers.sessions import session_filters
+from app.schemas import SESSION_BATCH_GET_LIMIT
+
 
 @pytest.mark.asyncio
 async def test_create_session(client: AsyncClient):
@@ -234,8 +246,9 @@ async def test_update_session(client: AsyncClient):
     
     assert updated_session["id"] == session_id
     assert updated_session["project_id"] == project_id
-    assert updated_session["start_time"] == new_start_time.isoformat()
-    assert updated_session["end_time"] == new_end_time.isoformat()
+    # Naive input is taken as UTC and returned with a Z suffix
+    assert updated_session["start_time"] == new_start_time.isoformat() + "Z"
+    assert updated_session["end_time"] == new_end_time.isoformat() + "Z"
     # created_at should not change
     assert updated_session["created_at"] == create_response.json()["created_at"]
 
@@ -255,3 +268,590 @@ async def test_update_session_not_found(client: AsyncClient):
     assert response.status_code == 404
     assert "Session not found" in response.json()["detail"]
 
+
+
+@pytest.mark.asyncio
+async def test_get_sessions_cursor_pagination(client: AsyncClient):
+    """Test walking sessions with keyset cursors."""
+    projects_response = await client.get("/api/projects")
+    project_id = projects_response.json()[0]["id"]
+    
+    # Create 5 sessions (created_at ties are broken by id)
+    for i in range(5):
+        session_data = {
+            "project_id": project_id,
+            "start_time": (datetime.now() - timedelta(hours=i+1)).isoformat(),
+            "end_time": (datetime.now() - timedelta(hours=i)).isoformat()
+        }
+        await client.post("/api/sessions", json=session_data)
+    
+    # Walk all pages following next_cursor
+    seen_ids = []
+    response = await client.get("/api/sessions?page_size=2")
+    data = response.json()
+    seen_ids.extend(s["id"] for s in data["items"])
+    while data["next_cursor"]:
+        response = await client.get(
+            f"/api/sessions?page_size=2&cursor={data['next_cursor']}"
+        )
+        assert response.status_code == 200
+        data = response.json()
+        seen_ids.extend(s["id"] for s in data["items"])
+    
+    # Same order as page-number mode, no gaps or duplicates
+    all_sessions_response = await client.get("/api/sessions?page=1&page_size=100")
+    expected_ids = [s["id"] for s in all_sessions_response.json()["items"]]
+    assert seen_ids == expected_ids
+    assert len(seen_ids) == 5
+    assert data["total"] == 5
+
+
+@pytest.mark.asyncio
+async def test_get_sessions_invalid_cursor(client: AsyncClient):
+    """Test that a malformed cursor is rejected."""
+    response = await client.get("/api/sessions?cursor=not-a-cursor")
+    
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_get_sessions_deep_cursor_page_cost(client: AsyncClient, test_db):
+    """Test that a deep cursor page costs the same as the first page."""
+    # Steps are counted on the writer connection, so serve the reads from it
+    app.dependency_overrides[get_read_db] = app.dependency_overrides[get_db]
+    page_size = 2
+    deep_page = 5000
+    row_count = page_size * (deep_page + 1)
+    
+    # Seed a large history directly
+    created_at = to_epoch_us(datetime(2025, 1, 1))
+    minute = 60_000_000
+    rows = [
+        (1, created_at + i * minute, created_at + (i + 1) * minute, created_at + (i // 3) * 1_000_000)
+        for i in range(row_count)
+    ]
+    async with test_db.connection() as connection:
+        async with connection.transaction():
+            await connection.raw_connection.executemany(
+                "INSERT INTO sessions (project_id, start_time, end_time, created_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        
+        async def cursor_for_page(page: int) -> str:
+            # Cursor pointing at the last row of the previous page
+            last_row = await test_db.fetch_one(
+                "SELECT created_at, id FROM sessions ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET :offset",
+                {"offset": (page - 1) * page_size - 1}
+            )
+            return encode_cursor(last_row["created_at"], last_row["id"])
+        
+        shallow_cursor = await cursor_for_page(2)
+        deep_cursor = await cursor_for_page(deep_page)
+        
+        # Count SQLite VM steps spent serving each request on this connection
+        steps = 0
+        
+        def count_step():
+            nonlocal steps
+            steps += 1
+            return 0
+        
+        await connection.raw_connection.set_progress_handler(count_step, 1)
+        
+        async def request_cost(url: str) -> tuple[int, dict]:
+            nonlocal steps
+            steps = 0
+            response = await client.get(url)
+            assert response.status_code == 200
+            return steps, response.json()
+        
+        first_cost, _ = await request_cost(f"/api/sessions?page_size={page_size}")
+        shallow_cursor_cost, _ = await request_cost(
+            f"/api/sessions?page_size={page_size}&cursor={shallow_cursor}"
+        )
+        deep_cursor_cost, cursor_page = await request_cost(
+            f"/api/sessions?page_size={page_size}&cursor={deep_cursor}"
+        )
+        offset_cost, offset_page = await request_cost(
+            f"/api/sessions?page_size={page_size}&page={deep_page}"
+        )
+        await connection.raw_connection.set_progress_handler(None, 1)
+    
+    # Both modes return the same rows for page 5,000
+    assert [s["id"] for s in cursor_page["items"]] == [s["id"] for s in offset_page["items"]]
+    assert len(cursor_page["items"]) == page_size
+    
+    # Keyset cost is independent of depth; OFFSET cost grows with it
+    assert deep_cursor_cost == shallow_cursor_cost
+    assert offset_cost > first_cost * 100
+
+
+@pytest.mark.asyncio
+async def test_create_sessions_bulk_json(client: AsyncClient):
+    """Test bulk creating sessions from a JSON array with per-item results."""
+    projects_response = await client.get("/api/projects")
+    project_id = projects_response.json()[0]["id"]
+    
+    start_time = datetime.now() - timedelta(hours=2)
+    end_time = datetime.now()
+    items = [
+        {"project_id": project_id, "start_time": start_time.isoformat(), "end_time": end_time.isoformat()},
+        {"project_id": 99999, "start_time": start_time.isoformat()},
+        {"project_id": project_id},
+        {"project_id": project_id, "start_time": start_time.isoformat()},
+    ]
+    
+    response = await client.post("/api/sessions/bulk", json=items)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    
+    results = data["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert [r["status"] for r in results] == ["created", "error", "error", "created"]
+    assert results[1]["detail"] == "Project not found"
+    assert "start_time" in results[2]["detail"]
+    
+    # Returned ids point at the inserted rows
+    session = (await client.get(f"/api/sessions/{results[0]['id']}")).json()
+    assert session["start_time"] == start_time.isoformat() + "Z"
+    assert session["end_time"] == end_time.isoformat() + "Z"
+    session = (await client.get(f"/api/sessions/{results[3]['id']}")).json()
+    assert session["end_time"] is None
+    
+    assert (await client.get("/api/sessions")).json()["total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_create_sessions_bulk_ndjson(client: AsyncClient):
+    """Test bulk creating sessions from an NDJSON body spanning several chunks."""
+    projects_response = await client.get("/api/projects")
+    project_ids = [p["id"] for p in projects_response.json()]
+    
+    start_time = datetime(2025, 1, 1)
+    lines = [
+        json.dumps({
+            "project_id": project_ids[i % len(project_ids)],
+            "start_time": (start_time + timedelta(hours=i)).isoformat(),
+            "end_time": (start_time + timedelta(hours=i, minutes=30)).isoformat()
+        })
+        for i in range(2500)
+    ]
+    lines[10:10] = ["{not json", "null", "[]", "42"]
+    body = "\n".join(lines) + "\n"
+    
+    response = await client.post(
+        "/api/sessions/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2500
+    assert data["failed"] == 4
+    assert data["results"][10] == {"index": 10, "status": "error", "id": None, "detail": "Invalid JSON"}
+    assert [r["detail"] for r in data["results"][11:14]] == ["Expected a JSON object"] * 3
+    
+    created_ids = [r["id"] for r in data["results"] if r["status"] == "created"]
+    assert len(set(created_ids)) == 2500
+    last = (await client.get(f"/api/sessions/{created_ids[-1]}")).json()
+    assert last["start_time"] == (start_time + timedelta(hours=2499)).isoformat() + "Z"
+    assert (await client.get("/api/sessions")).json()["total"] == 2500
+
+
+@pytest.mark.asyncio
+async def test_create_sessions_bulk_upload_does_not_block_writes(
+    client: AsyncClient, test_db: databases.Database
+):
+    """Test that other writes go ahead while an NDJSON body is still
+    being uploaded."""
+    async def body():
+        for hour in range(4):
+            if hour == 2:
+                # Would wait forever if the upload held the writer connection
+                await asyncio.wait_for(test_db.execute(
+                    "INSERT INTO sessions (project_id, start_time, created_at) VALUES (2, 0, 0)"
+                ), timeout=2)
+            line = {"project_id": 1, "start_time": f"2025-01-01T{hour:02}:00:00"}
+            yield (json.dumps(line) + "\n").encode()
+    
+    response = await client.post(
+        "/api/sessions/bulk",
+        content=body(),
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    
+    assert response.json()["created"] == 4
+    ids = [r["id"] for r in response.json()["results"]]
+    assert ids == list(range(ids[0], ids[0] + 4))
+    assert (await client.get("/api/sessions")).json()["total"] == 5
+
+
+@pytest.mark.asyncio
+async def test_create_sessions_bulk_rejects_non_array(client: AsyncClient):
+    """Test that a JSON body that is not an array is rejected."""
+    response = await client.post("/api/sessions/bulk", json={"project_id": 1})
+    
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_sessions(client: AsyncClient):
+    """Test exporting all sessions as NDJSON and CSV."""
+    projects_response = await client.get("/api/projects")
+    project_id = projects_response.json()[0]["id"]
+    
+    start_time = datetime(2025, 1, 1, 9, 0)
+    items = [
+        {
+            "project_id": project_id,
+            "start_time": (start_time + timedelta(hours=i)).isoformat(),
+            "end_time": (start_time + timedelta(hours=i, minutes=45)).isoformat() if i % 2 else None
+        }
+        for i in range(1200)
+    ]
+    await client.post("/api/sessions/bulk", json=items)
+    
+    # NDJSON: one object per session, in id order, matching the JSON API
+    response = await client.get("/api/sessions/export?format=ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert len(exported) == 1200
+    assert [s["id"] for s in exported] == sorted(s["id"] for s in exported)
+    first = (await client.get(f"/api/sessions/{exported[1]['id']}")).json()
+    assert exported[1] == first
+    
+    # CSV: header plus one row per session
+    response = await client.get("/api/sessions/export?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0] == "id,project_id,start_time,end_time,created_at"
+    assert len(lines) == 1201
+    assert lines[1].split(",")[3] == ""
+    
+    response = await client.get("/api/sessions/export?format=xml")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_session_endpoints_statement_counts(client: AsyncClient, query_counter):
+    """Test that each session endpoint runs a fixed number of statements."""
+    session_data = {
+        "project_id": 1,
+        "start_time": (datetime.now() - timedelta(hours=2)).isoformat(),
+        "end_time": datetime.now().isoformat()
+    }
+    
+    query_counter.reset()
+    response = await client.post("/api/sessions", json=session_data)
+    assert response.status_code == 201
+    assert query_counter.count == 1
+    session_id = response.json()["id"]
+    
+    query_counter.reset()
+    response = await client.post("/api/sessions", json={**session_data, "project_id": 99999})
+    assert response.status_code == 404
+    assert query_counter.count == 1
+    
+    query_counter.reset()
+    response = await client.put(f"/api/sessions/{session_id}", json=session_data)
+    assert response.status_code == 200
+    assert query_counter.count == 1
+    
+    # The update, then the archive catalog
+    query_counter.reset()
+    response = await client.put("/api/sessions/99999", json=session_data)
+    assert response.status_code == 404
+    assert query_counter.count == 2
+    
+    # The table version (for the ETag) plus the row
+    query_counter.reset()
+    response = await client.get(f"/api/sessions/{session_id}")
+    assert response.status_code == 200
+    assert query_counter.count == 2
+    
+    # Table version, the archive catalog (read again after writes), total
+    # from the counter table and one page query
+    query_counter.reset()
+    response = await client.get("/api/sessions")
+    assert response.status_code == 200
+    assert query_counter.count == 4
+    
+    # Revalidating an unchanged table reads only the version
+    query_counter.reset()
+    response = await client.get("/api/sessions", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    assert query_counter.count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_sessions_filters(client: AsyncClient):
+    """Test filtering by project, start time range and open sessions."""
+    projects_response = await client.get("/api/projects")
+    work, personal = [p["id"] for p in projects_response.json()[:2]]
+    
+    start = datetime(2025, 3, 1, 9, 0)
+    for day in range(6):
+        for project_id in (work, personal):
+            session_data = {
+                "project_id": project_id,
+                "start_time": (start + timedelta(days=day)).isoformat()
+            }
+            # The last day's sessions are still running
+            if day < 5:
+                session_data["end_time"] = (start + timedelta(days=day, hours=1)).isoformat()
+            await client.post("/api/sessions", json=session_data)
+    
+    async def fetch(**params) -> dict:
+        response = await client.get("/api/sessions", params={"page_size": 100, **params})
+        assert response.status_code == 200
+        return response.json()
+    
+    data = await fetch(project_id=work)
+    assert data["total"] == 6
+    assert {s["project_id"] for s in data["items"]} == {work}
+    
+    # start_after is inclusive, start_before exclusive
+    data = await fetch(start_after="2025-03-02T09:00:00", start_before="2025-03-04T09:00:00")
+    assert data["total"] == 4
+    assert sorted({s["start_time"] for s in data["items"]}) == ["2025-03-02T09:00:00Z", "2025-03-03T09:00:00Z"]
+    
+    data = await fetch(project_id=personal, start_after="2025-03-04T00:00:00")
+    assert data["total"] == 3
+    
+    data = await fetch(open_only=True)
+    assert data["total"] == 2
+    data = await fetch(open_only=True, project_id=work)
+    assert data["total"] == 1
+    assert all(s["end_time"] is None for s in data["items"])
+    
+    data = await fetch(open_only=True, project_id=work, start_before="2025-03-06T00:00:00")
+    assert data == {"items": [], "total": 0, "page": 1, "page_size": 100, "next_cursor": None}
+    
+    # Cursors page through the filtered list
+    first = await fetch(project_id=work, page_size=4)
+    second = await fetch(project_id=work, page_size=4, cursor=first["next_cursor"])
+    assert len(first["items"]) == 4 and len(second["items"]) == 2
+    ids = [s["id"] for s in first["items"] + second["items"]]
+    assert ids == [s["id"] for s in (await fetch(project_id=work))["items"]]
+
+
+@pytest.mark.parametrize("keyset", [False, True], ids=["offset", "cursor"])
+@pytest.mark.parametrize("filters", [
+    dict(zip(("project_id", "start_after", "start_before", "open_only"), combination))
+    for combination in itertools.product(
+        (None, 1), (None, datetime(2025, 1, 1)), (None, datetime(2025, 2, 1)), (False, True)
+    )
+    if any(combination)
+], ids=lambda filters: "+".join(name for name, value in filters.items() if value))
+@pytest.mark.asyncio
+async def test_session_filters_use_indexes(test_db, filters: dict, keyset: bool):
+    """Test that every filter combination searches an index instead of scanning."""
+    source, conditions, values = session_filters(**filters)
+    where = " AND ".join(conditions)
+    queries = [(f"SELECT COUNT(*) FROM {source} WHERE {where}", values)]
+    if keyset:
+        queries.append((
+            f"""SELECT * FROM {source} WHERE {where} AND (created_at, id) < (:created_at, :last_id)
+            ORDER BY created_at DESC, id DESC LIMIT 21""",
+            {**values, "created_at": 0, "last_id": 0}
+        ))
+    else:
+        queries.append((
+            f"SELECT * FROM {source} WHERE {where} ORDER BY created_at DESC, id DESC LIMIT 21 OFFSET 20",
+            values
+        ))
+    
+    for query, query_values in queries:
+        plan = [row["detail"] for row in await test_db.fetch_all(f"EXPLAIN QUERY PLAN {query}", query_values)]
+        table_steps = [step for step in plan if "sessions" in step]
+        assert table_steps, plan
+        assert all(step.startswith("SEARCH sessions USING") for step in table_steps), plan
+
+
+@pytest.mark.asyncio
+async def test_start_and_stop_timer(client: AsyncClient):
+    """Test starting timers, listing running ones and stopping them."""
+    response = await client.post("/api/sessions/start", json={"project_id": 1})
+    assert response.status_code == 201
+    running = response.json()
+    assert running["end_time"] is None
+    
+    started_at = (datetime.now() - timedelta(hours=1)).isoformat()
+    response = await client.post("/api/sessions/start", json={"project_id": 2, "start_time": started_at})
+    older = response.json()
+    assert older["start_time"] == started_at + "Z"
+    # A finished session is not running
+    await client.post("/api/sessions", json={
+        "project_id": 1, "start_time": started_at, "end_time": datetime.now().isoformat()
+    })
+    
+    response = await client.get("/api/sessions/active")
+    assert response.status_code == 200
+    assert [s["id"] for s in response.json()] == [running["id"], older["id"]]
+    response = await client.get("/api/sessions/active", params={"project_id": 2})
+    assert [s["id"] for s in response.json()] == [older["id"]]
+    
+    ended_at = datetime.now().isoformat()
+    response = await client.post(f"/api/sessions/{older['id']}/stop", json={"end_time": ended_at})
+    assert response.status_code == 200
+    assert response.json() == {**older, "end_time": ended_at + "Z"}
+    response = await client.post(f"/api/sessions/{running['id']}/stop")
+    assert response.status_code == 200
+    assert response.json()["end_time"] is not None
+    
+    assert (await client.get("/api/sessions/active")).json() == []
+    # The stopped timer's time shows up in reports
+    report = (await client.get(
+        "/api/reports/summary", params={"from": "2000-01-01", "to": "2100-01-01", "granularity": "month"}
+    )).json()
+    assert any(item["project_id"] == 2 for item in report["items"])
+
+
+@pytest.mark.asyncio
+async def test_timer_errors(client: AsyncClient):
+    """Test stopping unknown or finished sessions and starting for unknown projects."""
+    response = await client.post("/api/sessions/start", json={"project_id": 99999})
+    assert response.status_code == 404
+    
+    response = await client.post("/api/sessions/99999/stop")
+    assert response.status_code == 404
+    
+    started = (await client.post("/api/sessions/start", json={"project_id": 1})).json()
+    response = await client.post(
+        f"/api/sessions/{started['id']}/stop", json={"end_time": "2000-01-01T00:00:00"}
+    )
+    assert response.status_code == 422
+    await client.post(f"/api/sessions/{started['id']}/stop")
+    response = await client.post(f"/api/sessions/{started['id']}/stop")
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_single_open_session_per_project(client: AsyncClient, monkeypatch):
+    """Test that with the limit on, a project cannot have two running sessions."""
+    monkeypatch.setattr(sessions_router, "SINGLE_OPEN_SESSION_PER_PROJECT", True)
+    started = (await client.post("/api/sessions/start", json={"project_id": 1})).json()
+    
+    response = await client.post("/api/sessions/start", json={"project_id": 1})
+    assert response.status_code == 409
+    response = await client.post("/api/sessions", json={"project_id": 1, "start_time": datetime.now().isoformat()})
+    assert response.status_code == 409
+    # Other projects, and finished sessions, are not affected
+    response = await client.post("/api/sessions/start", json={"project_id": 2})
+    assert response.status_code == 201
+    response = await client.post("/api/sessions", json={
+        "project_id": 1, "start_time": datetime.now().isoformat(), "end_time": datetime.now().isoformat()
+    })
+    assert response.status_code == 201
+    
+    await client.post(f"/api/sessions/{started['id']}/stop")
+    response = await client.post("/api/sessions/start", json={"project_id": 1})
+    assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_timer_queries_use_open_session_indexes(test_db):
+    """Test that timer queries read only open-session index entries or one row."""
+    queries = [
+        ("SELECT * FROM sessions INDEXED BY idx_sessions_open_start_time_id WHERE end_time IS NULL "
+         "AND project_id = 1 ORDER BY start_time DESC, id DESC", "idx_sessions_open_start_time_id"),
+        (sessions_router.START_SESSION_QUERY, "idx_sessions_open_project_created_at_id"),
+        ("UPDATE sessions SET end_time = 1 WHERE id = 1 AND end_time IS NULL AND start_time <= 1",
+         "INTEGER PRIMARY KEY"),
+    ]
+    values = {"project_id": 1, "start_time": 0, "created_at": 0}
+    for query, index in queries:
+        query_values = values if ":" in query else None
+        plan = [row["detail"] for row in await test_db.fetch_all(f"EXPLAIN QUERY PLAN {query}", query_values)]
+        assert any(index in step for step in plan), plan
+        assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+@pytest.mark.asyncio
+async def test_get_sessions_columnar(client: AsyncClient):
+    """Test that the columnar format holds the same page as column arrays."""
+    for hour in range(3):
+        await client.post("/api/sessions", json={
+            "project_id": hour + 1,
+            "start_time": f"2025-01-01T0{hour}:00:00",
+            "end_time": f"2025-01-01T0{hour}:30:00" if hour else None
+        })
+    
+    page = (await client.get("/api/sessions", params={"page_size": 2})).json()
+    response = await client.get("/api/sessions", params={"page_size": 2, "format": "columnar"})
+    assert response.headers["content-type"] == "application/vnd.measured.columnar+json"
+    data = response.json()
+    columns = data.pop("columns")
+    assert data == {
+        "time_unit": "us", "total": 3, "page": 1, "page_size": 2, "next_cursor": page["next_cursor"]
+    }
+    assert columns["id"] == [s["id"] for s in page["items"]]
+    assert columns["project_id"] == [s["project_id"] for s in page["items"]]
+    assert columns["start_time"] == [
+        to_epoch_us(datetime.fromisoformat(s["start_time"][:-1])) for s in page["items"]
+    ]
+    assert columns["end_time"][-1] == to_epoch_us(datetime(2025, 1, 1, 1, 30))
+    
+    # Negotiated through Accept as well, and cached separately from JSON
+    response = await client.get(
+        "/api/sessions", params={"page_size": 2}, headers={"Accept": "application/vnd.measured.columnar+json"}
+    )
+    assert response.json()["columns"] == columns
+    assert response.headers["X-Cache"] == "HIT"
+    response = await client.get("/api/sessions", params={"page_size": 2, "format": "json"})
+    assert response.json() == page
+
+
+@pytest.mark.asyncio
+async def test_export_sessions_columnar(client: AsyncClient, monkeypatch):
+    """Test that the columnar export writes one line of columns per batch."""
+    monkeypatch.setattr(sessions_router, "EXPORT_BATCH_SIZE", 2)
+    for _ in range(3):
+        await client.post("/api/sessions", json={"project_id": 1, "start_time": "2025-01-01T09:00:00"})
+    
+    response = await client.get(
+        "/api/sessions/export", headers={"Accept": "application/vnd.measured.columnar+x-ndjson"}
+    )
+    assert response.headers["content-type"] == "application/vnd.measured.columnar+x-ndjson"
+    batches = [json.loads(line) for line in response.text.splitlines()]
+    assert [batch["id"] for batch in batches] == [[1, 2], [3]]
+    assert batches[1]["start_time"] == [to_epoch_us(datetime(2025, 1, 1, 9))]
+
+
+@pytest.mark.asyncio
+async def test_batch_get_sessions(client: AsyncClient, query_counter, monkeypatch):
+    """Test fetching sessions by id in request order, in chunked queries."""
+    monkeypatch.setattr(sessions_router, "BATCH_GET_CHUNK_SIZE", 2)
+    session_data = {"project_id": 1, "start_time": "2025-01-01T09:00:00", "end_time": "2025-01-01T10:00:00"}
+    created = [(await client.post("/api/sessions", json=session_data)).json() for _ in range(3)]
+    ids = [created[2]["id"], 99999, created[0]["id"], created[1]["id"], created[2]["id"]]
+    
+    query_counter.reset()
+    response = await client.post("/api/sessions/batch-get", json={"ids": ids})
+    
+    assert response.status_code == 200
+    # Four distinct ids in chunks of two, and the archive catalog for the missing one
+    assert query_counter.count == 3
+    data = response.json()
+    assert data["items"] == [created[2], None, created[0], created[1], created[2]]
+    assert data["not_found"] == [99999]
+    
+    response = await client.post("/api/sessions/batch-get", json={"ids": []})
+    assert response.json() == {"items": [], "not_found": []}
+
+
+@pytest.mark.asyncio
+async def test_batch_get_sessions_limit(client: AsyncClient):
+    """Test that asking for more ids than the limit is rejected."""
+    ids = list(range(1, SESSION_BATCH_GET_LIMIT + 2))
+    response = await client.post("/api/sessions/batch-get", json={"ids": ids})
+    assert response.status_code == 422
+    response = await client.post("/api/sessions/batch-get", json={"ids": ["x"]})
+    assert response.status_code == 422
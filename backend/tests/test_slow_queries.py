@@ -0,0 +1,90 @@
+"""
+Tests for the slow-query log.
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.routers import debug
+from app.slow_queries import SlowQueryLog, plan_flags, slow_query_log
+
+
+@pytest.fixture
+def debug_endpoints():
+    """Mount the debug router, as DEBUG_ENDPOINTS_ENABLED=1 does."""
+    routes = list(app.router.routes)
+    app.include_router(debug.router, prefix="/api", tags=["debug"])
+    yield
+    app.router.routes[:] = routes
+
+
+@pytest.fixture
+def log_everything(monkeypatch) -> SlowQueryLog:
+    """Treat every query as slow, keeping parameters visible."""
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 0)
+    monkeypatch.setattr(slow_query_log, "redact_params", False)
+    slow_query_log.clear()
+    yield slow_query_log
+    slow_query_log.clear()
+
+
+def test_plan_flags():
+    """Test that scans and temporary sorts are flagged."""
+    assert plan_flags(["SEARCH sessions USING INTEGER PRIMARY KEY (rowid=?)"]) == []
+    assert plan_flags(["SCAN sessions", "USE TEMP B-TREE FOR ORDER BY"]) == ["SCAN", "USE TEMP B-TREE"]
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_recorded_with_plan(client: AsyncClient, log_everything: SlowQueryLog, debug_endpoints):
+    """Test that slow router queries are kept with their plan, newest first."""
+    projects = (await client.get("/api/projects")).json()
+    created = (await client.post("/api/sessions", json={
+        "project_id": projects[0]["id"],
+        "start_time": "2025-01-01T09:00:00"
+    })).json()
+    await client.get(f"/api/sessions/{created['id']}")
+    
+    response = await client.get("/api/debug/slow-queries")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["threshold_ms"] == 0
+    entries = data["entries"]
+    by_id = entries[0]
+    assert by_id["statement"].startswith("SELECT * FROM sessions WHERE id = :session_id")
+    assert by_id["params"] == {"session_id": created["id"]}
+    assert any("SEARCH sessions" in step for step in by_id["plan"])
+    assert by_id["flags"] == []
+    # SELECT * FROM projects ORDER BY id reads the whole table
+    projects_entry = next(entry for entry in entries if "FROM projects" in entry["statement"])
+    assert "FROM projects" in projects_entry["statement"]
+    assert "SCAN" in projects_entry["flags"]
+
+
+@pytest.mark.asyncio
+async def test_slow_query_params_redacted(client: AsyncClient, log_everything: SlowQueryLog, debug_endpoints, monkeypatch):
+    """Test that bound parameter values are hidden when redaction is on."""
+    monkeypatch.setattr(slow_query_log, "redact_params", True)
+    
+    await client.get("/api/sessions/12345")
+    
+    entries = (await client.get("/api/debug/slow-queries")).json()["entries"]
+    entry = next(entry for entry in entries if "FROM sessions WHERE id" in entry["statement"])
+    assert entry["params"] == {"session_id": "?"}
+
+
+@pytest.mark.asyncio
+async def test_fast_queries_not_recorded(client: AsyncClient, debug_endpoints):
+    """Test that queries under the threshold are not recorded."""
+    slow_query_log.clear()
+    
+    await client.get("/api/sessions/12345")
+    
+    assert (await client.get("/api/debug/slow-queries")).json()["entries"] == []
+
+
+@pytest.mark.asyncio
+async def test_debug_endpoints_off_by_default(client: AsyncClient):
+    """Test that the slow-query log is not served unless enabled."""
+    assert not debug.DEBUG_ENDPOINTS_ENABLED
+    assert (await client.get("/api/debug/slow-queries")).status_code == 404
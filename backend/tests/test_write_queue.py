@@ -0,0 +1,117 @@
+"""
+Tests for group-committed session inserts.
+"""
+import asyncio
+from datetime import datetime
+import pytest
+import databases
+from httpx import AsyncClient
+
+from app import write_queue
+from app.metrics import InstrumentedDatabase, MetricsRegistry
+from app.models import now_epoch_us, to_epoch_us
+from app.routers.sessions import CREATE_SESSION_QUERY
+from app.write_queue import WriteCoalescer
+
+
+def session_json(hour: int) -> dict:
+    return {
+        "project_id": 1,
+        "start_time": f"2025-01-01T{hour:02d}:00:00",
+        "end_time": f"2025-01-01T{hour:02d}:30:00"
+    }
+
+
+def session_values(hour: int) -> dict:
+    """Bind values for CREATE_SESSION_QUERY"""
+    return {
+        "project_id": 1,
+        "start_time": to_epoch_us(datetime(2025, 1, 1, hour)),
+        "end_time": to_epoch_us(datetime(2025, 1, 1, hour, 30)),
+        "created_at": now_epoch_us()
+    }
+
+
+@pytest.fixture
+async def coalescer(test_db: databases.Database):
+    coalescer = WriteCoalescer(test_db, CREATE_SESSION_QUERY, window_seconds=0.05, max_batch_size=8)
+    await coalescer.start()
+    yield coalescer
+    await coalescer.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_inserts_share_a_batch(coalescer: WriteCoalescer, test_db: databases.Database):
+    """Test that concurrent inserts are committed together and each caller gets its own row."""
+    rows = await asyncio.gather(*(coalescer.submit(session_values(hour)) for hour in range(10)))
+    
+    assert [row["start_time"] for row in rows] == [to_epoch_us(datetime(2025, 1, 1, hour)) for hour in range(10)]
+    assert len({row["id"] for row in rows}) == 10
+    # Batches are capped at max_batch_size
+    assert coalescer.stats()["batch_sizes"] == {2: 1, 8: 1}
+    assert (await test_db.fetch_one("SELECT COUNT(*) FROM sessions"))[0] == 10
+
+
+@pytest.mark.asyncio
+async def test_failing_insert_only_fails_its_caller(coalescer: WriteCoalescer, test_db: databases.Database):
+    """Test that one failing item does not roll back the rest of its batch."""
+    bad_values = {**session_values(1), "start_time": None}
+    
+    results = await asyncio.gather(
+        coalescer.submit(session_values(0)),
+        coalescer.submit(bad_values),
+        coalescer.submit(session_values(2)),
+        return_exceptions=True
+    )
+    
+    assert isinstance(results[1], Exception)
+    assert results[0]["start_time"] == to_epoch_us(datetime(2025, 1, 1, 0))
+    assert results[2]["start_time"] == to_epoch_us(datetime(2025, 1, 1, 2))
+    assert coalescer.stats()["batch_sizes"] == {3: 1}
+    assert (await test_db.fetch_one("SELECT COUNT(*) FROM sessions"))[0] == 2
+
+
+@pytest.mark.asyncio
+async def test_create_session_uses_coalescer(client: AsyncClient, coalescer: WriteCoalescer, monkeypatch):
+    """Test that POST /api/sessions goes through the coalescer when enabled."""
+    monkeypatch.setattr(write_queue, "session_insert_coalescer", coalescer)
+    
+    responses = await asyncio.gather(*(
+        client.post("/api/sessions", json=session_json(hour)) for hour in range(3)
+    ))
+    
+    assert [r.status_code for r in responses] == [201, 201, 201]
+    stats = (await client.get("/api/health/write-queue")).json()["sessions"]
+    assert stats["enabled"] is True
+    assert sum(int(size) * count for size, count in stats["batch_sizes"].items()) == 3
+
+
+@pytest.mark.asyncio
+async def test_submit_after_stop_raises(test_db: databases.Database):
+    """Test that a stopped coalescer rejects new items instead of leaving
+    their callers waiting forever."""
+    coalescer = WriteCoalescer(test_db, CREATE_SESSION_QUERY, window_seconds=0.01, max_batch_size=8)
+    with pytest.raises(RuntimeError):
+        await coalescer.submit(session_values(0))
+    await coalescer.start()
+    assert (await coalescer.submit(session_values(0)))["id"]
+    await coalescer.stop()
+    
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(coalescer.submit(session_values(1)), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_batched_inserts_are_instrumented(test_db: databases.Database):
+    """Test that inserts made by the coalescer are timed like other queries."""
+    metrics = MetricsRegistry()
+    coalescer = WriteCoalescer(
+        InstrumentedDatabase(test_db, metrics, None), CREATE_SESSION_QUERY, window_seconds=0.01, max_batch_size=8
+    )
+    await coalescer.start()
+    try:
+        await asyncio.gather(*(coalescer.submit(session_values(hour)) for hour in range(3)))
+    finally:
+        await coalescer.stop()
+    
+    assert metrics.query_latency["INSERT sessions"].count == 3
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef, useCallback } from 'react';
 import {
   Table,
   TableBody,
@@ -21,6 +21,12 @@ export default function Sessions() {
   const [loadingSessions, setLoadingSessions] = useState(true);
   const [page, setPage] = useState(1);
   const [total, setTotal] = useState(0);
+  const [reloadKey, setReloadKey] = useState(0);
+  // Ids already shown or counted, so a created event is applied once
+  const seenIds = useRef(new Set<number>());
+  // Stream events received while a page is loading, null once it has loaded
+  const pendingEvents = useRef<MessageEvent[] | null>([]);
+  const pageRef = useRef(page);
 
   // Fetch projects once
   useEffect(() => {
@@ -41,9 +47,56 @@ export default function Sessions() {
     return () => controller.abort();
   }, []);
 
+  // Apply one change from the session stream to the loaded page
+  const applyEvent = useCallback((event: MessageEvent) => {
+    const session: Session = JSON.parse(event.data);
+    if (event.type === 'updated') {
+      setSessions((current) => current.map((s) => (s.id === session.id ? session : s)));
+      return;
+    }
+    // Already in the fetched page, or replayed after a reconnect
+    if (seenIds.current.has(session.id)) return;
+    seenIds.current.add(session.id);
+    setTotal((current) => current + 1);
+    // Newest sessions come first, so only the first page shows it
+    if (pageRef.current === 1) {
+      setSessions((current) => [session, ...current].slice(0, PAGE_SIZE));
+    }
+  }, []);
+
+  // Apply changes from the session stream instead of polling. It is opened
+  // before the first fetch and kept across pages, so no change is missed;
+  // events that arrive while a page loads are held until it has loaded
+  useEffect(() => {
+    const events = new EventSource(`${API_URL}/sessions/stream`);
+    const receive = (event: Event) => {
+      if (pendingEvents.current) {
+        pendingEvents.current.push(event as MessageEvent);
+      } else {
+        applyEvent(event as MessageEvent);
+      }
+    };
+
+    events.addEventListener('created', receive);
+    events.addEventListener('updated', receive);
+    // Too many changes at once, or missed while disconnected: refetch
+    events.addEventListener('resync', () => setReloadKey((key) => key + 1));
+
+    return () => events.close();
+  }, [applyEvent]);
+
   // Fetch sessions when page changes
   useEffect(() => {
     const controller = new AbortController();
+    pageRef.current = page;
+    pendingEvents.current = [];
+    
+    // Apply what the stream sent while the page was loading
+    const applyPendingEvents = () => {
+      const pending = pendingEvents.current ?? [];
+      pendingEvents.current = null;
+      pending.forEach(applyEvent);
+    };
     
     const fetchSessions = async () => {
       setLoadingSessions(true);
@@ -53,20 +106,23 @@ export default function Sessions() {
           { signal: controller.signal }
         );
         const data: PaginatedSessions = await response.json();
+        seenIds.current = new Set(data.items.map((s) => s.id));
         setSessions(data.items);
         setTotal(data.total);
         setLoadingSessions(false);
+        applyPendingEvents();
       } catch (error) {
         if ((error as Error).name === 'AbortError') return; // Ignore abort errors
         console.error('Error fetching sessions:', error);
         setSessions([]);
         setLoadingSessions(false);
+        applyPendingEvents();
       }
     };
     
     fetchSessions();
     return () => controller.abort();
-  }, [page]);
+  }, [page, reloadKey, applyEvent]);
 
   const getProjectName = (projectId: number): string => {
     const project = projects.find((p) => p.id === projectId);